@@ -0,0 +1,47 @@
+"""add indexes for tenant-scoped hot queries
+
+Revision ID: a7d2e5c8f1b4
+Revises: f3a8c2d6e9b1
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d2e5c8f1b4"
+down_revision: Union[str, None] = "f3a8c2d6e9b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = "deleted_at IS NULL"
+
+# (name, table, columns, partial WHERE)
+INDEXES = [
+    ("ix_chunks_tenant_dataset", "chunks", ["tenant_id", "dataset_id"], None),
+    ("ix_chunks_document_id", "chunks", ["document_id"], None),
+    ("ix_documents_live_dataset_created", "documents", ["tenant_id", "dataset_id", "created_at", "id"], LIVE),
+    ("ix_documents_live_tenant_created", "documents", ["tenant_id", "created_at", "id"], LIVE),
+    ("ix_documents_live_content_hash", "documents", ["tenant_id", "dataset_id", "content_hash"], LIVE),
+    ("ix_query_logs_tenant_created", "query_logs", ["tenant_id", "created_at", "id"], None),
+    ("ix_api_keys_active_tenant", "api_keys", ["active", "tenant_id"], None),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY on Postgres so large chunk tables stay writable; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            kwargs = {}
+            if where:
+                kwargs = {"postgresql_where": sa.text(where), "sqlite_where": sa.text(where)}
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
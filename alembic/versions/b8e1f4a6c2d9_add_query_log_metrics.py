@@ -0,0 +1,32 @@
+"""add latency and result metrics to query logs
+
+Revision ID: b8e1f4a6c2d9
+Revises: a7d2e5c8f1b4
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e1f4a6c2d9"
+down_revision: Union[str, None] = "a7d2e5c8f1b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("query_logs", sa.Column("latency_ms", sa.Float(), nullable=True))
+    op.add_column("query_logs", sa.Column("hit_count", sa.Integer(), nullable=True))
+    op.add_column("query_logs", sa.Column("rerank_applied", sa.Boolean(), nullable=True))
+    op.add_column("query_logs", sa.Column("answered", sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("query_logs", "answered")
+    op.drop_column("query_logs", "rerank_applied")
+    op.drop_column("query_logs", "hit_count")
+    op.drop_column("query_logs", "latency_ms")
@@ -0,0 +1,93 @@
+"""add daily query stats rollup and partition query logs by month
+
+Revision ID: c4f7a9d2e6b3
+Revises: b8e1f4a6c2d9
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f7a9d2e6b3"
+down_revision: Union[str, None] = "b8e1f4a6c2d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "query_stats_daily",
+        sa.Column("tenant_id", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("dataset_id", sa.String(), nullable=False),
+        sa.Column("query_count", sa.Integer(), nullable=False),
+        sa.Column("latency_count", sa.Integer(), nullable=False),
+        sa.Column("latency_sum_ms", sa.Float(), nullable=False),
+        sa.Column("latency_hist", sa.JSON(), nullable=True),
+        sa.Column("latency_p50_ms", sa.Float(), nullable=True),
+        sa.Column("latency_p95_ms", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("tenant_id", "day", "dataset_id"),
+    )
+    # tenant totals for days already logged; percentiles start with the next logged query
+    op.execute(
+        "INSERT INTO query_stats_daily (tenant_id, day, dataset_id, query_count, latency_count, latency_sum_ms, updated_at) "
+        "SELECT tenant_id, DATE(created_at), '*', COUNT(*), COUNT(latency_ms), COALESCE(SUM(latency_ms), 0), CURRENT_TIMESTAMP "
+        "FROM query_logs WHERE created_at IS NOT NULL GROUP BY tenant_id, DATE(created_at)"
+    )
+
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+    partitioned = conn.execute(
+        sa.text("SELECT 1 FROM pg_partitioned_table t JOIN pg_class c ON c.oid = t.partrelid WHERE c.relname = 'query_logs'")
+    ).first()
+    if partitioned:
+        return  # created by Base.metadata.create_all, which already partitions it
+    # range-partition query_logs by month so retention drops whole partitions
+    op.execute("UPDATE query_logs SET created_at = timezone('utc', now()) WHERE created_at IS NULL")
+    op.execute("ALTER TABLE query_logs RENAME TO query_logs_unpartitioned")
+    op.execute("ALTER TABLE query_logs_unpartitioned RENAME CONSTRAINT query_logs_pkey TO query_logs_unpartitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_query_logs_tenant_created")
+    op.execute("CREATE TABLE query_logs (LIKE query_logs_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    op.execute("ALTER TABLE query_logs ALTER COLUMN created_at SET NOT NULL")
+    op.execute("ALTER TABLE query_logs ADD CONSTRAINT query_logs_pkey PRIMARY KEY (id, created_at)")
+    op.execute("CREATE INDEX ix_query_logs_tenant_created ON query_logs (tenant_id, created_at, id)")
+    op.execute("CREATE TABLE query_logs_default PARTITION OF query_logs DEFAULT")
+    oldest, newest = conn.execute(sa.text("SELECT MIN(created_at), MAX(created_at) FROM query_logs_unpartitioned")).first()
+    today = datetime.utcnow().date()
+    month = (oldest.date() if oldest else today).replace(day=1)
+    last = _next_month(max(newest.date() if newest else today, today).replace(day=1))
+    while month <= last:
+        upper = _next_month(month)
+        op.execute(
+            f"CREATE TABLE query_logs_{month:%Y_%m} PARTITION OF query_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    op.execute("INSERT INTO query_logs SELECT * FROM query_logs_unpartitioned")
+    op.execute("DROP TABLE query_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        op.execute("ALTER TABLE query_logs RENAME TO query_logs_partitioned")
+        op.execute("ALTER TABLE query_logs_partitioned RENAME CONSTRAINT query_logs_pkey TO query_logs_partitioned_pkey")
+        op.execute("DROP INDEX IF EXISTS ix_query_logs_tenant_created")
+        op.execute("CREATE TABLE query_logs (LIKE query_logs_partitioned INCLUDING DEFAULTS)")
+        op.execute("ALTER TABLE query_logs ALTER COLUMN created_at DROP NOT NULL")
+        op.execute("ALTER TABLE query_logs ADD CONSTRAINT query_logs_pkey PRIMARY KEY (id)")
+        op.execute("CREATE INDEX ix_query_logs_tenant_created ON query_logs (tenant_id, created_at, id)")
+        op.execute("INSERT INTO query_logs SELECT * FROM query_logs_partitioned")
+        op.execute("DROP TABLE query_logs_partitioned CASCADE")
+    op.drop_table("query_stats_daily")
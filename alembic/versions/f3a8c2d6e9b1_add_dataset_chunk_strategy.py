@@ -0,0 +1,26 @@
+"""add chunk strategy to datasets
+
+Revision ID: f3a8c2d6e9b1
+Revises: e2f4c9a7b1d3
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a8c2d6e9b1"
+down_revision: Union[str, None] = "e2f4c9a7b1d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("datasets", sa.Column("chunk_strategy", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("datasets", "chunk_strategy")
@@ -1,19 +1,26 @@
+import logging
+import time
 import uuid
-import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional
-from urllib.parse import urlparse
+from typing import Annotated, List, Optional
+from urllib.parse import quote, urlparse
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 from sqlalchemy.orm import Session
 import requests
 
 from app import services
 from app.config import get_settings
-from app.dedup import find_duplicate_document
+from app.dedup import find_existing_hashes
 from app.deps import TenantContext, get_tenant
 from app.schemas import (
+    BulkImportRequest,
+    BulkImportResponse,
+    ContentHashCheckRequest,
+    ContentHashCheckResponse,
     DatasetCreate,
     DatasetUpdate,
     DatasetOut,
@@ -35,7 +42,7 @@ from app.schemas import (
 from app.schemas_tenant import TenantCreate, TenantOut, TenantApiKeyOut
 from app.schemas_auth import LoginRequest, LoginResponse, UserOut, UserProfileOut, UserProfileUpdate
 from app.auth import get_current_user as get_current_user_dep, get_current_superuser as get_current_superuser_dep
-from core import answerer, embedder, rewriter, reranker, vectorstore, opensearch_bm25
+from core import answerer, embedder, metrics, providers, rewriter, reranker
 from core import storage
 from infra import models
 from infra.models import User, ModelType
@@ -53,8 +60,13 @@ from app.user_profile_service import get_or_create_user_profile, update_user_pro
 
 router = APIRouter()
 settings = get_settings()
-vs = vectorstore.get_vector_store()
-bm25_client = opensearch_bm25.get_bm25_client()
+logger = logging.getLogger(__name__)
+QUERY_SECONDS = metrics.histogram("raglite_query_seconds", "End-to-end /v1/query latency in seconds")
+QUERY_STAGE_SECONDS = metrics.histogram(
+    "raglite_query_stage_seconds",
+    "Seconds per /v1/query stage (rewrite, embed, vector_search, bm25_search, rerank, answer)",
+    ("stage",),
+)
 
 
 def _redact_model_config(mc: models.ModelConfig) -> ModelConfigOut:
@@ -94,24 +106,21 @@ def _validate_allowed_mime_type(mime_type: Optional[str]) -> str:
     return normalized
 
 
-def _cleanup_document_store(tenant_id: str, dataset_id: str, document_id: str) -> None:
-    try:
-        storage.delete_document_store(settings.object_store_root, tenant_id, dataset_id, document_id)
-    except Exception:
-        pass
-
-
-def _fetch_source_uri_data(source_uri: str) -> tuple[str, str, int, str, bytes]:
+def _fetch_source_uri(source_uri: str) -> tuple[str, str, storage.StagedFile]:
+    """
+    Stream a remote document into the staging area while hashing it.
+    Returns (filename, mime, staged); nothing is kept on failure.
+    """
     from core.security import is_safe_url
 
     if not is_safe_url(source_uri):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or unsafe source_uri")
 
-    max_size = settings.max_file_size_mb * 1024 * 1024
+    filename = Path(urlparse(source_uri).path).name or "remote"
     try:
         with requests.get(
             source_uri,
-            timeout=settings.parse_timeout_seconds,
+            timeout=settings.source_fetch_timeout_seconds,
             stream=True,
             allow_redirects=False,
         ) as resp:
@@ -122,28 +131,61 @@ def _fetch_source_uri_data(source_uri: str) -> tuple[str, str, int, str, bytes]:
                 )
             resp.raise_for_status()
             mime = _validate_allowed_mime_type(resp.headers.get("content-type"))
-            size = 0
-            digest = hashlib.sha256()
-            data = bytearray()
-            for chunk in resp.iter_content(chunk_size=8192):
-                if not chunk:
-                    continue
-                size += len(chunk)
-                if size > max_size:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"File too large; max {settings.max_file_size_mb} MB",
-                    )
-                digest.update(chunk)
-                data.extend(chunk)
+            staged = storage.stage_stream(
+                settings.object_store_root,
+                resp.iter_content(chunk_size=64 * 1024),
+                mime,
+                max_bytes=settings.max_file_size_mb * 1024 * 1024,
+            )
     except HTTPException:
         raise
+    except storage.FileTooLarge as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File too large; max {settings.max_file_size_mb} MB",
+        ) from exc
     except requests.RequestException as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to fetch source_uri: {exc}") from exc
+    return filename, mime, staged
+
+
+def _fetch_source_uris(source_uris: List[str]) -> List[tuple[str, str, storage.StagedFile]]:
+    """
+    Fetch several URIs concurrently (at most `source_fetch_concurrency` at a time) so a batch
+    import is not serialized on network latency. Returns (filename, mime, staged) per URI in
+    input order; if any fetch fails, the ones already staged are discarded. Failures other than
+    client errors (e.g. the staging store being unavailable) become a 503.
+    """
+    workers = max(1, min(settings.source_fetch_concurrency, len(source_uris)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_fetch_source_uri, uri) for uri in source_uris]
+        wait(futures)
+    failed = next((fut.exception() for fut in futures if fut.exception() is not None), None)
+    if failed is not None:
+        for fut in futures:
+            if fut.exception() is None:
+                storage.discard_staged(fut.result()[2])
+        if isinstance(failed, HTTPException):
+            raise failed
+        uri = source_uris[next(i for i, fut in enumerate(futures) if fut.exception() is failed)]
+        logger.exception("Staging source_uri %s failed", uri, exc_info=failed)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Could not store source_uri {uri}; try again later"
+        ) from failed
+    return [fut.result() for fut in futures]
+
 
-    parsed = urlparse(source_uri)
-    filename = Path(parsed.path).name or "remote"
-    return filename, mime, size, digest.hexdigest(), bytes(data)
+def _parse_if_none_match(value: Optional[str]) -> List[str]:
+    """SHA-256 entity tags from an If-None-Match header, in order (quotes and W/ prefixes dropped)."""
+    if not value:
+        return []
+    tags = []
+    for tag in value.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tags.append(tag.strip('"').lower())
+    return tags
 
 
 @router.get("/settings", tags=["settings"], response_model=SettingsOut)
@@ -321,10 +363,18 @@ async def update_tenant(
     return services.update_tenant(db, tenant_id, payload)
 
 
-@router.delete("/tenants/{tenant_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["tenants"])
+@router.delete("/tenants/{tenant_id}", status_code=status.HTTP_202_ACCEPTED, tags=["tenants"])
 async def delete_tenant(tenant_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_superuser_dep)):
-    services.delete_tenant(db, tenant_id)
-    return {}
+    job_id = services.delete_tenant(db, tenant_id)
+    return {"status": "accepted", "tenant_id": tenant_id, "job_id": job_id}
+
+
+@router.get("/tenants/{tenant_id}/jobs/{job_id}", tags=["tenants"], response_model=JobOut)
+async def get_tenant_job(
+    tenant_id: str, job_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_superuser_dep)
+) -> JobOut:
+    """Job status for any tenant, including the cleanup job of a tenant that was deleted."""
+    return services.get_job(db, tenant_id, job_id)
 
 
 @router.post("/tenants/{tenant_id}/regenerate-key", tags=["tenants"], response_model=TenantApiKeyOut)
@@ -368,57 +418,84 @@ async def upload_documents(
     dataset_id: str,
     files: Optional[List[UploadFile]] = File(default=None),
     source_uri: Optional[str] = None,
+    source_uris: Annotated[Optional[List[str]], Query()] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     tenant: TenantContext = Depends(get_tenant),
     db: Session = Depends(get_db),
 ) -> DocumentUploadResponse:
+    """
+    Upload files and/or fetch source URIs. Bytes are staged and hashed first; only content that
+    is new to the dataset is moved into place. Clients that already know the SHA-256 of each
+    file can send them in order as `If-None-Match: "<sha256>", ...`: files whose hash is already
+    stored are skipped without being written, and 412 is returned when nothing new remains.
+    """
     dataset = services.ensure_dataset(db, tenant.tenant_id, dataset_id)
-    uploads = []
     incoming_files = list(files) if files else []
     
     # Validate that at least one source is provided
-    if not incoming_files and not source_uri:
+    if not incoming_files and not source_uri and not source_uris:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either files or source_uri must be provided",
         )
     
-    if incoming_files and len(incoming_files) > settings.max_files_per_upload:
+    remote_uris = ([source_uri] if source_uri else []) + list(source_uris or [])
+    if len(incoming_files) + len(remote_uris) > settings.max_files_per_upload:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Too many files; max {settings.max_files_per_upload}",
+            detail=f"Too many files and source URIs; max {settings.max_files_per_upload} per upload",
         )
-    if source_uri:
-        filename, mime, size, content_hash, remote_data = _fetch_source_uri_data(source_uri)
-        dup = find_duplicate_document(db, tenant.tenant_id, dataset_id, content_hash)
-        if not dup:
-            doc_id = str(uuid.uuid4())
-            path = storage.save_bytes(
-                settings.object_store_root,
-                tenant.tenant_id,
-                dataset_id,
-                doc_id,
-                filename,
-                remote_data,
-            )
-            uploads.append((doc_id, filename, mime, size, path, content_hash, None))
 
-    for f in incoming_files:
-        mime = _validate_allowed_mime_type(f.content_type)
-        doc_id = str(uuid.uuid4())
-        path, size, content_hash = storage.save_upload_file(
-            settings.object_store_root, tenant.tenant_id, dataset_id, doc_id, f
-        )
-        if size > settings.max_file_size_mb * 1024 * 1024:
-            _cleanup_document_store(tenant.tenant_id, dataset_id, doc_id)
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large; max {settings.max_file_size_mb} MB",
-            )
-        dup = find_duplicate_document(db, tenant.tenant_id, dataset_id, content_hash)
-        if dup:
-            _cleanup_document_store(tenant.tenant_id, dataset_id, doc_id)
-            continue  # skip duplicates
-        uploads.append((doc_id, f.filename or "upload", mime, size, path, content_hash, None))
+    claimed = _parse_if_none_match(if_none_match)
+    known = find_existing_hashes(db, tenant.tenant_id, dataset_id, [h for h in claimed if h != "*"])
+    staged: List[tuple[str, str, storage.StagedFile]] = []  # (filename, mime, staged file)
+    try:
+        if remote_uris:
+            staged.extend(await run_in_threadpool(_fetch_source_uris, remote_uris))
+        skipped = 0
+        for idx, f in enumerate(incoming_files):
+            mime = _validate_allowed_mime_type(f.content_type)
+            expected = claimed[idx] if idx < len(claimed) else None
+            if expected in known:
+                skipped += 1  # duplicate announced by the client: no bytes are written
+                continue
+            try:
+                item = storage.stage_upload_file(
+                    settings.object_store_root, f, max_bytes=settings.max_file_size_mb * 1024 * 1024
+                )
+            except storage.FileTooLarge as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File too large; max {settings.max_file_size_mb} MB",
+                ) from exc
+            staged.append((f.filename or "upload", mime, item))
+            if expected and expected != "*" and item.content_hash != expected:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Content hash mismatch for {f.filename or 'upload'}",
+                )
+        if claimed and skipped and not staged:
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="All files already exist")
+    except BaseException:
+        for _, _, item in staged:
+            storage.discard_staged(item)
+        raise
+
+    existing = find_existing_hashes(db, tenant.tenant_id, dataset_id, [item.content_hash for _, _, item in staged])
+    uploads = []
+    try:
+        for filename, mime, item in staged:
+            if item.content_hash in existing:
+                storage.discard_staged(item)
+                continue
+            existing[item.content_hash] = ""  # later copies in this request are duplicates too
+            doc_id = str(uuid.uuid4())
+            path = storage.commit_staged(settings.object_store_root, item, tenant.tenant_id, dataset_id, doc_id, filename)
+            uploads.append((doc_id, filename, mime, item.size, path, item.content_hash, None))
+    except BaseException:
+        for _, _, item in staged:
+            storage.discard_staged(item)  # no-op for files already moved into place
+        raise
     if not uploads:
         return DocumentUploadResponse(job_ids=[])
     docs = services.record_documents(db, tenant.tenant_id, dataset_id, uploads)
@@ -426,12 +503,97 @@ async def upload_documents(
     return job_resp
 
 
+@router.post("/documents/bulk", status_code=status.HTTP_202_ACCEPTED, tags=["documents"], response_model=BulkImportResponse)
+async def bulk_import_documents(
+    payload: BulkImportRequest,
+    tenant: TenantContext = Depends(get_tenant),
+    db: Session = Depends(get_db),
+) -> BulkImportResponse:
+    """
+    Register up to `bulk_import_max_items` documents from a manifest of S3 keys (objects already
+    under `<s3_prefix>/imports/<tenant_id>/`) or URLs (fetched by the workers). Entries with a
+    known `content_hash` that the dataset already holds are skipped; the rest are ingested by
+    batched jobs, one per `bulk_ingest_batch_size` documents.
+    """
+    if len(payload.items) > settings.bulk_import_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many items; max {settings.bulk_import_max_items}",
+        )
+    dataset = services.ensure_dataset(db, tenant.tenant_id, payload.dataset_id)
+    rows = []
+    for idx, item in enumerate(payload.items):
+        if bool(item.s3_key) == bool(item.url):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Item {idx}: exactly one of s3_key or url is required",
+            )
+        mime = _validate_allowed_mime_type(item.mime_type) if item.mime_type else None
+        path = None
+        if item.s3_key:
+            if not storage.is_s3_backend():
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="s3_key imports require the S3 backend")
+            if not mime:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Item {idx}: mime_type is required for s3_key")
+            try:
+                path = storage.import_s3_path(tenant.tenant_id, item.s3_key)
+            except ValueError as exc:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Item {idx}: {exc}") from exc
+        elif urlparse(item.url).scheme not in ("http", "https"):
+            # the full is_safe_url check resolves DNS, so it runs in the worker right before fetching
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Item {idx}: Invalid or unsafe source_uri")
+        source = item.s3_key or item.url
+        rows.append(
+            {
+                "path": path,
+                "source_uri": item.url,
+                "filename": item.filename or Path(urlparse(source).path).name or "remote",
+                "mime_type": mime,
+                "size_bytes": item.size_bytes,
+                "content_hash": item.content_hash.lower() if item.content_hash else None,
+                "language": item.language,
+            }
+        )
+    return services.create_bulk_import(db, tenant.tenant_id, dataset, rows)
+
+
+@router.head("/datasets/{dataset_id}/hashes/{content_hash}", tags=["documents"])
+async def head_content_hash(
+    dataset_id: str,
+    content_hash: str,
+    tenant: TenantContext = Depends(get_tenant),
+    db: Session = Depends(get_db),
+) -> Response:
+    """200 with `X-Document-Id` when a live document with this SHA-256 exists in the dataset, else 404."""
+    services.ensure_dataset(db, tenant.tenant_id, dataset_id)
+    existing = find_existing_hashes(db, tenant.tenant_id, dataset_id, [content_hash.lower()])
+    if not existing:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    return Response(status_code=status.HTTP_200_OK, headers={"X-Document-Id": next(iter(existing.values()))})
+
+
+@router.post("/datasets/{dataset_id}/hashes/check", tags=["documents"], response_model=ContentHashCheckResponse)
+async def check_content_hashes(
+    dataset_id: str,
+    payload: ContentHashCheckRequest,
+    tenant: TenantContext = Depends(get_tenant),
+    db: Session = Depends(get_db),
+) -> ContentHashCheckResponse:
+    """Which of the given SHA-256 hashes already exist in the dataset; re-sync jobs upload only the rest."""
+    services.ensure_dataset(db, tenant.tenant_id, dataset_id)
+    hashes = [h.lower() for h in payload.content_hashes]
+    existing = find_existing_hashes(db, tenant.tenant_id, dataset_id, hashes)
+    return ContentHashCheckResponse(existing=existing, missing=[h for h in hashes if h not in existing])
+
+
 @router.post("/documents/upload", status_code=status.HTTP_202_ACCEPTED, tags=["documents"], response_model=DocumentUploadResponse)
 async def upload_documents_form(
     dataset_id: str = Form(...),
     file: Optional[UploadFile] = File(default=None),
     files: Optional[List[UploadFile]] = File(default=None),
     source_uri: Optional[str] = Form(default=None),
+    source_uris: Annotated[Optional[List[str]], Form()] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     tenant: TenantContext = Depends(get_tenant),
     db: Session = Depends(get_db),
 ) -> DocumentUploadResponse:
@@ -447,6 +609,8 @@ async def upload_documents_form(
         dataset_id=dataset_id,
         files=incoming_files or None,
         source_uri=source_uri,
+        source_uris=source_uris,
+        if_none_match=if_none_match,
         tenant=tenant,
         db=db,
     )
@@ -457,15 +621,20 @@ async def list_documents(
     dataset_id: Optional[str] = None,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     tenant: TenantContext = Depends(get_tenant),
     db: Session = Depends(get_db),
 ) -> DocumentListResponse:
-    """List documents with pagination. Optionally filter by dataset_id."""
+    """
+    List documents with pagination. Optionally filter by dataset_id.
+    Pass the returned `next_cursor` as `cursor` to page deep into large datasets.
+    """
     if page < 1:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Page must be >= 1")
     if page_size < 1 or page_size > 100:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Page size must be between 1 and 100")
-    return services.list_documents(db, tenant.tenant_id, dataset_id, page, page_size)
+    return services.list_documents(db, tenant.tenant_id, dataset_id, page, page_size, cursor=cursor, include_total=include_total)
 
 
 @router.get("/documents/{document_id}", tags=["documents"], response_model=DocumentOut)
@@ -491,8 +660,8 @@ async def update_document(
 
 @router.delete("/datasets/{dataset_id}", status_code=status.HTTP_202_ACCEPTED, tags=["datasets"])
 async def delete_dataset(dataset_id: str, tenant: TenantContext = Depends(get_tenant), db: Session = Depends(get_db)):
-    services.soft_delete_dataset(db, tenant.tenant_id, dataset_id)
-    return {"status": "accepted", "dataset_id": dataset_id}
+    job_id = services.soft_delete_dataset(db, tenant.tenant_id, dataset_id)
+    return {"status": "accepted", "dataset_id": dataset_id, "job_id": job_id}
 
 
 @router.delete("/documents/{document_id}", status_code=status.HTTP_202_ACCEPTED, tags=["documents"])
@@ -501,10 +670,17 @@ async def delete_document(document_id: str, tenant: TenantContext = Depends(get_
     return {"status": "accepted", "document_id": document_id}
 
 
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
 @router.get("/documents/{document_id}/download", tags=["documents"])
 async def download_document(
     document_id: str,
-    background_tasks: BackgroundTasks,
+    request: Request,
     tenant: TenantContext = Depends(get_tenant),
     db: Session = Depends(get_db),
 ):
@@ -522,13 +698,23 @@ async def download_document(
     filename = doc.filename or Path(doc.path).name or doc.id
     media_type = doc.mime_type or "application/octet-stream"
     if storage.is_s3_path(doc.path):
+        if settings.s3_download_redirect:
+            url = storage.presigned_download_url(doc.path, filename, media_type, settings.s3_presign_expiry_seconds)
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        # proxy the object body as it arrives instead of staging it in a temp file
         try:
-            local_path, cleanup = storage.download_to_temp(doc.path)
-        except Exception:
+            obj = await run_in_threadpool(
+                storage.stream_s3_object,
+                doc.path,
+                request.headers.get("range"),
+                request.headers.get("if-none-match"),
+            )
+        except FileNotFoundError:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document file not found")
-        if cleanup:
-            background_tasks.add_task(cleanup)
-        return FileResponse(local_path, filename=filename, media_type=media_type, background=background_tasks)
+        if obj.body is None:
+            return Response(status_code=obj.status_code, headers=obj.headers)
+        headers = {**obj.headers, "Content-Disposition": _content_disposition(filename)}
+        return StreamingResponse(obj.body, status_code=obj.status_code, headers=headers, media_type=media_type)
     path = Path(doc.path).resolve()
     root = Path(settings.object_store_root).resolve()
     if root not in path.parents or not path.is_file():
@@ -543,7 +729,11 @@ async def get_job(job_id: str, tenant: TenantContext = Depends(get_tenant), db:
 
 @router.post("/query", tags=["query"], response_model=QueryResponse)
 async def query(request: QueryRequest, tenant: TenantContext = Depends(get_tenant), db: Session = Depends(get_db)) -> QueryResponse:
-    rewritten = rewriter.rewrite_query(request.query, tenant.tenant_id) if request.rewrite else None
+    started = time.perf_counter()
+    rewritten = None
+    if request.rewrite:
+        with QUERY_STAGE_SECONDS.time(stage="rewrite"):
+            rewritten = rewriter.rewrite_query(request.query, tenant.tenant_id)
     qtext = rewritten or request.query
     
     # Use the first dataset's embedder and rerank settings if specified, otherwise default
@@ -568,12 +758,17 @@ async def query(request: QueryRequest, tenant: TenantContext = Depends(get_tenan
     if rerank_enabled and rerank_top_k:
         retrieval_k = max(request.k, rerank_top_k)
 
-    vector = embedder.embed_texts([qtext], model_name=query_embedder)[0]
+    with QUERY_STAGE_SECONDS.time(stage="embed"):
+        vector = embedder.embed_texts([qtext], model_name=query_embedder)[0]
     dataset_ids = request.dataset_ids or []
-    results_raw = vs.query(tenant.tenant_id, dataset_ids, vector, k=retrieval_k, filters=request.filters)
+    with QUERY_STAGE_SECONDS.time(stage="vector_search"):
+        results_raw = providers.vector_store().query(tenant.tenant_id, dataset_ids, vector, k=retrieval_k, filters=request.filters)
     bm25_hits = []
+    bm25_client = providers.bm25_client()
     if settings.enable_bm25 and dataset_ids and bm25_client:
-        bm25_hits = bm25_client.search(tenant.tenant_id, dataset_ids, qtext, k=retrieval_k)
+        with QUERY_STAGE_SECONDS.time(stage="bm25_search"):
+            # the in-memory fallback may load a dataset on its first search; keep that off the event loop
+            bm25_hits = await run_in_threadpool(bm25_client.search, tenant.tenant_id, dataset_ids, qtext, k=retrieval_k)
     # results_raw expected format: list of dict with payload keys
     results = []
     for hit in results_raw:
@@ -620,13 +815,14 @@ async def query(request: QueryRequest, tenant: TenantContext = Depends(get_tenan
     rerank_applied = False
     rerank_applied_model = None
     if rerank_enabled:
-        reranked, rerank_applied, rerank_applied_model = reranker.rerank_with_metadata(
-            qtext,
-            merged_list,
-            model_name=rerank_model,
-            top_k=rerank_top_k,
-            min_score=rerank_min_score,
-        )
+        with QUERY_STAGE_SECONDS.time(stage="rerank"):
+            reranked, rerank_applied, rerank_applied_model = reranker.rerank_with_metadata(
+                qtext,
+                merged_list,
+                model_name=rerank_model,
+                top_k=rerank_top_k,
+                min_score=rerank_min_score,
+            )
     else:
         reranked = merged_list
     reranked = reranked[: request.k]
@@ -636,9 +832,20 @@ async def query(request: QueryRequest, tenant: TenantContext = Depends(get_tenan
             allowed_chat_models = get_allowed_model_names(db, ModelType.chat)
             if request.answer_model not in allowed_chat_models:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Chat model not allowed")
-        answer = answerer.generate_answer(request.query, reranked, request.answer_model)
+        with QUERY_STAGE_SECONDS.time(stage="answer"):
+            answer = answerer.generate_answer(request.query, reranked, request.answer_model)
+    elapsed = time.perf_counter() - started
+    QUERY_SECONDS.observe(elapsed)
     try:
-        services.log_query(db, tenant.tenant_id, request.query, request.dataset_ids)
+        services.log_query(
+            tenant.tenant_id,
+            request.query,
+            request.dataset_ids,
+            latency_ms=elapsed * 1000,
+            hit_count=len(reranked),
+            rerank_applied=rerank_applied,
+            answered=answer is not None,
+        )
     except Exception:
         pass
     return QueryResponse(
@@ -655,6 +862,8 @@ async def query(request: QueryRequest, tenant: TenantContext = Depends(get_tenan
 async def query_history(
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     tenant: TenantContext = Depends(get_tenant),
     db: Session = Depends(get_db),
 ) -> QueryHistoryResponse:
@@ -662,18 +871,19 @@ async def query_history(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Page must be >= 1")
     if page_size < 1 or page_size > 100:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Page size must be between 1 and 100")
-    return services.list_query_history(db, tenant.tenant_id, page, page_size)
+    return services.list_query_history(db, tenant.tenant_id, page, page_size, cursor=cursor, include_total=include_total)
 
 
 @router.get("/query/stats/daily", tags=["query"], response_model=QueryDailyStatsResponse)
 async def query_daily_stats(
     days: int = 14,
+    dataset_id: Optional[str] = None,
     tenant: TenantContext = Depends(get_tenant),
     db: Session = Depends(get_db),
 ) -> QueryDailyStatsResponse:
     if days < 1 or days > 90:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="days must be between 1 and 90")
-    return services.get_query_daily_stats(db, tenant.tenant_id, days)
+    return services.get_query_daily_stats(db, tenant.tenant_id, days, dataset_id)
 
 
 @router.post("/reindex", status_code=status.HTTP_202_ACCEPTED, tags=["maintenance"])
@@ -0,0 +1,124 @@
+import logging
+import os
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+from app.config import get_settings
+from core import metrics
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BackgroundExecutor:
+    """
+    Small in-process job runner for installs without a Celery worker: a fixed set of daemon
+    threads reading a bounded queue. Jobs report progress through their Job rows, so the
+    caller only needs to know whether the job was accepted. `on_idle` runs on a worker thread
+    whenever the queue drains, so work that did not fit can be handed over then.
+    """
+
+    def __init__(self, workers: int, max_queued: int, on_idle: Optional[Callable[[], None]] = None):
+        self.workers = max(1, workers)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_queued))
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._on_idle = on_idle
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"raglite-bg-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                fn, args = item
+                try:
+                    fn(*args)
+                except Exception:
+                    # pipeline functions mark their Job failed before re-raising
+                    logger.exception("Background job %s failed", getattr(fn, "__name__", fn))
+            finally:
+                self._queue.task_done()
+            if self._on_idle is not None and self._queue.empty():
+                try:
+                    self._on_idle()
+                except Exception:
+                    logger.exception("Background idle hook failed")
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """Queue `fn(*args)`; False when the queue is full so the caller can apply backpressure."""
+        self._start()
+        try:
+            self._queue.put_nowait((fn, args))
+        except queue.Full:
+            return False
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def free_slots(self) -> int:
+        return max(self._queue.maxsize - self._queue.qsize(), 0)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Let queued jobs finish, then stop the threads."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+
+_executor: Optional[BackgroundExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+_idle_hooks: List[Callable[[], None]] = []
+metrics.gauge(
+    "raglite_background_jobs_pending",
+    "Jobs waiting on the in-process background executor",
+    fn=lambda: _executor.pending() if _executor is not None and _executor_pid == os.getpid() else 0,
+)
+
+
+def on_idle(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register `hook` to run whenever the process-wide executor's queue drains."""
+    _idle_hooks.append(hook)
+    return hook
+
+
+def _run_idle_hooks() -> None:
+    for hook in _idle_hooks:
+        hook()
+
+
+def get_background_executor() -> BackgroundExecutor:
+    """Process-wide executor; rebuilt after fork since threads do not survive it."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = BackgroundExecutor(
+                settings.background_workers, settings.background_queue_size, on_idle=_run_idle_hooks
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def shutdown_background_executor(timeout: Optional[float] = None) -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None and _executor_pid == os.getpid():
+        executor.shutdown(timeout)
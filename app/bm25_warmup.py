@@ -0,0 +1,131 @@
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import func
+
+from app.config import get_settings
+from core import metrics
+from core.bm25_memory import MemoryBM25
+from infra import models
+from infra.db import SessionLocal
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupStatus:
+    backend: str = "disabled"  # disabled|opensearch|memory
+    mode: str = "off"  # lazy|background|off
+    state: str = "idle"  # idle|running|done|failed|skipped
+    datasets_total: int = 0
+    datasets_loaded: int = 0
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        # lazy loading serves each dataset on demand, so only a background warm-up gates readiness
+        return self.mode != "background" or self.state in ("done", "skipped")
+
+
+status = WarmupStatus()
+metrics.gauge("raglite_bm25_warmup_ready", "1 when BM25 warm-up no longer holds back readiness (see /ready)", fn=lambda: status.ready)
+
+
+def iter_dataset_chunks(tenant_id: str, dataset_id: str) -> Iterator[dict]:
+    """Stream one dataset's live chunks in pages of `bm25_warmup_page_size` rows."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(models.Chunk.id, models.Chunk.text, models.Chunk.document_id, models.Chunk.meta)
+            .join(models.Document, models.Document.id == models.Chunk.document_id)
+            .filter(
+                models.Chunk.tenant_id == tenant_id,
+                models.Chunk.dataset_id == dataset_id,
+                models.Document.deleted_at.is_(None),
+            )
+            .yield_per(settings.bm25_warmup_page_size)
+        )
+        for row in rows:
+            yield {"id": row.id, "text": row.text, "document_id": row.document_id, "meta": row.meta or {}}
+    finally:
+        db.close()
+
+
+def count_dataset_chunks(tenant_id: str, dataset_id: str) -> int:
+    """Live chunks of one dataset, to validate a BM25 snapshot before trusting it."""
+    db = SessionLocal()
+    try:
+        return (
+            db.query(func.count(models.Chunk.id))
+            .join(models.Document, models.Document.id == models.Chunk.document_id)
+            .filter(
+                models.Chunk.tenant_id == tenant_id,
+                models.Chunk.dataset_id == dataset_id,
+                models.Document.deleted_at.is_(None),
+            )
+            .scalar()
+        )
+    finally:
+        db.close()
+
+
+def _warm_all(index: MemoryBM25) -> None:
+    status.state = "running"
+    status.started_at = datetime.utcnow().isoformat()
+    db = SessionLocal()
+    try:
+        pairs = (
+            db.query(models.Dataset.tenant_id, models.Dataset.id)
+            .filter(models.Dataset.deleted_at.is_(None))
+            .all()
+        )
+    except Exception as exc:
+        status.state, status.error = "failed", str(exc)
+        logger.warning("BM25 warm-up could not list datasets", exc_info=True)
+        return
+    finally:
+        db.close()
+    status.datasets_total = len(pairs)
+    for tenant_id, dataset_id in pairs:
+        try:
+            index.ensure_loaded(tenant_id, dataset_id)
+        except Exception:
+            # the dataset is retried lazily on its next search
+            logger.warning("BM25 warm-up failed for dataset %s", dataset_id, exc_info=True)
+        status.datasets_loaded += 1
+    status.state = "done"
+    status.finished_at = datetime.utcnow().isoformat()
+
+
+def start(client) -> WarmupStatus:
+    """
+    Prepare the in-memory BM25 fallback without blocking startup. Persistent backends
+    (OpenSearch) already hold their data and are skipped. `bm25_warmup` picks the strategy:
+    lazy (load each dataset on its first query), background (also stream all datasets in a
+    thread) or off.
+    """
+    status.mode = settings.bm25_warmup
+    if client is None:
+        status.backend, status.state = "disabled", "skipped"
+        return status
+    if not isinstance(client, MemoryBM25):
+        status.backend, status.state = "opensearch", "skipped"
+        return status
+    status.backend = "memory"
+    if settings.bm25_warmup == "off":
+        status.state = "skipped"
+        return status
+    client.set_loader(iter_dataset_chunks, count_dataset_chunks)
+    if settings.bm25_warmup == "background":
+        threading.Thread(target=_warm_all, args=(client,), name="raglite-bm25-warmup", daemon=True).start()
+    return status
+
+
+def snapshot() -> dict:
+    return {**asdict(status), "ready": status.ready}
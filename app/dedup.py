@@ -1,19 +1,44 @@
-from typing import Optional
+from typing import Dict, Iterable, List
 
 from sqlalchemy.orm import Session
 
 from infra import models
 
 
-def find_duplicate_document(db: Session, tenant_id: str, dataset_id: str, content_hash: str) -> Optional[models.Document]:
-    return (
-        db.query(models.Document)
-        .filter(
-            models.Document.tenant_id == tenant_id,
-            models.Document.dataset_id == dataset_id,
-            models.Document.content_hash == content_hash,
-            models.Document.deleted_at.is_(None),
+def unreferenced_paths(db: Session, tenant_id: str, paths: Iterable[str]) -> List[str]:
+    """The stored paths no live document (in a live dataset) points at any more, safe to delete."""
+    paths = list(dict.fromkeys(p for p in paths if p))
+    live = set()
+    for i in range(0, len(paths), 1000):
+        rows = (
+            db.query(models.Document.path)
+            .join(models.Dataset, models.Dataset.id == models.Document.dataset_id)
+            .filter(
+                models.Document.tenant_id == tenant_id,
+                models.Document.path.in_(paths[i : i + 1000]),
+                models.Document.deleted_at.is_(None),
+                models.Dataset.deleted_at.is_(None),
+            )
         )
-        .first()
-    )
+        live.update(row.path for row in rows)
+    return [p for p in paths if p not in live]
 
+
+def find_existing_hashes(db: Session, tenant_id: str, dataset_id: str, content_hashes: Iterable[str]) -> Dict[str, str]:
+    """content_hash -> document id for the hashes already stored in the dataset (one IN query per 1000)."""
+    hashes = list(dict.fromkeys(h for h in content_hashes if h))
+    found: Dict[str, str] = {}
+    for i in range(0, len(hashes), 1000):
+        rows = (
+            db.query(models.Document.content_hash, models.Document.id)
+            .filter(
+                models.Document.tenant_id == tenant_id,
+                models.Document.dataset_id == dataset_id,
+                models.Document.content_hash.in_(hashes[i : i + 1000]),
+                models.Document.deleted_at.is_(None),
+            )
+            .all()
+        )
+        for content_hash, doc_id in rows:
+            found.setdefault(content_hash, doc_id)
+    return found
@@ -2,20 +2,25 @@ import logging
 import os
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
+from sqlalchemy import text
 
+from app import bm25_warmup, tasks
 from app.api import api_router
+from app.background import shutdown_background_executor
+from app.query_log import close_query_log_writer
 from app.config import get_settings
 from app.deps import register_api_key
 from infra.db import Base, engine, SessionLocal
-from core import opensearch_bm25, storage
-from infra import models
+from core import metrics, providers, storage
 
 settings = get_settings()
 logging.basicConfig(level=settings.log_level)
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.app_name,
@@ -45,7 +50,7 @@ def custom_openapi():
     }
     # Apply security to all protected endpoints
     for path, path_item in openapi_schema["paths"].items():
-        if path in ["/health", "/health/storage"]:
+        if path in ["/health", "/health/storage", "/ready", "/metrics"]:
             continue
         for method in path_item:
             if method in ["get", "post", "put", "delete", "patch"]:
@@ -70,42 +75,29 @@ if settings.allowed_origins:
 @app.on_event("startup")
 async def bootstrap_api_key():
     Base.metadata.create_all(bind=engine)
+    await run_in_threadpool(sweep_staging)
+    if tasks.execution_mode() == "background":
+        # jobs accepted by a process that stopped before running them
+        await run_in_threadpool(tasks.requeue_pending_jobs)
     if settings.enable_bootstrap and settings.bootstrap_api_key and settings.bootstrap_tenant_id:
         register_api_key(settings.bootstrap_api_key, settings.bootstrap_tenant_id)
-    if settings.enable_bm25:
-        client = opensearch_bm25.get_bm25_client()
-        if client:
-            try:
-                db = SessionLocal()
-                pairs = (
-                    db.query(
-                        models.Chunk.dataset_id.label("dataset_id"),
-                        models.Chunk.tenant_id.label("tenant_id"),
-                    )
-                    .distinct()
-                    .all()
-                )
-                for pair in pairs:
-                    chunks = (
-                        db.query(models.Chunk)
-                        .filter(
-                            models.Chunk.dataset_id == pair.dataset_id,
-                            models.Chunk.tenant_id == pair.tenant_id,
-                        )
-                        .all()
-                    )
-                    items = [
-                        {"id": ch.id, "text": ch.text, "document_id": ch.document_id, "meta": ch.meta or {}}
-                        for ch in chunks
-                    ]
-                    client.index_documents(pair.tenant_id, pair.dataset_id, items)
-            except Exception:
-                pass
-            finally:
-                try:
-                    db.close()
-                except Exception:
-                    pass
+    # BM25 is warmed lazily (or in a background thread) so startup does not scale with the corpus
+    bm25_warmup.start(providers.bm25_client())
+
+
+def sweep_staging() -> None:
+    """Remove uploads staged by processes that died before committing or discarding them."""
+    try:
+        storage.sweep_staging(settings.object_store_root, settings.staging_max_age_hours * 3600)
+    except Exception:
+        logger.exception("Sweeping the staging area failed")
+
+
+@app.on_event("shutdown")
+def drain_background_jobs():
+    shutdown_background_executor(timeout=30)
+    close_query_log_writer(timeout=5)
+    providers.close_all()
 
 
 @app.get("/health", tags=["meta"])
@@ -113,6 +105,31 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/ready", tags=["meta"])
+def ready():
+    """Readiness, separate from liveness (/health): database reachable and BM25 warm-up finished."""
+    body = {"database": True, "bm25": bm25_warmup.snapshot()}
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception:
+        body["database"] = False
+    finally:
+        db.close()
+    body["ready"] = body["database"] and body["bm25"]["ready"]
+    if not body["ready"]:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
+
+
+if settings.enable_metrics:
+
+    @app.get("/metrics", tags=["meta"], response_class=Response)
+    def prometheus_metrics():
+        """Stage latencies, cache/fallback counters and queue gauges of this process (Prometheus text format)."""
+        return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/health/storage", tags=["meta"])
 async def storage_health():
     if not storage.is_s3_backend():
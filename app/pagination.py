@@ -0,0 +1,82 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from app.config import get_settings
+from core.metrics import CACHE_REQUESTS
+
+settings = get_settings()
+# key -> (stored at, count); least recently used first, at most list_count_cache_max_entries
+_COUNT_CACHE: "OrderedDict[Tuple, Tuple[float, int]]" = OrderedDict()
+_count_lock = threading.Lock()
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of `encode_cursor`; ValueError for anything that did not come from it."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(row_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def keyset_page(query: Query, created_col, id_col, limit: int, cursor: Optional[str] = None, offset: int = 0) -> Tuple[List[Any], Optional[str]]:
+    """
+    Newest-first page on (created_at, id). With a cursor the query seeks past the last row seen
+    instead of skipping `offset` rows, so page 10,000 costs the same as page 1.
+    Returns the rows and the cursor for the next page (None on the last page).
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_col, id_col) < tuple_(created_at, row_id))
+    query = query.order_by(created_col.desc(), id_col.desc())
+    if offset and not cursor:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+
+
+def cached_count(key: Tuple, count: Callable[[], int]) -> int:
+    """
+    Row count reused for `list_count_cache_ttl_seconds`, so paging through a large dataset
+    does not run a full COUNT on every page view. Totals may lag recent writes by the TTL.
+    """
+    now = time.time()
+    with _count_lock:
+        hit = _COUNT_CACHE.get(key)
+        if hit and now - hit[0] < settings.list_count_cache_ttl_seconds:
+            _COUNT_CACHE.move_to_end(key)
+            CACHE_REQUESTS.inc(cache="list_count", result="hit")
+            return hit[1]
+    CACHE_REQUESTS.inc(cache="list_count", result="miss")
+    value = count()
+    with _count_lock:
+        _COUNT_CACHE[key] = (now, value)
+        _COUNT_CACHE.move_to_end(key)
+        while len(_COUNT_CACHE) > max(settings.list_count_cache_max_entries, 0):
+            _COUNT_CACHE.popitem(last=False)
+    return value
+
+
+def invalidate_counts(*keys: Tuple) -> None:
+    """Drop cached counts after writes that change them, so the next page view recounts."""
+    with _count_lock:
+        for key in keys:
+            _COUNT_CACHE.pop(key, None)
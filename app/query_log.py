@@ -0,0 +1,168 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from app import query_stats
+from app.config import get_settings
+from core import metrics
+from infra import models
+from infra.db import SessionLocal
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class QueryLogWriter:
+    """
+    Buffers query log rows in memory and writes them with one multi-row INSERT per flush,
+    off the request path; the same transaction folds them into the daily rollups. A flush
+    happens every `flush_seconds`, as soon as `batch_size` rows are waiting, and on shutdown.
+    When the database is unreachable the buffer keeps at most `max_buffer` rows and drops the
+    oldest; recording never raises.
+    """
+
+    def __init__(self, flush_seconds: float, batch_size: int, max_buffer: int):
+        self.flush_seconds = flush_seconds
+        self.batch_size = max(1, batch_size)
+        self._buffer: deque = deque(maxlen=max(1, max_buffer))
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def record(
+        self,
+        tenant_id: str,
+        query_text: str,
+        dataset_ids: Optional[List[str]] = None,
+        latency_ms: Optional[float] = None,
+        hit_count: Optional[int] = None,
+        rerank_applied: Optional[bool] = None,
+        answered: Optional[bool] = None,
+    ) -> None:
+        row = {
+            "id": str(uuid.uuid4()),
+            "tenant_id": tenant_id,
+            "dataset_ids": dataset_ids or [],
+            "query": query_text,
+            "created_at": datetime.utcnow(),
+            "latency_ms": latency_ms,
+            "hit_count": hit_count,
+            "rerank_applied": rerank_applied,
+            "answered": answered,
+        }
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        self._start()
+        if full:
+            self._wake.set()
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="raglite-query-log", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        next_maintenance = time.monotonic()
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+            if settings.query_log_maintenance_interval_seconds > 0 and time.monotonic() >= next_maintenance:
+                next_maintenance = time.monotonic() + settings.query_log_maintenance_interval_seconds
+                self.maintain()
+
+    def maintain(self) -> None:
+        """Monthly partitions and retention for the raw log (see `query_stats.run_maintenance`)."""
+        db = SessionLocal()
+        try:
+            query_stats.run_maintenance(db)
+        finally:
+            db.close()
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of rows stored."""
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._buffer)
+                self._buffer.clear()
+            if not rows:
+                return 0
+            db = SessionLocal()
+            try:
+                db.bulk_insert_mappings(models.QueryLog, rows)
+                query_stats.merge_rollups(db, rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.warning("Query log flush failed; keeping %d rows for the next attempt", len(rows), exc_info=True)
+                with self._lock:
+                    # re-queue ahead of newer rows; the bound drops the oldest on overflow
+                    merged = rows + list(self._buffer)
+                    self.dropped += max(len(merged) - self._buffer.maxlen, 0)
+                    self._buffer = deque(merged, maxlen=self._buffer.maxlen)
+                return 0
+            finally:
+                db.close()
+            return len(rows)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the flusher and write what is left."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+
+_writer: Optional[QueryLogWriter] = None
+_writer_pid: Optional[int] = None
+_writer_lock = threading.Lock()
+metrics.gauge(
+    "raglite_query_log_buffered",
+    "Query log rows buffered in memory, waiting for the next flush",
+    fn=lambda: _writer.pending() if _writer is not None and _writer_pid == os.getpid() else 0,
+)
+metrics.gauge(
+    "raglite_query_log_dropped",
+    "Query log rows dropped because the buffer was full while the database was unreachable",
+    fn=lambda: _writer.dropped if _writer is not None and _writer_pid == os.getpid() else 0,
+)
+
+
+def get_query_log_writer() -> QueryLogWriter:
+    """Process-wide writer; rebuilt after fork since the flusher thread does not survive it."""
+    global _writer, _writer_pid
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer = QueryLogWriter(
+                settings.query_log_flush_seconds, settings.query_log_batch_size, settings.query_log_max_buffer
+            )
+            _writer_pid = os.getpid()
+        return _writer
+
+
+def close_query_log_writer(timeout: Optional[float] = None) -> None:
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None and _writer_pid == os.getpid():
+        writer.close(timeout)
@@ -0,0 +1,214 @@
+import logging
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from infra import models
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+ALL_DATASETS = "*"
+# latency histogram bucket upper bounds; the last bucket counts everything slower
+LATENCY_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _empty_hist() -> List[int]:
+    return [0] * (len(LATENCY_BOUNDS_MS) + 1)
+
+
+def latency_percentile(hist: Optional[List[int]], q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-quantile (approximate, bucket resolution)."""
+    total = sum(hist or [])
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(hist):
+        seen += count
+        if seen >= rank:
+            return float(LATENCY_BOUNDS_MS[min(i, len(LATENCY_BOUNDS_MS) - 1)])
+    return float(LATENCY_BOUNDS_MS[-1])
+
+
+class _Rollup:
+    __slots__ = ("count", "latency_count", "latency_sum", "hist")
+
+    def __init__(self):
+        self.count = 0
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.hist = _empty_hist()
+
+    def add(self, latency_ms: Optional[float]) -> None:
+        self.count += 1
+        if latency_ms is None:
+            return
+        self.latency_count += 1
+        self.latency_sum += latency_ms
+        self.hist[bisect_left(LATENCY_BOUNDS_MS, latency_ms)] += 1
+
+
+def _group(rows: Iterable[dict]) -> Dict[Tuple[str, date, str], _Rollup]:
+    groups: Dict[Tuple[str, date, str], _Rollup] = {}
+    for row in rows:
+        day = row["created_at"].date()
+        for dataset_id in [ALL_DATASETS, *dict.fromkeys(row.get("dataset_ids") or [])]:
+            groups.setdefault((row["tenant_id"], day, dataset_id), _Rollup()).add(row.get("latency_ms"))
+    return groups
+
+
+def merge_rollups(db: Session, rows: List[dict]) -> None:
+    """
+    Fold freshly logged rows into `query_stats_daily` within the caller's transaction. Existing
+    rollup rows are locked (FOR UPDATE on Postgres) so concurrent API processes add up instead
+    of overwriting each other; a race on a brand-new row fails the flush, which is retried.
+    """
+    groups = _group(rows)
+    if not groups:
+        return
+    Stats = models.QueryStatsDaily
+    existing = {
+        (r.tenant_id, r.day, r.dataset_id): r
+        for r in db.query(Stats)
+        .filter(tuple_(Stats.tenant_id, Stats.day, Stats.dataset_id).in_(list(groups)))
+        .with_for_update()
+        .all()
+    }
+    for key, rollup in groups.items():
+        row = existing.get(key)
+        if row is None:
+            row = Stats(tenant_id=key[0], day=key[1], dataset_id=key[2], query_count=0, latency_count=0, latency_sum_ms=0.0)
+            db.add(row)
+        hist = list(row.latency_hist or _empty_hist())
+        row.latency_hist = [a + b for a, b in zip(hist, rollup.hist)]
+        row.query_count = (row.query_count or 0) + rollup.count
+        row.latency_count = (row.latency_count or 0) + rollup.latency_count
+        row.latency_sum_ms = (row.latency_sum_ms or 0.0) + rollup.latency_sum
+        row.latency_p50_ms = latency_percentile(row.latency_hist, 0.5)
+        row.latency_p95_ms = latency_percentile(row.latency_hist, 0.95)
+
+
+def daily_rollups(db: Session, tenant_id: str, start: date, dataset_id: Optional[str] = None) -> Dict[str, models.QueryStatsDaily]:
+    rows = (
+        db.query(models.QueryStatsDaily)
+        .filter(
+            models.QueryStatsDaily.tenant_id == tenant_id,
+            models.QueryStatsDaily.dataset_id == (dataset_id or ALL_DATASETS),
+            models.QueryStatsDaily.day >= start,
+        )
+        .all()
+    )
+    return {row.day.isoformat(): row for row in rows}
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _partition_name(month: date) -> str:
+    return f"query_logs_{month:%Y_%m}"
+
+
+def _log_partitions(db: Session) -> Dict[str, bool]:
+    """Partition name -> whether it is the DEFAULT partition, for the partitioned query_logs."""
+    rows = db.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT' FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'query_logs'"
+        )
+    )
+    return {name: bool(is_default) for name, is_default in rows}
+
+
+def ensure_log_partitions(db: Session, today: date, months_ahead: int = 1) -> None:
+    """
+    Create monthly query_logs partitions through `months_ahead` (Postgres, partitioned table
+    only), committing each one. Rows the DEFAULT partition already holds for a new month are
+    moved into it in the same transaction; Postgres refuses to create the partition otherwise.
+    """
+    if not _is_partitioned(db):
+        return
+    partitions = _log_partitions(db)
+    default = next((name for name, is_default in partitions.items() if is_default), None)
+    month = _month_start(today)
+    for _ in range(months_ahead + 1):
+        upper = _next_month(month)
+        name = _partition_name(month)
+        if name not in partitions:
+            bounds = {"lower": datetime.combine(month, datetime.min.time()), "upper": datetime.combine(upper, datetime.min.time())}
+            if default:
+                db.execute(text("CREATE TEMP TABLE _moved_query_logs (LIKE query_logs) ON COMMIT DROP"))
+                db.execute(
+                    text(
+                        f"WITH moved AS (DELETE FROM {default} WHERE created_at >= :lower AND created_at < :upper RETURNING *) "
+                        "INSERT INTO _moved_query_logs SELECT * FROM moved"
+                    ),
+                    bounds,
+                )
+            db.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF query_logs "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+                )
+            )
+            if default:
+                db.execute(text("INSERT INTO query_logs SELECT * FROM _moved_query_logs"))
+            db.commit()
+        month = upper
+
+
+def prune_query_logs(db: Session, now: datetime) -> int:
+    """
+    Apply `query_log_retention_days`: drop whole monthly partitions that are past it, then
+    delete older stragglers. Rollups are kept, so dashboards still cover pruned days.
+    """
+    if settings.query_log_retention_days <= 0:
+        return 0
+    cutoff = now - timedelta(days=settings.query_log_retention_days)
+    if _is_partitioned(db):
+        for name, is_default in _log_partitions(db).items():
+            if is_default:
+                continue
+            try:
+                month = datetime.strptime(name, "query_logs_%Y_%m").date()
+            except ValueError:
+                continue
+            if _next_month(month) <= cutoff.date():
+                db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    return db.query(models.QueryLog).filter(models.QueryLog.created_at < cutoff).delete(synchronize_session=False)
+
+
+def run_maintenance(db: Session, now: Optional[datetime] = None) -> None:
+    """Partition creation and retention run in separate transactions, so one failing does not undo the other."""
+    now = now or datetime.utcnow()
+    try:
+        ensure_log_partitions(db, now.date())
+    except Exception:
+        db.rollback()
+        logger.warning("Creating query log partitions failed", exc_info=True)
+    try:
+        pruned = prune_query_logs(db, now)
+        db.commit()
+        if pruned:
+            logger.info("Pruned %d query log rows past retention", pruned)
+    except Exception:
+        db.rollback()
+        logger.warning("Pruning query logs failed", exc_info=True)
+
+
+def _is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(
+        db.execute(text("SELECT 1 FROM pg_partitioned_table t JOIN pg_class c ON c.oid = t.partrelid WHERE c.relname = 'query_logs'")).first()
+    )
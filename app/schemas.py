@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field, conint, ConfigDict
+from pydantic import BaseModel, Field, conint, constr, ConfigDict
 
 
 class TenantCreate(BaseModel):
@@ -23,6 +23,7 @@ class DatasetCreate(BaseModel):
     rerank_model: Optional[str] = None
     rerank_top_k: Optional[conint(gt=0, le=200)] = None
     rerank_min_score: Optional[float] = Field(default=None, ge=0, le=1)
+    chunk_strategy: Optional[str] = None
 
 
 class DatasetUpdate(BaseModel):
@@ -34,6 +35,7 @@ class DatasetUpdate(BaseModel):
     rerank_model: Optional[str] = None
     rerank_top_k: Optional[conint(gt=0, le=200)] = None
     rerank_min_score: Optional[float] = Field(default=None, ge=0, le=1)
+    chunk_strategy: Optional[str] = None
 
 
 class DatasetOut(BaseModel):
@@ -47,6 +49,7 @@ class DatasetOut(BaseModel):
     rerank_model: Optional[str] = None
     rerank_top_k: Optional[int] = None
     rerank_min_score: Optional[float] = None
+    chunk_strategy: Optional[str] = None
     created_at: datetime
 
 
@@ -62,6 +65,38 @@ class JobOut(BaseModel):
     error: Optional[str] = None
 
 
+class ContentHashCheckRequest(BaseModel):
+    content_hashes: List[constr(pattern=r"^[0-9a-fA-F]{64}$")] = Field(default_factory=list, max_length=10000)
+
+
+class ContentHashCheckResponse(BaseModel):
+    existing: Dict[str, str] = Field(default_factory=dict)  # content_hash -> document_id
+    missing: List[str] = Field(default_factory=list)
+
+
+class BulkImportItem(BaseModel):
+    """One manifest entry: an object already in the bucket (`s3_key`) or a URL fetched by the worker."""
+
+    s3_key: Optional[str] = None
+    url: Optional[str] = None
+    filename: Optional[str] = None
+    mime_type: Optional[str] = None
+    content_hash: Optional[constr(pattern=r"^[0-9a-fA-F]{64}$")] = None
+    size_bytes: Optional[conint(ge=0)] = None
+    language: Optional[str] = None
+
+
+class BulkImportRequest(BaseModel):
+    dataset_id: str
+    items: List[BulkImportItem] = Field(min_length=1)
+
+
+class BulkImportResponse(BaseModel):
+    job_ids: List[str] = Field(default_factory=list)
+    accepted: int = 0
+    duplicates: int = 0
+
+
 class DocumentOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -82,10 +117,11 @@ class DocumentUpdate(BaseModel):
 
 class DocumentListResponse(BaseModel):
     items: List[DocumentOut] = Field(default_factory=list)
-    total: int
-    page: int
+    total: Optional[int] = None  # cached count; None when include_total=false
+    page: Optional[int] = None  # None for cursor requests
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class QueryRequest(BaseModel):
@@ -123,20 +159,25 @@ class QueryHistoryItem(BaseModel):
     tenant_id: str
     dataset_ids: Optional[List[str]] = None
     query: str
+    latency_ms: Optional[float] = None
+    hit_count: Optional[int] = None
     created_at: str
 
 
 class QueryHistoryResponse(BaseModel):
     items: List[QueryHistoryItem] = Field(default_factory=list)
-    total: int
-    page: int
+    total: Optional[int] = None  # cached count; None when include_total=false
+    page: Optional[int] = None  # None for cursor requests
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class QueryDailyStat(BaseModel):
     date: str
     count: int
+    latency_p50_ms: Optional[float] = None
+    latency_p95_ms: Optional[float] = None
 
 
 class QueryDailyStatsResponse(BaseModel):
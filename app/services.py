@@ -1,23 +1,37 @@
+import logging
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 from passlib.hash import pbkdf2_sha256
 
 from app.config import get_settings
-from app.schemas import DatasetCreate, DatasetUpdate, DatasetOut, DocumentUploadResponse, JobOut, DocumentOut, DocumentUpdate, DocumentListResponse, QueryHistoryResponse, QueryHistoryItem, QueryDailyStatsResponse, QueryDailyStat
+from app.schemas import BulkImportResponse, DatasetCreate, DatasetUpdate, DatasetOut, DocumentUploadResponse, JobOut, DocumentOut, DocumentUpdate, DocumentListResponse, QueryHistoryResponse, QueryHistoryItem, QueryDailyStatsResponse, QueryDailyStat
+from app.dedup import find_existing_hashes, unreferenced_paths
+from app.pagination import cached_count, invalidate_counts, keyset_page
+from app import query_stats
+from app.query_log import get_query_log_writer
 from app.settings_service import get_app_settings_db, get_allowed_model_names
 from app.schemas_tenant import TenantCreate, TenantOut
-from core import storage, vectorstore
+from core import chunker, providers, storage
 from infra import models
 from infra.models import ModelType
 from app import tasks
 
 settings = get_settings()
-vs = vectorstore.get_vector_store()
+logger = logging.getLogger(__name__)
+
+
+def _validate_chunk_strategy(chunk_strategy: Optional[str]) -> Optional[str]:
+    value = (chunk_strategy or "").strip() or None
+    if value and value not in chunker.available_chunkers():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown chunk strategy; choose one of: {', '.join(chunker.available_chunkers())}",
+        )
+    return value
 
 
 def create_dataset(db: Session, tenant_id: str, payload: DatasetCreate) -> DatasetOut:
@@ -43,6 +57,7 @@ def create_dataset(db: Session, tenant_id: str, payload: DatasetCreate) -> Datas
         allowed_rerank_models = get_allowed_model_names(db, ModelType.rerank)
         if effective_rerank not in allowed_rerank_models:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Rerank model not allowed")
+    chunk_strategy = _validate_chunk_strategy(payload.chunk_strategy)
     ds = models.Dataset(
         id=str(uuid.uuid4()),
         tenant_id=tenant_id,
@@ -53,6 +68,7 @@ def create_dataset(db: Session, tenant_id: str, payload: DatasetCreate) -> Datas
         rerank_model=rerank_model,
         rerank_top_k=payload.rerank_top_k,
         rerank_min_score=payload.rerank_min_score,
+        chunk_strategy=chunk_strategy,
     )
     db.add(ds)
     db.commit()
@@ -67,6 +83,7 @@ def create_dataset(db: Session, tenant_id: str, payload: DatasetCreate) -> Datas
         rerank_model=ds.rerank_model,
         rerank_top_k=ds.rerank_top_k,
         rerank_min_score=ds.rerank_min_score,
+        chunk_strategy=ds.chunk_strategy,
         created_at=ds.created_at,
     )
 
@@ -84,6 +101,7 @@ def list_datasets(db: Session, tenant_id: str) -> List[DatasetOut]:
             rerank_model=r.rerank_model,
             rerank_top_k=r.rerank_top_k,
             rerank_min_score=r.rerank_min_score,
+            chunk_strategy=r.chunk_strategy,
             created_at=r.created_at,
         )
         for r in rows
@@ -113,6 +131,7 @@ def get_dataset(db: Session, tenant_id: str, dataset_id: str) -> DatasetOut:
         rerank_model=ds.rerank_model,
         rerank_top_k=ds.rerank_top_k,
         rerank_min_score=ds.rerank_min_score,
+        chunk_strategy=ds.chunk_strategy,
         created_at=ds.created_at,
     )
 
@@ -166,6 +185,9 @@ def update_dataset(db: Session, tenant_id: str, dataset_id: str, payload: Datase
         ds.rerank_top_k = payload.rerank_top_k
     if payload.rerank_min_score is not None:
         ds.rerank_min_score = payload.rerank_min_score
+    if payload.chunk_strategy is not None:
+        # applies to documents ingested from now on; POST /reindex re-chunks existing ones
+        ds.chunk_strategy = _validate_chunk_strategy(payload.chunk_strategy)
 
     if ds.rerank_enabled:
         effective_rerank = ds.rerank_model or app_settings.default_rerank_model
@@ -193,6 +215,7 @@ def update_dataset(db: Session, tenant_id: str, dataset_id: str, payload: Datase
         rerank_model=ds.rerank_model,
         rerank_top_k=ds.rerank_top_k,
         rerank_min_score=ds.rerank_min_score,
+        chunk_strategy=ds.chunk_strategy,
         created_at=ds.created_at,
     )
 
@@ -300,13 +323,14 @@ def delete_tenant(db: Session, tenant_id: str):
     tenant = db.query(models.Tenant).filter(models.Tenant.id == tenant_id).first()
     if not tenant:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant not found")
+    dataset_ids = [row.id for row in db.query(models.Dataset.id).filter(models.Dataset.tenant_id == tenant_id)]
     db.query(models.ApiKey).filter(models.ApiKey.tenant_id == tenant_id).delete()
     db.query(models.Dataset).filter(models.Dataset.tenant_id == tenant_id).delete()
     db.query(models.Document).filter(models.Document.tenant_id == tenant_id).delete()
     db.query(models.Chunk).filter(models.Chunk.tenant_id == tenant_id).delete()
     db.query(models.Job).filter(models.Job.tenant_id == tenant_id).delete()
     db.delete(tenant)
-    db.commit()
+    return _enqueue_cleanup(db, tenant_id, dataset_ids, purge_tenant=True)
 
 
 def soft_delete_dataset(db: Session, tenant_id: str, dataset_id: str):
@@ -322,23 +346,24 @@ def soft_delete_dataset(db: Session, tenant_id: str, dataset_id: str):
     if not ds:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dataset not found")
     ds.deleted_at = datetime.utcnow()
-    db.commit()
-    try:
-        vs.delete_dataset(tenant_id, dataset_id)
-    except Exception:
-        pass
-    try:
-        from core import opensearch_bm25
+    return _enqueue_cleanup(db, tenant_id, [dataset_id])
 
-        client = opensearch_bm25.get_bm25_client()
-        if client:
-            client.delete_dataset(tenant_id, dataset_id)
-    except Exception:
-        pass
-    try:
-        storage.delete_dataset_store(settings.object_store_root, tenant_id, dataset_id)
-    except Exception:
-        pass
+
+def _enqueue_cleanup(db: Session, tenant_id: str, dataset_ids: List[str], purge_tenant: bool = False) -> str:
+    """Track vector/BM25/object-store cleanup as a Job and hand it to the workers."""
+    job = models.Job(
+        id=str(uuid.uuid4()),
+        tenant_id=tenant_id,
+        type=models.JobType.cleanup.value,
+        status=models.JobStatus.pending.value,
+        payload={"dataset_ids": dataset_ids, "purge_tenant": purge_tenant},
+    )
+    db.add(job)
+    db.commit()
+    tasks.enqueue_cleanup(
+        {"job_id": job.id, "tenant_id": tenant_id, "dataset_ids": dataset_ids, "purge_tenant": purge_tenant}
+    )
+    return job.id
 
 
 def create_document_jobs(db: Session, tenant_id: str, dataset_id: str, docs: List[models.Document], embedder: Optional[str]) -> DocumentUploadResponse:
@@ -355,6 +380,7 @@ def create_document_jobs(db: Session, tenant_id: str, dataset_id: str, docs: Lis
         job_ids.append(job.id)
         doc.status = "pending"
     db.commit()
+    _invalidate_document_counts(tenant_id, dataset_id)
     for job_id, doc in zip(job_ids, docs):
         tasks.enqueue_ingest(
             {
@@ -370,6 +396,71 @@ def create_document_jobs(db: Session, tenant_id: str, dataset_id: str, docs: Lis
     return DocumentUploadResponse(job_ids=job_ids)
 
 
+def create_bulk_import(
+    db: Session,
+    tenant_id: str,
+    dataset: models.Dataset,
+    items: List[dict],
+) -> BulkImportResponse:
+    """
+    Register many documents in one call. `items` are Document column dicts (path or source_uri
+    set, content_hash when known). Known hashes are deduplicated with one IN query, Document
+    and Job rows are bulk-inserted, and one batched ingest task is enqueued per
+    `bulk_ingest_batch_size` documents.
+    """
+    existing = find_existing_hashes(db, tenant_id, dataset.id, [it.get("content_hash") for it in items])
+    rows = []
+    duplicates = 0
+    for item in items:
+        content_hash = item.get("content_hash")
+        if content_hash and content_hash in existing:
+            duplicates += 1
+            continue
+        if content_hash:
+            existing[content_hash] = ""
+        rows.append(
+            {
+                **item,
+                "id": str(uuid.uuid4()),
+                "tenant_id": tenant_id,
+                "dataset_id": dataset.id,
+                "status": "pending",
+                "version": 1,
+                "created_at": datetime.utcnow(),
+            }
+        )
+    size = max(settings.bulk_ingest_batch_size, 1)
+    batches = [rows[i : i + size] for i in range(0, len(rows), size)]
+    jobs = [
+        {
+            "id": str(uuid.uuid4()),
+            "tenant_id": tenant_id,
+            "type": models.JobType.ingest.value,
+            "status": models.JobStatus.pending.value,
+            "progress": 0,
+            "payload": {"dataset_id": dataset.id, "document_ids": [r["id"] for r in batch], "embedder": dataset.embedder},
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        for batch in batches
+    ]
+    db.bulk_insert_mappings(models.Document, rows)
+    db.bulk_insert_mappings(models.Job, jobs)
+    db.commit()
+    _invalidate_document_counts(tenant_id, dataset.id)
+    for job in jobs:
+        tasks.enqueue_ingest_batch(
+            {
+                "job_id": job["id"],
+                "tenant_id": tenant_id,
+                "dataset_id": dataset.id,
+                "document_ids": job["payload"]["document_ids"],
+                "embedder": dataset.embedder,
+            }
+        )
+    return BulkImportResponse(job_ids=[job["id"] for job in jobs], accepted=len(rows), duplicates=duplicates)
+
+
 def record_documents(
     db: Session,
     tenant_id: str,
@@ -411,39 +502,57 @@ def soft_delete_document(db: Session, tenant_id: str, document_id: str):
     doc.deleted_at = datetime.utcnow()
     db.query(models.Chunk).filter(models.Chunk.document_id == document_id).delete()
     db.commit()
+    _invalidate_document_counts(tenant_id, doc.dataset_id)
     try:
-        vs.delete_document(tenant_id, doc.dataset_id, document_id)
+        providers.vector_store().delete_document(tenant_id, doc.dataset_id, document_id)
     except Exception:
         pass
     try:
         storage.delete_document_store(settings.object_store_root, tenant_id, doc.dataset_id, document_id)
     except Exception:
         pass
+    if doc.path and storage.is_import_path(doc.path):
+        try:
+            storage.delete_s3_objects(unreferenced_paths(db, tenant_id, [doc.path]))
+        except Exception:
+            logger.warning("Could not delete import object %s of document %s", doc.path, document_id, exc_info=True)
     try:
-        from core import opensearch_bm25
-
-        client = opensearch_bm25.get_bm25_client()
+        client = providers.bm25_client()
         if client:
             client.delete_document(tenant_id, doc.dataset_id, document_id)
     except Exception:
         pass
 
 
-def list_documents(db: Session, tenant_id: str, dataset_id: Optional[str] = None, page: int = 1, page_size: int = 20) -> DocumentListResponse:
-    """List documents with pagination."""
+def _invalidate_document_counts(tenant_id: str, dataset_id: str) -> None:
+    # list_documents caches totals per dataset and across the tenant's datasets
+    invalidate_counts(("documents", tenant_id, dataset_id), ("documents", tenant_id, None))
+
+
+def list_documents(
+    db: Session,
+    tenant_id: str,
+    dataset_id: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> DocumentListResponse:
+    """
+    List documents newest first. Pass `next_cursor` back as `cursor` to page by keyset;
+    `page` still works but pages past the first skip rows with OFFSET. The total is a cached
+    count (see `cached_count`) and is skipped entirely when `include_total` is False.
+    """
     query = db.query(models.Document).filter(
         models.Document.tenant_id == tenant_id,
         models.Document.deleted_at.is_(None)
     )
     if dataset_id:
         query = query.filter(models.Document.dataset_id == dataset_id)
-    
-    total = query.count()
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
-    
-    offset = (page - 1) * page_size
-    docs = query.order_by(models.Document.created_at.desc()).offset(offset).limit(page_size).all()
-    
+
+    docs, next_cursor = _keyset_page(query, models.Document, page, page_size, cursor)
+    total = cached_count(("documents", tenant_id, dataset_id), query.count) if include_total else None
+
     items = [
         DocumentOut(
             id=d.id,
@@ -458,16 +567,30 @@ def list_documents(db: Session, tenant_id: str, dataset_id: Optional[str] = None
         )
         for d in docs
     ]
-    
+
     return DocumentListResponse(
         items=items,
         total=total,
-        page=page,
+        page=None if cursor else page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=_total_pages(total, page_size),
+        next_cursor=next_cursor,
     )
 
 
+def _keyset_page(query, model, page: int, page_size: int, cursor: Optional[str]) -> tuple:
+    try:
+        return keyset_page(query, model.created_at, model.id, page_size, cursor=cursor, offset=(page - 1) * page_size)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+def _total_pages(total: Optional[int], page_size: int) -> Optional[int]:
+    if total is None:
+        return None
+    return (total + page_size - 1) // page_size if total > 0 else 0
+
+
 def get_document(db: Session, tenant_id: str, document_id: str) -> DocumentOut:
     """Get a single document by ID."""
     doc = (
@@ -495,16 +618,25 @@ def get_document(db: Session, tenant_id: str, document_id: str) -> DocumentOut:
     )
 
 
-def log_query(db: Session, tenant_id: str, query_text: str, dataset_ids: Optional[List[str]] = None):
-    entry = models.QueryLog(
-        id=str(uuid.uuid4()),
-        tenant_id=tenant_id,
-        dataset_ids=dataset_ids or [],
-        query=query_text,
+def log_query(
+    tenant_id: str,
+    query_text: str,
+    dataset_ids: Optional[List[str]] = None,
+    latency_ms: Optional[float] = None,
+    hit_count: Optional[int] = None,
+    rerank_applied: Optional[bool] = None,
+    answered: Optional[bool] = None,
+) -> None:
+    """Queue a query log row; it is written in the next batched flush, not on the request's session."""
+    get_query_log_writer().record(
+        tenant_id,
+        query_text,
+        dataset_ids,
+        latency_ms=latency_ms,
+        hit_count=hit_count,
+        rerank_applied=rerank_applied,
+        answered=answered,
     )
-    db.add(entry)
-    db.commit()
-    return entry
 
 
 def list_query_history(
@@ -512,18 +644,20 @@ def list_query_history(
     tenant_id: str,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
 ) -> QueryHistoryResponse:
     query = db.query(models.QueryLog).filter(models.QueryLog.tenant_id == tenant_id)
-    total = query.count()
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
-    offset = (page - 1) * page_size
-    rows = query.order_by(models.QueryLog.created_at.desc()).offset(offset).limit(page_size).all()
+    rows, next_cursor = _keyset_page(query, models.QueryLog, page, page_size, cursor)
+    total = cached_count(("query_logs", tenant_id), query.count) if include_total else None
     items = [
         QueryHistoryItem(
             id=row.id,
             tenant_id=row.tenant_id,
             dataset_ids=row.dataset_ids or [],
             query=row.query,
+            latency_ms=row.latency_ms,
+            hit_count=row.hit_count,
             created_at=row.created_at.isoformat() if row.created_at else "",
         )
         for row in rows
@@ -531,9 +665,10 @@ def list_query_history(
     return QueryHistoryResponse(
         items=items,
         total=total,
-        page=page,
+        page=None if cursor else page,
         page_size=page_size,
-        total_pages=total_pages,
+        total_pages=_total_pages(total, page_size),
+        next_cursor=next_cursor,
     )
 
 
@@ -541,33 +676,27 @@ def get_query_daily_stats(
     db: Session,
     tenant_id: str,
     days: int = 14,
+    dataset_id: Optional[str] = None,
 ) -> QueryDailyStatsResponse:
+    """Daily counts and latency percentiles from the `query_stats_daily` rollup (one row per day)."""
     if days < 1:
         days = 1
     end_date = datetime.utcnow().date()
     start_date = end_date - timedelta(days=days - 1)
-    start_dt = datetime.combine(start_date, datetime.min.time())
-
-    rows = (
-        db.query(func.date(models.QueryLog.created_at).label("day"), func.count(models.QueryLog.id).label("count"))
-        .filter(
-            models.QueryLog.tenant_id == tenant_id,
-            models.QueryLog.created_at >= start_dt,
-        )
-        .group_by(func.date(models.QueryLog.created_at))
-        .all()
-    )
-    counts = {}
-    for row in rows:
-        day_value = row.day
-        day_str = day_value.isoformat() if hasattr(day_value, "isoformat") else str(day_value)
-        counts[day_str] = int(row.count)
+    rollups = query_stats.daily_rollups(db, tenant_id, start_date, dataset_id)
 
     items = []
     for idx in range(days):
-        day = start_date + timedelta(days=idx)
-        day_str = day.isoformat()
-        items.append(QueryDailyStat(date=day_str, count=counts.get(day_str, 0)))
+        day_str = (start_date + timedelta(days=idx)).isoformat()
+        row = rollups.get(day_str)
+        items.append(
+            QueryDailyStat(
+                date=day_str,
+                count=row.query_count if row else 0,
+                latency_p50_ms=row.latency_p50_ms if row else None,
+                latency_p95_ms=row.latency_p95_ms if row else None,
+            )
+        )
 
     return QueryDailyStatsResponse(items=items)
 
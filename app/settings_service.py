@@ -7,9 +7,14 @@ from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.schemas import ModelConfigCreate, ModelConfigUpdate
+from core import metrics
 from infra import models
 
 cfg = get_settings()
+# model config resolution opens a session and runs several queries on every embed/rerank/chat call
+SETTINGS_LOOKUP_SECONDS = metrics.histogram(
+    "raglite_settings_lookup_seconds", "Seconds spent resolving a model config from app settings", ("kind",)
+)
 
 
 def seed_model_configs_from_settings(db: Session) -> None:
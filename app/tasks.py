@@ -1,57 +1,203 @@
-from typing import Any
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Optional
 
+from app import background
+from app.background import get_background_executor
 from app.config import get_settings
 from workers import tasks as worker_tasks
+from workers.worker import get_celery_app
 from core import pipeline
+from infra import models
+from infra.db import SessionLocal
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
+_overflow = threading.Event()  # a job did not fit in the background queue and waits as a pending row
+_requeue_lock = threading.Lock()
 
-def enqueue_ingest(job_payload: dict[str, Any]) -> None:
+
+def execution_mode() -> str:
     """
-    Enqueue ingest; in dev, run inline so uploads complete without a worker.
+    inline | background | celery. Unset, dev installs run jobs on the in-process background
+    executor (uploads return before ingestion) and other environments use Celery.
     """
-    if settings.environment == "dev":
-        pipeline.ingest_document(
-            job_id=job_payload["job_id"],
-            tenant_id=job_payload["tenant_id"],
-            dataset_id=job_payload["dataset_id"],
-            document_id=job_payload["document_id"],
-            path=job_payload["path"],
-            mime_type=job_payload.get("mime_type"),
-            embedder=job_payload.get("embedder"),
-        )
+    if settings.task_execution:
+        return settings.task_execution
+    return "background" if settings.environment == "dev" else "celery"
+
+
+def _dispatch(worker_task: Any, run: Callable[[dict], None], job_payload: dict[str, Any]) -> None:
+    mode = execution_mode()
+    if mode == "celery":
+        try:
+            if get_celery_app() is None:
+                raise RuntimeError("Celery is not installed")
+            worker_task.delay(job_payload)
+            return
+        except Exception:
+            # Celery not configured or broker unavailable; keep the job in this process
+            mode = "background"
+    if mode == "background":
+        if not get_background_executor().submit(_claimed, run, job_payload):
+            # the Job row is committed as pending; it is picked up once the queue drains
+            _overflow.set()
+            logger.warning("Background queue full; job %s waits as pending", job_payload.get("job_id"))
         return
+    run(job_payload)
+
+
+def _claim(job_id: Optional[str]) -> bool:
+    """Mark a pending Job running; False when another thread or process already picked it up."""
+    if not job_id:
+        return True
+    db = SessionLocal()
     try:
-        worker_tasks.ingest_document.delay(job_payload)
-    except Exception:
-        # Celery not configured or broker unavailable; run inline
-        pipeline.ingest_document(
-            job_id=job_payload["job_id"],
-            tenant_id=job_payload["tenant_id"],
-            dataset_id=job_payload["dataset_id"],
-            document_id=job_payload["document_id"],
-            path=job_payload["path"],
-            mime_type=job_payload.get("mime_type"),
-            embedder=job_payload.get("embedder"),
+        claimed = (
+            db.query(models.Job)
+            .filter(models.Job.id == job_id, models.Job.status == models.JobStatus.pending.value)
+            .update({"status": models.JobStatus.running.value, "updated_at": datetime.utcnow()}, synchronize_session=False)
         )
+        db.commit()
+        return claimed == 1
+    finally:
+        db.close()
 
 
-def enqueue_reindex(job_payload: dict[str, Any]) -> None:
-    if settings.environment == "dev":
-        pipeline.reindex_dataset(
-            job_id=job_payload["job_id"],
-            tenant_id=job_payload["tenant_id"],
-            dataset_id=job_payload["dataset_id"],
-            embedder=job_payload.get("embedder"),
-        )
-        return
+def _claimed(run: Callable[[dict], None], job_payload: dict[str, Any]) -> None:
+    if _claim(job_payload.get("job_id")):
+        run(job_payload)
+
+
+def _job_dispatch(db, job: models.Job) -> Optional[tuple]:
+    """(run, payload) to resume a pending Job row, or None when it cannot be resumed."""
+    payload = job.payload or {}
+    base = {"job_id": job.id, "tenant_id": job.tenant_id}
+    if job.type == models.JobType.cleanup.value:
+        return _run_cleanup, {**base, "dataset_ids": payload.get("dataset_ids", []), "purge_tenant": payload.get("purge_tenant", False)}
+    if job.type == models.JobType.reindex.value:
+        return _run_reindex, {**base, "dataset_id": payload["dataset_id"], "embedder": payload.get("embedder")}
+    if job.type != models.JobType.ingest.value:
+        return None
+    if "document_ids" in payload:
+        return _run_ingest_batch, {
+            **base,
+            "dataset_id": payload["dataset_id"],
+            "document_ids": payload["document_ids"],
+            "embedder": payload.get("embedder"),
+        }
+    doc = db.query(models.Document).filter(models.Document.id == payload.get("document_id")).first()
+    if doc is None or doc.deleted_at is not None:
+        return None
+    return _run_ingest, {
+        **base,
+        "dataset_id": doc.dataset_id,
+        "document_id": doc.id,
+        "path": doc.path,
+        "mime_type": doc.mime_type,
+        "embedder": payload.get("embedder"),
+    }
+
+
+def requeue_pending_jobs() -> int:
+    """
+    Hand Job rows still pending to the background executor, oldest first and only as many as
+    fit: at startup (jobs queued by a process that stopped) and whenever the queue drains after
+    an overflow. Running the same row twice is prevented by the claim in `_claimed`.
+    """
+    if not _requeue_lock.acquire(blocking=False):
+        return 0
+    db = SessionLocal()
     try:
-        worker_tasks.reindex_dataset.delay(job_payload)
-    except Exception:
-        pipeline.reindex_dataset(
-            job_id=job_payload["job_id"],
-            tenant_id=job_payload["tenant_id"],
-            dataset_id=job_payload["dataset_id"],
-            embedder=job_payload.get("embedder"),
+        _overflow.clear()
+        executor = get_background_executor()
+        free = executor.free_slots()
+        jobs = (
+            db.query(models.Job)
+            .filter(models.Job.status == models.JobStatus.pending.value)
+            .order_by(models.Job.created_at)
+            .limit(free)
+            .all()
         )
+        if len(jobs) == free:
+            _overflow.set()  # there may be more; look again when the queue drains
+        queued = 0
+        for job in jobs:
+            dispatch = _job_dispatch(db, job)
+            if dispatch is None:
+                job.status = models.JobStatus.failed.value
+                job.error = "Job cannot be resumed"
+                db.commit()
+                continue
+            if not executor.submit(_claimed, *dispatch):
+                _overflow.set()
+                break
+            queued += 1
+        return queued
+    finally:
+        db.close()
+        _requeue_lock.release()
+
+
+@background.on_idle
+def _drain_overflow() -> None:
+    if _overflow.is_set():
+        requeue_pending_jobs()
+
+
+def _run_ingest(job_payload: dict[str, Any]) -> None:
+    pipeline.ingest_document(
+        job_id=job_payload["job_id"],
+        tenant_id=job_payload["tenant_id"],
+        dataset_id=job_payload["dataset_id"],
+        document_id=job_payload["document_id"],
+        path=job_payload["path"],
+        mime_type=job_payload.get("mime_type"),
+        embedder=job_payload.get("embedder"),
+    )
+
+
+def enqueue_ingest(job_payload: dict[str, Any]) -> None:
+    _dispatch(worker_tasks.ingest_document, _run_ingest, job_payload)
+
+
+def _run_reindex(job_payload: dict[str, Any]) -> None:
+    pipeline.reindex_dataset(
+        job_id=job_payload["job_id"],
+        tenant_id=job_payload["tenant_id"],
+        dataset_id=job_payload["dataset_id"],
+        embedder=job_payload.get("embedder"),
+    )
+
+
+def enqueue_reindex(job_payload: dict[str, Any]) -> None:
+    _dispatch(worker_tasks.reindex_dataset, _run_reindex, job_payload)
+
+
+def _run_cleanup(job_payload: dict[str, Any]) -> None:
+    pipeline.cleanup_datasets(
+        job_id=job_payload["job_id"],
+        tenant_id=job_payload["tenant_id"],
+        dataset_ids=job_payload["dataset_ids"],
+        purge_tenant=job_payload.get("purge_tenant", False),
+    )
+
+
+def enqueue_cleanup(job_payload: dict[str, Any]) -> None:
+    _dispatch(worker_tasks.cleanup_datasets, _run_cleanup, job_payload)
+
+
+def _run_ingest_batch(job_payload: dict[str, Any]) -> None:
+    pipeline.ingest_batch(
+        job_id=job_payload["job_id"],
+        tenant_id=job_payload["tenant_id"],
+        dataset_id=job_payload["dataset_id"],
+        document_ids=job_payload["document_ids"],
+        embedder=job_payload.get("embedder"),
+    )
+
+
+def enqueue_ingest_batch(job_payload: dict[str, Any]) -> None:
+    _dispatch(worker_tasks.ingest_batch, _run_ingest_batch, job_payload)
@@ -0,0 +1,61 @@
+"""
+Deterministic synthetic corpora for the benchmarks: pseudo-words drawn from a Zipf-like
+distribution, so BM25 sees realistic document frequencies (a few very common terms, a long
+tail of rare ones) and every run with the same seed produces the same bytes.
+"""
+
+import random
+from itertools import accumulate
+from typing import List, Tuple
+
+_SYLLABLES = "ka lo mi ne ra su ti vo xe zu ba de fi go hu ja ke li mo nu pa qi re so tu".split()
+
+
+def vocabulary(size: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    words: List[str] = []
+    seen = set()
+    while len(words) < size:
+        word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+class Corpus:
+    def __init__(self, vocab_size: int = 5000, seed: int = 0):
+        self.words = vocabulary(vocab_size, seed)
+        # rank-frequency ~ 1/rank
+        self._cum_weights = list(accumulate(1.0 / rank for rank in range(1, vocab_size + 1)))
+        self.seed = seed
+
+    def _sample(self, rng: random.Random, n: int) -> List[str]:
+        return rng.choices(self.words, cum_weights=self._cum_weights, k=n)
+
+    def document(self, size_bytes: int, rng: random.Random) -> str:
+        paragraphs: List[str] = []
+        total = 0
+        while total < size_bytes:
+            sentences = []
+            for _ in range(rng.randint(3, 6)):
+                sentences.append(" ".join(self._sample(rng, rng.randint(6, 18))).capitalize() + ".")
+            para = " ".join(sentences)
+            paragraphs.append(para)
+            total += len(para) + 2
+        return "\n\n".join(paragraphs)
+
+    def documents(self, count: int, size_kb: float) -> List[Tuple[str, str]]:
+        """(filename, text) pairs; sizes vary +-50% around `size_kb`."""
+        rng = random.Random(self.seed + 1)
+        docs = []
+        for i in range(count):
+            size = int(size_kb * 1024 * rng.uniform(0.5, 1.5))
+            docs.append((f"doc-{i:05d}.txt", self.document(size, rng)))
+        return docs
+
+    def queries(self, count: int, min_terms: int = 1, max_terms: int = 4) -> List[str]:
+        """Query strings biased towards mid-frequency terms, like real keyword searches."""
+        rng = random.Random(self.seed + 2)
+        band = self.words[10 : max(11, len(self.words) // 4)]
+        return [" ".join(rng.choice(band) for _ in range(rng.randint(min_terms, max_terms))) for _ in range(count)]
@@ -0,0 +1,114 @@
+"""
+Process startup cost: `python -X importtime` for the modules each process type imports first
+(API app, routes, ingestion pipeline, Celery task module), in a fresh interpreter per run.
+
+    uv run python -m benchmarks.import_time --repeat 5
+    uv run python -m benchmarks.import_time --modules app.main --max-ms 1500 --json
+
+Reports the best cumulative import time per module, the top-level packages that dominate it,
+and which network clients were imported (those should load on first use, not at import).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ["app.main", "app.api.routes", "core.pipeline", "workers.tasks"]
+# client libraries that only the first real request or job should pull in
+LAZY_PACKAGES = ["qdrant_client", "opensearchpy", "boto3", "sentence_transformers", "torch"]
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """Rows of `-X importtime` output as {"module", "self_us", "cumulative_us", "depth"}."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_us": int(fields[0]),
+                "cumulative_us": int(fields[1]),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+            }
+        )
+    return rows
+
+
+def measure(module: str, env: Optional[Dict[str, str]] = None) -> List[dict]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["(no output)"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+    return parse_importtime(proc.stderr)
+
+
+def summarize(module: str, rows: List[dict], top: int) -> dict:
+    target = next((r for r in reversed(rows) if r["module"] == module), None)
+    packages: Dict[str, int] = {}
+    for row in rows:
+        # cumulative time of each package's first import, attributed to its top-level name
+        root = row["module"].split(".")[0]
+        if row["module"] == root:
+            packages[root] = max(packages.get(root, 0), row["cumulative_us"])
+    heaviest = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round((target["cumulative_us"] if target else 0) / 1000, 1),
+        "modules_imported": len(rows),
+        "top_packages": [{"package": name, "ms": round(us / 1000, 1)} for name, us in heaviest],
+        "eager_clients": [name for name in LAZY_PACKAGES if name in packages],
+    }
+
+
+def run(modules: List[str], repeat: int, top: int = 8) -> List[dict]:
+    results = []
+    for module in modules:
+        best: Optional[dict] = None
+        for _ in range(repeat):
+            summary = summarize(module, measure(module), top)
+            if best is None or summary["total_ms"] < best["total_ms"]:
+                best = summary
+        results.append(best)
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modules", default=",".join(DEFAULT_MODULES), help="comma separated modules to import")
+    ap.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module; the best run is kept")
+    ap.add_argument("--top", type=int, default=8, help="heaviest top-level packages to list")
+    ap.add_argument("--max-ms", type=float, default=None, help="exit non-zero when any module is slower than this")
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args()
+    results = run([m.strip() for m in args.modules.split(",") if m.strip()], args.repeat, args.top)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for row in results:
+            print(f"{row['module']:<20}{row['total_ms']:>10.1f} ms  ({row['modules_imported']} modules)")
+            for pkg in row["top_packages"]:
+                print(f"    {pkg['package']:<24}{pkg['ms']:>10.1f} ms")
+            if row["eager_clients"]:
+                print(f"    imported at startup: {', '.join(row['eager_clients'])}")
+    if args.max_ms is not None and any(row["total_ms"] > args.max_ms for row in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
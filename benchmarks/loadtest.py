@@ -0,0 +1,473 @@
+"""
+Open-loop load generator for capacity planning against a running stack (API + workers).
+It bootstraps tenants and datasets through the API, seeds documents, then replays a weighted
+mix of queries, uploads and listings at a fixed request rate with an async client, printing
+throughput, error rate and latency percentiles per interval.
+
+    # stub model servers: OpenAI-compatible embeddings/chat and a Cohere-compatible rerank
+    uv run python -m benchmarks.loadtest stub-models --port 7700 --latency-ms 10
+
+    uv run python -m benchmarks.loadtest run --base-url http://localhost:7615 \\
+        --admin-email admin@raglite.local --admin-password admin123 \\
+        --stub-models http://localhost:7700 --tenants 2 --datasets 2 --seed-docs 20 \\
+        --rps 50 --duration 60 --mix query=60,query_rerank=15,query_answer=5,upload=10,list=10 \\
+        --tag workers=4 --out load.json
+
+Requests are sent on schedule whether or not earlier ones have finished (open loop), so a
+saturated server shows up as rising latency and errors rather than a lower send rate; sends
+beyond `--max-in-flight` are counted as dropped. With `--api-key` an existing tenant is used
+and no admin login is needed (model registration and tenant creation are skipped). Requires
+httpx.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks import stubs
+from benchmarks.corpus import Corpus
+from benchmarks.suite import percentiles
+
+OPERATIONS = ("query", "query_rerank", "query_answer", "upload", "list")
+DEFAULT_MIX = "query=60,query_rerank=15,query_answer=5,upload=10,list=10"
+STUB_EMBEDDER, STUB_RERANKER, STUB_CHAT = "stub-embedder", "stub-reranker", "stub-chat"
+TERMINAL_JOB_STATES = ("succeeded", "failed")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """`op=weight,...` into normalized weights; unknown operations are rejected."""
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        weights[name] = float(value or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Operation mix needs at least one positive weight")
+    return {name: w / total for name, w in weights.items() if w > 0}
+
+
+# --- stub model servers ---------------------------------------------------------------------
+
+
+class _StubModelHandler(BaseHTTPRequestHandler):
+    dim = 384
+    latency_s = 0.0
+
+    def do_POST(self):  # noqa: N802 - http.server naming
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if self.path == "/v1/embeddings":
+            texts = body.get("input") or []
+            texts = [texts] if isinstance(texts, str) else texts
+            vectors = stubs.hash_embed(texts, dim=self.dim)
+            reply = {"object": "list", "model": body.get("model"), "data": [{"index": i, "embedding": v} for i, v in enumerate(vectors)]}
+        elif self.path == "/v1/rerank":
+            query = set(str(body.get("query", "")).lower().split())
+            scored = []
+            for idx, doc in enumerate(body.get("documents") or []):
+                terms = set(str(doc).lower().split())
+                scored.append({"index": idx, "relevance_score": len(query & terms) / (len(query) or 1)})
+            scored.sort(key=lambda item: item["relevance_score"], reverse=True)
+            reply = {"results": scored[: body["top_n"]] if body.get("top_n") else scored}
+        elif self.path == "/v1/chat/completions":
+            question = (body.get("messages") or [{}])[-1].get("content", "")
+            reply = {"choices": [{"index": 0, "message": {"role": "assistant", "content": f"Stub answer ({len(question)} chars of context)."}}]}
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_args):  # one line per request would drown the output
+        pass
+
+
+def serve_stub_models(host: str, port: int, dim: int = 384, latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub model server in a daemon thread; `server.server_address` has the bound port."""
+    handler = type("StubModelHandler", (_StubModelHandler,), {"dim": dim, "latency_s": latency_ms / 1000})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- results --------------------------------------------------------------------------------
+
+
+class Recorder:
+    """Latencies and errors per operation, overall and per reporting window."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.totals: Dict[str, dict] = defaultdict(_bucket)
+        self.windows: Dict[int, Dict[str, dict]] = defaultdict(lambda: defaultdict(_bucket))
+
+    def record(self, op: str, latency: Optional[float], error: Optional[str] = None) -> None:
+        window = int((time.perf_counter() - self.started) / self.interval)
+        for bucket in (self.totals[op], self.windows[window][op]):
+            if error == "dropped":
+                bucket["dropped"] += 1
+            elif error:
+                bucket["errors"] += 1
+                bucket["error_kinds"][error] += 1
+            else:
+                bucket["latencies"].append(latency)
+
+    def window_report(self, window: int) -> dict:
+        return {"t_s": round((window + 1) * self.interval, 1), **_summarize(self.windows.get(window, {}), self.interval)}
+
+    def summary(self, elapsed: float) -> dict:
+        return _summarize(self.totals, elapsed)
+
+
+def _bucket() -> dict:
+    return {"latencies": [], "errors": 0, "dropped": 0, "error_kinds": defaultdict(int)}
+
+
+def _summarize(buckets: Dict[str, dict], seconds: float) -> dict:
+    ops = {}
+    ok = errors = dropped = 0
+    for op, bucket in sorted(buckets.items()):
+        count, errs = len(bucket["latencies"]), bucket["errors"]
+        ok, errors, dropped = ok + count, errors + errs, dropped + bucket["dropped"]
+        ops[op] = {
+            "ok": count,
+            "errors": errs,
+            "dropped": bucket["dropped"],
+            "error_rate": round(errs / (count + errs), 4) if count + errs else 0.0,
+            "throughput_per_s": round(count / seconds, 2) if seconds else 0.0,
+            **percentiles(bucket["latencies"]),
+            "error_kinds": dict(bucket["error_kinds"]),
+        }
+    return {
+        "ok": ok,
+        "errors": errors,
+        "dropped": dropped,
+        "error_rate": round(errors / (ok + errors), 4) if ok + errors else 0.0,
+        "throughput_per_s": round(ok / seconds, 2) if seconds else 0.0,
+        "operations": ops,
+    }
+
+
+def _print_window(report: dict) -> None:
+    parts = [f"t={report['t_s']:>6.1f}s", f"ok/s {report['throughput_per_s']:>7.1f}", f"err {report['error_rate']:>6.1%}"]
+    if report["dropped"]:
+        parts.append(f"dropped {report['dropped']}")
+    for op, row in report["operations"].items():
+        if "p95_ms" in row:
+            parts.append(f"{op} p50/p95 {row['p50_ms']:.0f}/{row['p95_ms']:.0f}ms")
+    print("  ".join(parts), flush=True)
+
+
+# --- bootstrap ------------------------------------------------------------------------------
+
+
+class Target:
+    """One tenant's API key and datasets as seen by the load phase."""
+
+    def __init__(self, tenant_id: Optional[str], api_key: str):
+        self.tenant_id = tenant_id
+        self.api_key = api_key
+        self.datasets: List[str] = []
+        self.rerank_datasets: List[str] = []
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+
+def _check(resp, what: str):
+    if resp.status_code >= 400:
+        raise SystemExit(f"{what} failed: HTTP {resp.status_code} {resp.text[:200]}")
+    return resp.json()
+
+
+async def _register_stub_models(client, admin: Dict[str, str], endpoint: str) -> None:
+    for path, name in (("embedders", STUB_EMBEDDER), ("rerank-models", STUB_RERANKER), ("chat-models", STUB_CHAT)):
+        resp = await client.post(f"/v1/settings/{path}", json={"name": name, "endpoint": endpoint, "model": name}, headers=admin)
+        if resp.status_code != 409:  # already registered by an earlier run
+            _check(resp, f"registering {name}")
+
+
+async def bootstrap(client, args, corpus: Corpus, run_id: str) -> List[Target]:
+    admin: Dict[str, str] = {}
+    if args.admin_email:
+        login = _check(await client.post("/v1/auth/login", json={"email": args.admin_email, "password": args.admin_password}), "admin login")
+        admin = {"Authorization": f"Bearer {login['access_token']}"}
+    if args.stub_models:
+        if not admin:
+            raise SystemExit("--stub-models needs --admin-email/--admin-password to register the model configs")
+        await _register_stub_models(client, admin, args.stub_models)
+
+    if args.api_key:
+        targets = [Target(None, args.api_key)]
+    else:
+        if not admin:
+            raise SystemExit("creating tenants needs --admin-email/--admin-password (or pass --api-key)")
+        targets = []
+        for i in range(args.tenants):
+            tenant = _check(await client.post("/v1/tenants", json={"name": f"loadtest-{run_id}-{i}"}, headers=admin), "creating tenant")
+            targets.append(Target(tenant["id"], tenant["api_key"]))
+
+    rerank_model = args.rerank_model or (STUB_RERANKER if args.stub_models else None)
+    for target in targets:
+        for i in range(args.datasets):
+            body = {"name": f"loadtest-{run_id}-{i}", "embedder": args.embedder, "chunk_strategy": args.chunk_strategy}
+            target.datasets.append(_check(await client.post("/v1/datasets", json=body, headers=target.headers), "creating dataset")["id"])
+            if rerank_model:
+                body = {**body, "name": f"{body['name']}-rerank", "rerank_enabled": True, "rerank_model": rerank_model, "rerank_top_k": 20}
+                target.rerank_datasets.append(_check(await client.post("/v1/datasets", json=body, headers=target.headers), "creating dataset")["id"])
+    await _seed(client, targets, corpus, args)
+    return targets
+
+
+async def _seed(client, targets: List[Target], corpus: Corpus, args) -> None:
+    if args.seed_docs <= 0:
+        return
+    docs = corpus.documents(args.seed_docs, args.doc_kb)
+    jobs: List[Tuple[Target, str]] = []
+    for target in targets:
+        for dataset_id in target.datasets + target.rerank_datasets:
+            for start in range(0, len(docs), 10):
+                files = [("files", (name, text.encode("utf-8"), "text/plain")) for name, text in docs[start : start + 10]]
+                resp = await client.post("/v1/documents", params={"dataset_id": dataset_id}, files=files, headers=target.headers)
+                jobs.extend((target, job_id) for job_id in _check(resp, "seeding documents").get("job_ids", []))
+    print(f"seeding: {len(jobs)} ingest jobs queued, waiting up to {args.seed_timeout:.0f}s", flush=True)
+    deadline = time.monotonic() + args.seed_timeout
+    pending = jobs
+    while pending and time.monotonic() < deadline:
+        await asyncio.sleep(1.0)
+        still = []
+        for target, job_id in pending:
+            resp = await client.get(f"/v1/jobs/{job_id}", headers=target.headers)
+            if resp.status_code != 200 or resp.json().get("status") not in TERMINAL_JOB_STATES:
+                still.append((target, job_id))
+        pending = still
+    if pending:
+        print(f"seeding: {len(pending)} jobs still running; starting the load anyway", flush=True)
+
+
+async def cleanup(client, targets: List[Target], args) -> None:
+    login = await client.post("/v1/auth/login", json={"email": args.admin_email, "password": args.admin_password})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"} if login.status_code == 200 else {}
+    for target in targets:
+        if target.tenant_id:
+            await client.delete(f"/v1/tenants/{target.tenant_id}", headers=headers)
+
+
+# --- load phase -----------------------------------------------------------------------------
+
+
+class Workload:
+    def __init__(self, targets: List[Target], corpus: Corpus, args, rng: random.Random):
+        self.targets = targets
+        self.rng = rng
+        self.queries = corpus.queries(1000)
+        self.upload_docs = corpus.documents(50, args.doc_kb)
+        self.chat_model = args.chat_model or (STUB_CHAT if args.stub_models else None)
+        self.k = args.k
+
+    def request(self, op: str) -> dict:
+        """Keyword arguments for `client.request` for one operation."""
+        target = self.rng.choice(self.targets)
+        if op.startswith("query"):
+            datasets = target.rerank_datasets if op == "query_rerank" else target.datasets
+            body = {"query": self.rng.choice(self.queries), "dataset_ids": [self.rng.choice(datasets)], "k": self.k, "rewrite": False}
+            if op == "query_answer":
+                body["answer"] = True
+                if self.chat_model:
+                    body["answer_model"] = self.chat_model
+            return {"method": "POST", "url": "/v1/query", "json": body, "headers": target.headers}
+        dataset_id = self.rng.choice(target.datasets)
+        if op == "upload":
+            name, text = self.rng.choice(self.upload_docs)
+            # unique bytes per upload so content-hash dedup does not turn uploads into no-ops
+            data = f"{text}\n\n{uuid.uuid4().hex}".encode("utf-8")
+            return {
+                "method": "POST",
+                "url": "/v1/documents",
+                "params": {"dataset_id": dataset_id},
+                "files": [("files", (name, data, "text/plain"))],
+                "headers": target.headers,
+            }
+        return {"method": "GET", "url": "/v1/documents", "params": {"dataset_id": dataset_id, "page_size": 20}, "headers": target.headers}
+
+
+async def _send(client, recorder: Recorder, op: str, kwargs: dict) -> None:
+    started = time.perf_counter()
+    try:
+        resp = await client.request(**kwargs)
+    except Exception as exc:  # timeouts, refused connections
+        recorder.record(op, None, type(exc).__name__)
+        return
+    if resp.status_code >= 400:
+        recorder.record(op, None, str(resp.status_code))
+    else:
+        recorder.record(op, time.perf_counter() - started)
+
+
+async def drive(client, workload: Workload, mix: Dict[str, float], rps: float, duration: float, max_in_flight: int, recorder: Recorder) -> float:
+    """Send at `rps` for `duration` seconds on a fixed schedule; returns the elapsed seconds."""
+    ops, weights = list(mix), list(mix.values())
+    loop = asyncio.get_running_loop()
+    tasks = set()
+    start = loop.time()
+    sent = 0
+    reported = 0
+    while True:
+        due = start + sent / rps
+        if due >= start + duration:
+            break
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        op = workload.rng.choices(ops, weights)[0]
+        sent += 1
+        if len(tasks) >= max_in_flight:
+            recorder.record(op, None, "dropped")
+        else:
+            task = asyncio.create_task(_send(client, recorder, op, workload.request(op)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        while (loop.time() - start) >= (reported + 1) * recorder.interval:
+            _print_window(recorder.window_report(reported))
+            reported += 1
+    if tasks:
+        await asyncio.wait(tasks)
+    for window in sorted(recorder.windows):
+        if window >= reported:
+            _print_window(recorder.window_report(window))
+    return loop.time() - start
+
+
+async def run(args) -> dict:
+    try:
+        import httpx
+    except ImportError:  # pragma: no cover - httpx ships with the dev/test dependencies
+        raise SystemExit("benchmarks.loadtest needs httpx (pip install httpx)")
+
+    mix = parse_mix(args.mix)
+    if args.api_key is None and not args.admin_email:
+        raise SystemExit("pass --admin-email/--admin-password to create tenants, or --api-key for an existing tenant")
+    if "query_rerank" in mix and not (args.rerank_model or args.stub_models):
+        print("no rerank model (--rerank-model or --stub-models); dropping query_rerank from the mix", file=sys.stderr)
+        mix = parse_mix(",".join(f"{op}={w}" for op, w in mix.items() if op != "query_rerank"))
+    run_id = uuid.uuid4().hex[:8]
+    corpus = Corpus(seed=args.seed)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        targets = await bootstrap(client, args, corpus, run_id)
+        print(f"load: {args.rps:g} req/s for {args.duration:g}s against {len(targets)} tenant(s); mix {mix}", flush=True)
+        recorder = Recorder(args.interval)
+        workload = Workload(targets, corpus, args, random.Random(args.seed))
+        elapsed = await drive(client, workload, mix, args.rps, args.duration, args.max_in_flight, recorder)
+        if args.cleanup and args.admin_email and not args.api_key:
+            await cleanup(client, targets, args)
+    windows = [recorder.window_report(w) for w in sorted(recorder.windows)]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "run_id": run_id,
+            "base_url": args.base_url,
+            "tags": dict(tag.split("=", 1) if "=" in tag else (tag, "") for tag in args.tag),
+            "params": {"rps": args.rps, "duration": args.duration, "mix": mix, "tenants": len(targets), "seed_docs": args.seed_docs},
+        },
+        "summary": recorder.summary(elapsed),
+        "windows": windows,
+    }
+
+
+def _print_summary(summary: dict) -> None:
+    print(f"\n{'operation':<14}{'ok':>8}{'err':>7}{'err%':>8}{'ok/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for op, row in summary["operations"].items():
+        lat = "".join(f"{row[k]:>9.1f}" if k in row else f"{'-':>9}" for k in ("p50_ms", "p95_ms", "p99_ms"))
+        print(f"{op:<14}{row['ok']:>8}{row['errors']:>7}{row['error_rate']:>8.1%}{row['throughput_per_s']:>9.1f}{lat}")
+        if row["error_kinds"]:
+            print(f"{'':<14}errors: {', '.join(f'{k} x{v}' for k, v in sorted(row['error_kinds'].items()))}")
+    print(
+        f"{'total':<14}{summary['ok']:>8}{summary['errors']:>7}{summary['error_rate']:>8.1%}{summary['throughput_per_s']:>9.1f}"
+        + (f"   dropped {summary['dropped']}" if summary["dropped"] else "")
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    stub_ap = sub.add_parser("stub-models", help="serve stub embedding, rerank and chat endpoints")
+    stub_ap.add_argument("--host", default="127.0.0.1")
+    stub_ap.add_argument("--port", type=int, default=7700)
+    stub_ap.add_argument("--dim", type=int, default=384, help="embedding dimension")
+    stub_ap.add_argument("--latency-ms", type=float, default=0.0, help="added delay per model call")
+
+    run_ap = sub.add_parser("run", help="bootstrap tenants/datasets and replay the request mix")
+    run_ap.add_argument("--base-url", default="http://localhost:7615")
+    run_ap.add_argument("--admin-email", default=None, help="superuser for tenant creation and model registration")
+    run_ap.add_argument("--admin-password", default=None)
+    run_ap.add_argument("--api-key", default=None, help="use this existing tenant instead of creating tenants")
+    run_ap.add_argument("--stub-models", default=None, metavar="URL", help="register the stub model server at URL and use it")
+    run_ap.add_argument("--embedder", default=None, help=f"dataset embedder (default: {STUB_EMBEDDER} with --stub-models)")
+    run_ap.add_argument("--rerank-model", default=None, help="rerank model for the query_rerank datasets")
+    run_ap.add_argument("--chat-model", default=None, help="answer model for query_answer (default: the server's default)")
+    run_ap.add_argument("--chunk-strategy", default="sliding_window")
+    run_ap.add_argument("--tenants", type=int, default=1)
+    run_ap.add_argument("--datasets", type=int, default=1, help="datasets per tenant (each with a rerank twin)")
+    run_ap.add_argument("--seed-docs", type=int, default=20, help="documents uploaded per dataset before the load")
+    run_ap.add_argument("--seed-timeout", type=float, default=300.0, help="seconds to wait for seed ingest jobs")
+    run_ap.add_argument("--doc-kb", type=float, default=8.0, help="average synthetic document size")
+    run_ap.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations from: {', '.join(OPERATIONS)}")
+    run_ap.add_argument("--rps", type=float, default=20.0, help="target request rate")
+    run_ap.add_argument("--duration", type=float, default=60.0, help="seconds of load")
+    run_ap.add_argument("--interval", type=float, default=5.0, help="seconds per progress report")
+    run_ap.add_argument("--max-in-flight", type=int, default=256, help="concurrent requests before sends are dropped")
+    run_ap.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    run_ap.add_argument("--k", type=int, default=5)
+    run_ap.add_argument("--seed", type=int, default=0)
+    run_ap.add_argument("--tag", action="append", default=[], help="key=value recorded in the output (e.g. workers=4)")
+    run_ap.add_argument("--cleanup", action="store_true", help="delete the created tenants afterwards")
+    run_ap.add_argument("--out", default=None, help="write the JSON report here")
+    args = ap.parse_args(argv)
+
+    if args.command == "stub-models":
+        server = serve_stub_models(args.host, args.port, args.dim, args.latency_ms)
+        print(f"stub models on http://{args.host}:{server.server_address[1]} (dim {args.dim}, +{args.latency_ms:g}ms)", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    if args.embedder is None:
+        if not args.stub_models:
+            ap.error("--embedder is required without --stub-models")
+        args.embedder = STUB_EMBEDDER
+    report = asyncio.run(run(args))
+    _print_summary(report["summary"])
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
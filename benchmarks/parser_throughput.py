@@ -0,0 +1,177 @@
+"""
+Per-format parser throughput (MB/s) for core.parser.parse_text on synthetic documents.
+
+    uv run python -m benchmarks.parser_throughput --size-mb 2 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from core import parser
+
+_WORDS = (
+    "retrieval augmented generation tenant dataset chunk embedding vector index query rerank "
+    "answer latency throughput document parser token window overlap storage worker pipeline"
+).split()
+
+
+def _sentences(n: int, rng: random.Random) -> List[str]:
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "." for _ in range(n)]
+
+
+def _make_text(size: int, rng: random.Random) -> bytes:
+    out: List[str] = []
+    total = 0
+    while total < size:
+        para = " ".join(_sentences(5, rng)) + "\n\n"
+        out.append(para)
+        total += len(para)
+    return "".join(out).encode("utf-8")
+
+
+def _make_markdown(size: int, rng: random.Random) -> bytes:
+    out: List[str] = []
+    total = 0
+    section = 0
+    while total < size:
+        section += 1
+        body = " ".join(_sentences(4, rng))
+        block = f"## Section {section}\n\nSome **bold** text, a [link](https://example.com/{section}) and `code`.\n\n- {body}\n\n"
+        out.append(block)
+        total += len(block)
+    return "".join(out).encode("utf-8")
+
+
+def _make_html(size: int, rng: random.Random) -> bytes:
+    out = ["<!DOCTYPE html><html><head><title>bench</title><style>p{margin:0}</style></head><body>"]
+    total = 0
+    section = 0
+    while total < size:
+        section += 1
+        block = f"<h2>Section {section}</h2><div><p>{' '.join(_sentences(4, rng))}</p><ul><li>item</li></ul></div>"
+        out.append(block)
+        total += len(block)
+    out.append("</body></html>")
+    return "".join(out).encode("utf-8")
+
+
+def _make_pdf(size: int, rng: random.Random) -> bytes:
+    """Minimal multi-page PDF with Helvetica text content streams."""
+    pages: List[bytes] = []
+    total = 0
+    while total < size:
+        lines = " T* ".join(f"({line}) Tj" for line in _sentences(50, rng))
+        stream = f"BT /F1 9 Tf 36 770 Td 11 TL {lines} ET".encode("latin-1")
+        pages.append(stream)
+        total += len(stream)
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # pages tree, filled below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for stream in pages:
+        page_id = len(objects) + 1
+        kids.append(f"{page_id} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for idx, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % idx + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _make_docx(size: int, rng: random.Random) -> bytes:
+    import io
+
+    import docx  # type: ignore
+
+    document = docx.Document()
+    total = 0
+    while total < size:
+        para = " ".join(_sentences(5, rng))
+        document.add_paragraph(para)
+        total += len(para)
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+FORMATS: Dict[str, tuple[str, str, Callable[[int, random.Random], bytes]]] = {
+    "txt": (".txt", "text/plain", _make_text),
+    "md": (".md", "text/markdown", _make_markdown),
+    "html": (".html", "text/html", _make_html),
+    "pdf": (".pdf", "application/pdf", _make_pdf),
+    "docx": (".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", _make_docx),
+}
+
+
+def run(size_mb: float, repeat: int, formats: List[str], seed: int = 0) -> List[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in formats:
+            suffix, mime, factory = FORMATS[name]
+            try:
+                data = factory(int(size_mb * 1024 * 1024), random.Random(seed))
+            except ImportError as exc:
+                results.append({"format": name, "skipped": f"missing dependency: {exc.name}"})
+                continue
+            path = Path(tmp) / f"bench{suffix}"
+            path.write_bytes(data)
+            timings = []
+            chars = 0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                text, _ = parser.parse_text(str(path), mime)
+                timings.append(time.perf_counter() - started)
+                chars = len(text)
+            best = min(timings)
+            results.append(
+                {
+                    "format": name,
+                    "bytes": len(data),
+                    "chars_out": chars,
+                    "best_s": round(best, 4),
+                    "mb_per_s": round(len(data) / (1024 * 1024) / best, 2),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size-mb", type=float, default=2.0, help="approximate input size per format")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--formats", default=",".join(FORMATS), help="comma separated subset of: " + ", ".join(FORMATS))
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args()
+    results = run(args.size_mb, args.repeat, [f.strip() for f in args.formats.split(",") if f.strip()])
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'format':<8}{'MB':>8}{'best s':>10}{'MB/s':>10}")
+    for row in results:
+        if "skipped" in row:
+            print(f"{row['format']:<8}  skipped ({row['skipped']})")
+            continue
+        print(f"{row['format']:<8}{row['bytes'] / 1048576:>8.2f}{row['best_s']:>10.3f}{row['mb_per_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
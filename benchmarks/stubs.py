@@ -0,0 +1,82 @@
+"""
+Stand-ins for the model and vector services, so benchmarks measure RAGLite's own code path
+without a GPU, network calls or a Qdrant server.
+"""
+
+import hashlib
+import math
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+EMBED_DIM = 64
+
+
+def _bucket(token: str, dim: int) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=4).digest(), "little") % dim
+
+
+def hash_embed(texts: List[str], model_name: Optional[str] = None, dim: int = EMBED_DIM) -> List[List[float]]:
+    """Normalized hashed bag-of-words vectors: deterministic, cheap, and similar texts score higher."""
+    out = []
+    for text in texts:
+        vec = [0.0] * dim
+        for token in text.lower().split():
+            vec[_bucket(token, dim)] += 1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        out.append([v / norm for v in vec])
+    return out
+
+
+class InMemoryVectorStore:
+    """Brute-force cosine search over numpy arrays, with the vector store interface of core.vectorstore."""
+
+    def __init__(self):
+        self._points: Dict[tuple, Dict[str, tuple]] = {}
+        self._matrix: Dict[tuple, tuple] = {}  # (ids, payloads, matrix), rebuilt after writes
+        self._lock = threading.Lock()
+
+    def upsert(self, tenant_id: str, dataset_id: str, vectors: Iterable[dict]) -> None:
+        key = (tenant_id, dataset_id)
+        with self._lock:
+            points = self._points.setdefault(key, {})
+            for item in vectors:
+                points[str(item["id"])] = (item["vector"], item.get("payload") or {})
+            self._matrix.pop(key, None)
+
+    def _snapshot(self, key: tuple):
+        with self._lock:
+            cached = self._matrix.get(key)
+            if cached is None and self._points.get(key):
+                points = self._points[key]
+                ids = list(points)
+                cached = (ids, [points[i][1] for i in ids], np.asarray([points[i][0] for i in ids], dtype=np.float32))
+                self._matrix[key] = cached
+            return cached
+
+    def query(self, tenant_id: str, dataset_ids: List[str], vector: List[float], k: int, filters: Optional[dict] = None) -> List[dict]:
+        query = np.asarray(vector, dtype=np.float32)
+        results = []
+        for ds in dataset_ids or ["default"]:
+            snap = self._snapshot((tenant_id, ds))
+            if snap is None:
+                continue
+            ids, payloads, matrix = snap
+            scores = matrix @ query
+            for idx in np.argsort(-scores)[:k]:
+                results.append({"id": ids[idx], "score": float(scores[idx]), "payload": payloads[idx]})
+        return sorted(results, key=lambda x: x["score"], reverse=True)[:k]
+
+    def delete_dataset(self, tenant_id: str, dataset_id: str) -> None:
+        with self._lock:
+            self._points.pop((tenant_id, dataset_id), None)
+            self._matrix.pop((tenant_id, dataset_id), None)
+
+    def delete_document(self, tenant_id: str, dataset_id: str, document_id: str) -> None:
+        key = (tenant_id, dataset_id)
+        with self._lock:
+            points = self._points.get(key, {})
+            for pid in [pid for pid, (_, payload) in points.items() if payload.get("document_id") == document_id]:
+                del points[pid]
+            self._matrix.pop(key, None)
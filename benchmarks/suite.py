@@ -0,0 +1,346 @@
+"""
+Reproducible performance baseline: ingest throughput through core.pipeline, query latency
+through the FastAPI app, and microbenchmarks of the chunker, parser and in-memory BM25, all
+on a deterministic synthetic corpus. Embeddings come from a hashing stub and vectors live in
+an in-process store, so the numbers cover RAGLite's own code rather than model or network time.
+
+    uv run python -m benchmarks.suite run --docs 200 --queries 500 --out bench.json
+    uv run python -m benchmarks.suite run --baseline baseline.json   # run, then compare
+    uv run python -m benchmarks.suite compare baseline.json bench.json --threshold 0.15
+
+Every result is a flat metric name: `*_per_s` is better higher, `*_ms`/`*_s` and `*.errors`
+better lower, anything else is reported but never flagged. `compare` exits non-zero on a regression larger
+than the threshold (relative change), so it can gate CI against a saved baseline.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpus import Corpus
+
+ROOT = Path(__file__).resolve().parent.parent
+TENANT_ID = "bench-tenant"
+API_KEY = "bench-key"
+
+
+def configure(tmp: str) -> None:
+    """Point settings at throwaway local storage; must run before any app/core/infra import."""
+    os.environ.update(
+        {
+            "RAGLITE_ENVIRONMENT": "dev",
+            "RAGLITE_POSTGRES_DSN": f"sqlite:///{tmp}/bench.db",
+            "RAGLITE_OBJECT_STORE_BACKEND": "local",
+            "RAGLITE_OBJECT_STORE_ROOT": f"{tmp}/objects",
+            "RAGLITE_QDRANT_URL": "",
+            "RAGLITE_OPENSEARCH_URL": "",
+            "RAGLITE_BM25_SNAPSHOT_DIR": "",
+            "RAGLITE_BM25_WARMUP": "off",
+            "RAGLITE_TASK_EXECUTION": "inline",
+            "RAGLITE_RATE_LIMIT_PER_MINUTE": "0",
+            "RAGLITE_INGEST_CACHE_MAX_MB": "0",
+            "RAGLITE_ENABLE_BOOTSTRAP": "false",
+        }
+    )
+
+
+def install_stubs():
+    """Hashing embedder plus in-process vector store and BM25; returns the BM25 index."""
+    from benchmarks import stubs
+    from core import embedder, providers
+    from core.bm25_memory import MemoryBM25
+
+    embedder.embed_texts = stubs.hash_embed
+    bm25 = MemoryBM25()
+    providers.override(vector_store=stubs.InMemoryVectorStore(), bm25_client=bm25)
+    return bm25
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p95/p99 of `samples` (seconds), in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    out = {}
+    for q in (50, 95, 99):
+        idx = min(len(ordered), max(1, math.ceil(q / 100 * len(ordered)))) - 1
+        out[f"p{q}_ms"] = round(ordered[idx] * 1000, 3)
+    return out
+
+
+def _seed_documents(db, tmp: str, dataset_name: str, docs: List[tuple]) -> tuple:
+    from infra import models
+
+    dataset = models.Dataset(id=str(uuid.uuid4()), tenant_id=TENANT_ID, name=dataset_name, chunk_strategy="sliding_window")
+    db.add(dataset)
+    folder = Path(tmp) / "docs" / dataset.id
+    folder.mkdir(parents=True)
+    rows = []
+    for filename, text in docs:
+        data = text.encode("utf-8")
+        path = folder / filename
+        path.write_bytes(data)
+        rows.append(
+            models.Document(
+                id=str(uuid.uuid4()),
+                tenant_id=TENANT_ID,
+                dataset_id=dataset.id,
+                path=str(path),
+                filename=filename,
+                mime_type="text/plain",
+                size_bytes=len(data),
+                content_hash=str(uuid.uuid4()),
+            )
+        )
+    db.add_all(rows)
+    db.commit()
+    return dataset.id, rows
+
+
+def bench_ingest(tmp: str, corpus: Corpus, docs: int, doc_kb: float) -> tuple:
+    """Per-document ingest_document calls vs one ingest_batch job; returns (metrics, dataset_id)."""
+    from core import pipeline
+    from infra import models
+    from infra.db import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    texts = corpus.documents(docs, doc_kb)
+    total_bytes = sum(len(t.encode("utf-8")) for _, t in texts)
+    db = SessionLocal()
+    try:
+        db.add(models.Tenant(id=TENANT_ID, name="bench"))
+        db.commit()
+        results: Dict[str, float] = {"ingest.docs": docs, "ingest.mb": round(total_bytes / 1048576, 3)}
+
+        single_ds, rows = _seed_documents(db, tmp, "single", texts)
+        started = time.perf_counter()
+        for doc in rows:
+            pipeline.ingest_document(None, TENANT_ID, single_ds, doc.id, doc.path, doc.mime_type)
+        _throughput(results, "ingest.single", time.perf_counter() - started, docs, _chunk_count(db, single_ds))
+
+        batch_ds, rows = _seed_documents(db, tmp, "batch", texts)
+        job = models.Job(tenant_id=TENANT_ID, type=models.JobType.ingest.value)
+        db.add(job)
+        db.commit()
+        started = time.perf_counter()
+        pipeline.ingest_batch(job.id, TENANT_ID, batch_ds, [d.id for d in rows])
+        _throughput(results, "ingest.batch", time.perf_counter() - started, docs, _chunk_count(db, batch_ds))
+        return results, batch_ds
+    finally:
+        db.close()
+
+
+def _chunk_count(db, dataset_id: str) -> int:
+    from infra import models
+
+    return db.query(models.Chunk).filter(models.Chunk.dataset_id == dataset_id).count()
+
+
+def _throughput(results: Dict[str, float], prefix: str, seconds: float, docs: int, chunks: int) -> None:
+    results[f"{prefix}.chunks"] = chunks
+    results[f"{prefix}.docs_per_s"] = round(docs / seconds, 2)
+    results[f"{prefix}.chunks_per_s"] = round(chunks / seconds, 2)
+
+
+def bench_query(corpus: Corpus, dataset_id: str, queries: int, warmup: int = 10) -> Dict[str, float]:
+    """POST /v1/query end to end (auth, embed, vector + BM25 search, merge, query log)."""
+    from fastapi.testclient import TestClient
+
+    from app.deps import register_api_key
+    from app.main import app
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+    register_api_key(API_KEY, TENANT_ID)
+    headers = {"Authorization": f"Bearer {API_KEY}"}
+    texts = corpus.queries(queries + warmup)
+    timings: List[float] = []
+    errors = 0
+    with TestClient(app) as client:
+        for idx, text in enumerate(texts):
+            body = {"query": text, "dataset_ids": [dataset_id], "k": 10, "min_score": 0}
+            started = time.perf_counter()
+            resp = client.post("/v1/query", json=body, headers=headers)
+            elapsed = time.perf_counter() - started
+            if idx < warmup:
+                continue
+            if resp.status_code != 200:
+                errors += 1
+                continue
+            timings.append(elapsed)
+    results: Dict[str, float] = {"query.count": queries, "query.errors": errors}
+    results.update({f"query.{k}": v for k, v in percentiles(timings).items()})
+    if timings:
+        results["query.requests_per_s"] = round(len(timings) / sum(timings), 2)
+    return results
+
+
+def _best_rate(fn: Callable[[], object], size: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return size / best
+
+
+def bench_micro(tmp: str, corpus: Corpus, queries: int, repeat: int, bm25_chunks: int = 5000) -> Dict[str, float]:
+    from benchmarks import parser_throughput
+    from core import chunker
+    from core.bm25_memory import MemoryBM25
+
+    results: Dict[str, float] = {}
+    text = corpus.document(1024 * 1024, random.Random(corpus.seed + 3))
+    mb = len(text.encode("utf-8")) / 1048576
+    results["micro.sliding_window.mb_per_s"] = round(_best_rate(lambda: chunker.sliding_window(text), mb, repeat), 2)
+
+    for row in parser_throughput.run(1.0, repeat, ["txt", "md", "html"], seed=corpus.seed):
+        if "mb_per_s" in row:
+            results[f"micro.parse_text.{row['format']}.mb_per_s"] = row["mb_per_s"]
+
+    rng = random.Random(corpus.seed + 4)
+    chunks = [{"id": f"c{i}", "document_id": f"d{i // 50}", "text": corpus.document(400, rng)} for i in range(bm25_chunks)]
+    search_texts = corpus.queries(queries)
+    for label, index in (("memory", MemoryBM25()), ("snapshot", MemoryBM25(snapshot_dir=str(Path(tmp) / "bm25")))):
+        index.rebuild_from_chunks(TENANT_ID, "micro", chunks)
+        index.search(TENANT_ID, ["micro"], search_texts[0], k=10)  # first call opens/builds the index
+        timings = []
+        for q in search_texts:
+            started = time.perf_counter()
+            index.search(TENANT_ID, ["micro"], q, k=10)
+            timings.append(time.perf_counter() - started)
+        for key, value in percentiles(timings).items():
+            results[f"micro.bm25_search.{label}.{key}"] = value
+    results["micro.bm25_search.chunks"] = bm25_chunks
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def run(docs: int, doc_kb: float, queries: int, repeat: int, seed: int = 0, bm25_chunks: int = 5000) -> dict:
+    params = {"docs": docs, "doc_kb": doc_kb, "queries": queries, "repeat": repeat, "seed": seed, "bm25_chunks": bm25_chunks}
+    with tempfile.TemporaryDirectory(prefix="raglite-bench-") as tmp:
+        configure(tmp)
+        install_stubs()
+        corpus = Corpus(seed=seed)
+        metrics: Dict[str, float] = {}
+        ingest, dataset_id = bench_ingest(tmp, corpus, docs, doc_kb)
+        metrics.update(ingest)
+        metrics.update(bench_query(corpus, dataset_id, queries))
+        metrics.update(bench_micro(tmp, corpus, queries, repeat, bm25_chunks))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": params,
+        },
+        "metrics": metrics,
+    }
+
+
+def direction(metric: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 for informational values."""
+    if metric.endswith("_per_s"):
+        return 1
+    if metric.endswith("_ms") or metric.endswith("_s") or metric.endswith(".errors"):
+        return -1
+    return 0
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[dict]:
+    """One row per metric present in both runs; `regression` marks a worse change beyond `threshold`."""
+    rows = []
+    base_metrics, cur_metrics = baseline.get("metrics", {}), current.get("metrics", {})
+    for name in sorted(set(base_metrics) & set(cur_metrics)):
+        old, new = base_metrics[name], cur_metrics[name]
+        if old:
+            change = (new - old) / old
+        else:
+            change = float("inf") if new else 0.0  # e.g. errors appearing where there were none
+        sign = direction(name)
+        rows.append(
+            {
+                "metric": name,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 4),
+                "regression": bool(sign) and -sign * change > threshold,
+            }
+        )
+    return rows
+
+
+def _print_comparison(rows: List[dict], threshold: float) -> None:
+    print(f"{'metric':<44}{'baseline':>12}{'current':>12}{'change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<44}{row['baseline']:>12g}{row['current']:>12g}{row['change']:>+9.1%}{flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    run_ap = sub.add_parser("run", help="run all workloads and write JSON results")
+    run_ap.add_argument("--docs", type=int, default=200, help="synthetic documents to ingest")
+    run_ap.add_argument("--doc-kb", type=float, default=8.0, help="average document size")
+    run_ap.add_argument("--queries", type=int, default=300, help="timed /v1/query requests and BM25 searches")
+    run_ap.add_argument("--repeat", type=int, default=3, help="repetitions per microbenchmark; the best is kept")
+    run_ap.add_argument("--bm25-chunks", type=int, default=5000, help="index size for the BM25 search microbenchmark")
+    run_ap.add_argument("--seed", type=int, default=0)
+    run_ap.add_argument("--out", default=None, help="write results here (default: stdout)")
+    run_ap.add_argument("--baseline", default=None, help="compare against this earlier result afterwards")
+    run_ap.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    cmp_ap = sub.add_parser("compare", help="compare two result files")
+    cmp_ap.add_argument("baseline")
+    cmp_ap.add_argument("current")
+    cmp_ap.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = ap.parse_args(argv)
+
+    if args.command == "run":
+        result = run(args.docs, args.doc_kb, args.queries, args.repeat, args.seed, args.bm25_chunks)
+        text = json.dumps(result, indent=2, sort_keys=True)
+        if args.out:
+            Path(args.out).write_text(text + "\n", encoding="utf-8")
+        else:
+            print(text)
+        if not args.baseline:
+            return 0
+        baseline, current = _load(args.baseline), result
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+    if baseline.get("meta", {}).get("params") != current.get("meta", {}).get("params"):
+        print("warning: the runs used different parameters; changes may not be regressions", file=sys.stderr)
+    rows = compare(baseline, current, args.threshold)
+    _print_comparison(rows, args.threshold)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,16 +3,19 @@ from typing import Iterable, Optional
 
 import requests
 
-from app.settings_service import get_app_settings_db, get_model_config_by_name
+from app.settings_service import SETTINGS_LOOKUP_SECONDS, get_app_settings_db, get_model_config_by_name
+from core import metrics
 from infra import models
 from infra.db import SessionLocal
 
 logger = logging.getLogger(__name__)
+ANSWER_FAILURES = metrics.counter("raglite_answer_failures", "Answer generations that failed and returned no answer")
 
 MAX_SOURCES = 4
 MAX_SOURCE_CHARS = 1200
 
 
+@SETTINGS_LOOKUP_SECONDS.time(kind="chat")
 def _resolve_chat_config(model_name: Optional[str]) -> Optional[models.ModelConfig]:
     db = SessionLocal()
     try:
@@ -93,6 +96,7 @@ def generate_answer(question: str, results: Iterable[dict], model_name: Optional
         answer = _chat_openai_compatible(messages, cfg)
     except Exception as exc:
         logger.warning("Chat model failed: %s", exc)
+        ANSWER_FAILURES.inc()
         return None
 
     return answer or None
@@ -1,31 +1,203 @@
+import logging
+import os
+import re
+import threading
 from collections import defaultdict
-from typing import Dict, Iterable, List, Tuple
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from rank_bm25 import BM25Okapi  # type: ignore
 
+from app.config import get_settings
+from core.bm25_snapshot import Bm25Snapshot, write_snapshot
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_SAFE_ID = re.compile(r"[A-Za-z0-9_.-]+")
+
 
 class MemoryBM25:
-    def __init__(self):
+    """
+    Process-local BM25 fallback when OpenSearch is unavailable. With a `loader` installed,
+    a dataset's chunks are streamed in on its first search instead of at startup.
+
+    With a `snapshot_dir`, a fully loaded dataset lives in a read-only memory-mapped file
+    (see core.bm25_snapshot) instead of process memory: every process on the host shares it
+    through the page cache, a restart reopens it without reloading every chunk, and updates
+    rewrite it atomically under a per-dataset file lock. Other processes notice the replaced
+    file on their next search. With a `counter` (live chunks per dataset in the database), a
+    snapshot is checked against it when first opened and rebuilt through `loader` if its document
+    count no longer matches, e.g. after chunks changed while no process had the dataset loaded.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[str, str], Iterable[dict]]] = None,
+        snapshot_dir: Optional[str] = None,
+        counter: Optional[Callable[[str, str], int]] = None,
+    ):
         self.indices: Dict[Tuple[str, str], BM25Okapi] = {}
         self.payloads: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+        self.snapshots: Dict[Tuple[str, str], Bm25Snapshot] = {}
+        self.loader = loader
+        self.counter = counter
+        self.snapshot_dir = snapshot_dir
+        self._loaded: set = set()
+        self._lock = threading.RLock()  # loads and updates of the same process-wide index
+
+    def set_loader(
+        self,
+        loader: Optional[Callable[[str, str], Iterable[dict]]],
+        counter: Optional[Callable[[str, str], int]] = None,
+    ) -> None:
+        self.loader = loader
+        self.counter = counter
+
+    def _snapshot_path(self, key: Tuple[str, str]) -> Optional[str]:
+        # dataset ids come from requests; anything that is not a plain id stays in memory
+        if not self.snapshot_dir or not all(_SAFE_ID.fullmatch(part) and part not in (".", "..") for part in key):
+            return None
+        return os.path.join(self.snapshot_dir, key[0], f"{key[1]}.bm25")
+
+    def _snapshot(self, key: Tuple[str, str]) -> Optional[Bm25Snapshot]:
+        """The dataset's snapshot, reopened when another process has replaced the file."""
+        path = self._snapshot_path(key)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.snapshots.pop(key, None)
+            return None
+        snap = self.snapshots.get(key)
+        if snap is not None and snap.identity == (st.st_ino, st.st_mtime_ns, st.st_size):
+            return snap
+        try:
+            snap = Bm25Snapshot(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Ignoring unreadable BM25 snapshot %s", path, exc_info=True)
+            return None
+        self.snapshots[key] = snap
+        return snap
+
+    @contextmanager
+    def _update(self, key: Tuple[str, str]) -> Iterator[None]:
+        """Serialize read-modify-write of one dataset, across processes when it is snapshotted."""
+        with self._lock:
+            path = self._snapshot_path(key)
+            if path is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.lock", "a+b") as fh:
+                try:
+                    import fcntl
+
+                    fcntl.flock(fh, fcntl.LOCK_EX)
+                except ImportError:  # pragma: no cover - non-POSIX: rely on atomic replace only
+                    pass
+                yield
+
+    def _items(self, key: Tuple[str, str]) -> List[dict]:
+        snap = self._snapshot(key)
+        if snap is not None:
+            return snap.items()
+        return list(self.payloads.get(key, []))
+
+    def _set(self, key: Tuple[str, str], items: List[dict], persist: bool = True) -> None:
+        """Replace the dataset's index; `persist` is only honoured for complete datasets."""
+        path = self._snapshot_path(key) if persist else None
+        if path is not None:
+            try:
+                if items:
+                    write_snapshot(path, items)
+                else:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.warning("Could not write BM25 snapshot %s; keeping the index in memory", path, exc_info=True)
+            else:
+                self.snapshots.pop(key, None)
+                self.indices.pop(key, None)
+                self.payloads.pop(key, None)
+                return
+        if not items:
+            self.indices.pop(key, None)
+            self.payloads.pop(key, None)
+            return
+        self.indices[key] = BM25Okapi([doc["text"].split() for doc in items])
+        self.payloads[key] = items
+
+    def ensure_loaded(self, tenant_id: str, dataset_id: str) -> bool:
+        """
+        Load the dataset from its snapshot, or else through `loader`, unless already done;
+        True when this call loaded it.
+        """
+        key = (tenant_id, dataset_id)
+        if key in self._loaded:
+            return False
+        with self._lock:
+            if key in self._loaded:
+                return False
+            if not self._current(key):
+                if self.loader is None:
+                    return False
+                with self._update(key):
+                    # another process may have rebuilt the snapshot while we waited for the lock
+                    if not self._current(key):
+                        self._set(key, self._chunk_items(tenant_id, dataset_id, self.loader(tenant_id, dataset_id)))
+            self._loaded.add(key)
+        return True
+
+    def _current(self, key: Tuple[str, str]) -> bool:
+        """Whether the dataset has a snapshot that still matches the database's chunk count."""
+        snap = self._snapshot(key)
+        if snap is None:
+            return False
+        if self.counter is None:
+            return True
+        try:
+            expected = self.counter(*key)
+        except Exception:
+            logger.warning("Could not check the BM25 snapshot of dataset %s; using it as is", key[1], exc_info=True)
+            return True
+        if len(snap) == expected:
+            return True
+        logger.info("BM25 snapshot for dataset %s holds %d chunks, database has %d; rebuilding", key[1], len(snap), expected)
+        return False
+
+    def is_loaded(self, tenant_id: str, dataset_id: str) -> bool:
+        return (tenant_id, dataset_id) in self._loaded
 
     def index_documents(self, tenant_id: str, dataset_id: str, items: List[dict]):
         """Add/update documents to the BM25 index."""
         key = (tenant_id, dataset_id)
-        tokens = [doc["text"].split() for doc in items]
-        self.indices[key] = BM25Okapi(tokens)
-        self.payloads[key] = items
+        # a snapshot must hold the whole dataset, so complete it before merging new chunks
+        self.ensure_loaded(tenant_id, dataset_id)
+        with self._update(key):
+            complete = key in self._loaded or self._snapshot(key) is not None
+            merged = {doc["id"]: doc for doc in self._items(key)}
+            merged.update((doc["id"], doc) for doc in items)
+            self._set(key, list(merged.values()), persist=complete)
 
     def search(self, tenant_id: str, dataset_ids: List[str], query: str, k: int) -> List[dict]:
         results = []
         for ds in dataset_ids:
             key = (tenant_id, ds)
-            if key not in self.indices:
+            self.ensure_loaded(tenant_id, ds)
+            snap = self._snapshot(key)
+            if snap is not None:
+                paired = snap.search(query.split(), k)
+            elif key in self.indices:
+                scores = self.indices[key].get_scores(query.split())
+                payloads = self.payloads.get(key, [])
+                paired = sorted(zip(payloads, scores), key=lambda x: x[1], reverse=True)[:k]
+            else:
                 continue
-            bm25 = self.indices[key]
-            scores = bm25.get_scores(query.split())
-            payloads = self.payloads.get(key, [])
-            paired = sorted(zip(payloads, scores), key=lambda x: x[1], reverse=True)[:k]
             for payload, score in paired:
                 results.append({"id": payload["id"], "score": float(score), "payload": payload["payload"]})
         results = sorted(results, key=lambda x: x.get("score", 0), reverse=True)[:k]
@@ -33,23 +205,26 @@ class MemoryBM25:
 
     def delete_dataset(self, tenant_id: str, dataset_id: str):
         key = (tenant_id, dataset_id)
-        self.indices.pop(key, None)
-        self.payloads.pop(key, None)
+        with self._update(key):
+            self._set(key, [])
 
     def delete_document(self, tenant_id: str, dataset_id: str, document_id: str):
         key = (tenant_id, dataset_id)
-        if key not in self.indices:
-            return
-        payloads = self.payloads.get(key, [])
-        filtered = [p for p in payloads if p["payload"].get("document_id") != document_id]
-        if filtered:
-            tokens = [doc["text"].split() for doc in filtered]
-            self.indices[key] = BM25Okapi(tokens)
-            self.payloads[key] = filtered
-        else:
-            self.delete_dataset(tenant_id, dataset_id)
+        with self._update(key):
+            persisted = self._snapshot(key) is not None
+            if not persisted and key not in self.indices:
+                return
+            items = [p for p in self._items(key) if p["payload"].get("document_id") != document_id]
+            self._set(key, items, persist=persisted or key in self._loaded)
 
     def rebuild_from_chunks(self, tenant_id: str, dataset_id: str, chunks: Iterable[dict]):
+        key = (tenant_id, dataset_id)
+        items = self._chunk_items(tenant_id, dataset_id, chunks)
+        with self._update(key):
+            self._set(key, items)
+
+    @staticmethod
+    def _chunk_items(tenant_id: str, dataset_id: str, chunks: Iterable[dict]) -> List[dict]:
         items = []
         for ch in chunks:
             items.append(
@@ -65,8 +240,7 @@ class MemoryBM25:
                     },
                 }
             )
-        if items:
-            self.index_documents(tenant_id, dataset_id, items)
+        return items
 
 
-bm25_memory = MemoryBM25()
+bm25_memory = MemoryBM25(snapshot_dir=settings.bm25_snapshot_dir or None)
@@ -0,0 +1,207 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from rank_bm25 import BM25Okapi  # type: ignore
+
+# File layout: MAGIC, little-endian u32 header length, JSON header, then 8-byte aligned arrays.
+# The header records each array as [offset, dtype, count] so readers map them without copying.
+MAGIC = b"RLBM25\x00\x01"
+FORMAT_VERSION = 1
+_ALIGN = 8
+
+
+def _pack(sections: Dict[str, np.ndarray], meta: dict) -> Tuple[bytes, List[Tuple[int, np.ndarray]]]:
+    # offsets depend on the header length, which depends on the offsets; two passes settle it
+    header = b""
+    for _ in range(2):
+        offset = len(MAGIC) + 4 + len(header)
+        offset += -offset % _ALIGN
+        layout, placed = {}, []
+        for name, arr in sections.items():
+            layout[name] = [offset, arr.dtype.str, int(arr.size)]
+            placed.append((offset, arr))
+            offset += arr.nbytes
+            offset += -offset % _ALIGN
+        header = json.dumps({**meta, "sections": layout}, separators=(",", ":")).encode()
+    return header, placed
+
+
+def write_snapshot(path: str, items: List[dict], k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25) -> None:
+    """
+    Serialize `items` ({"id", "text", "payload"}) as a BM25 snapshot. Scoring matches
+    rank_bm25's BM25Okapi. The file is written next to `path` and moved into place with
+    os.replace, so readers holding the previous snapshot keep a consistent mapping.
+    """
+    bm25 = BM25Okapi([doc["text"].split() for doc in items], k1=k1, b=b, epsilon=epsilon)
+    terms = sorted(bm25.idf, key=lambda t: t.encode())
+    term_ids = {term: i for i, term in enumerate(terms)}
+    postings: List[List[Tuple[int, int]]] = [[] for _ in terms]
+    for doc_id, freqs in enumerate(bm25.doc_freqs):
+        for term, tf in freqs.items():
+            postings[term_ids[term]].append((doc_id, tf))
+    term_offsets = np.zeros(len(terms) + 1, dtype="<i8")
+    term_offsets[1:] = np.cumsum([len(p) for p in postings])
+    flat = [pair for plist in postings for pair in plist]
+    encoded_terms = [t.encode() for t in terms]
+    encoded_payloads = [json.dumps(_stored(doc), default=str).encode() for doc in items]
+    sections = {
+        "doc_len": np.asarray(bm25.doc_len, dtype="<i4"),
+        "term_offsets": term_offsets,
+        "post_doc": np.asarray([d for d, _ in flat], dtype="<i4"),
+        "post_tf": np.asarray([tf for _, tf in flat], dtype="<i4"),
+        "idf": np.asarray([bm25.idf[t] for t in terms], dtype="<f8"),
+        "vocab_offsets": _offsets(encoded_terms),
+        "vocab": np.frombuffer(b"".join(encoded_terms), dtype="u1"),
+        "payload_offsets": _offsets(encoded_payloads),
+        "payloads": np.frombuffer(b"".join(encoded_payloads), dtype="u1"),
+    }
+    meta = {
+        "version": FORMAT_VERSION,
+        "n_docs": len(items),
+        "n_terms": len(terms),
+        "avgdl": float(bm25.avgdl),
+        "k1": k1,
+        "b": b,
+    }
+    header, placed = _pack(sections, meta)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".bm25-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(MAGIC + struct.pack("<I", len(header)) + header)
+            for offset, arr in placed:
+                fh.write(b"\0" * (offset - fh.tell()))
+                fh.write(arr.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _stored(doc: dict) -> dict:
+    # chunk payloads already carry the indexed text; keep a separate copy only when it differs
+    stored = {"id": doc["id"], "payload": doc["payload"]}
+    if doc["text"] != (doc["payload"] or {}).get("text"):
+        stored["text"] = doc["text"]
+    return stored
+
+
+def _offsets(blobs: List[bytes]) -> np.ndarray:
+    offsets = np.zeros(len(blobs) + 1, dtype="<i8")
+    offsets[1:] = np.cumsum([len(blob) for blob in blobs])
+    return offsets
+
+
+class _Vocab:
+    """Sorted term list read straight from the mapping, searchable with bisect."""
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._blob[self._offsets[i] : self._offsets[i + 1]].tobytes()
+
+    def lookup(self, term: str) -> int:
+        key = term.encode()
+        i = bisect_left(self, key)
+        return i if i < len(self) and self[i] == key else -1
+
+
+class Bm25Snapshot:
+    """
+    Read-only view of a snapshot file. Arrays are numpy views over a shared mmap, so the
+    kernel page cache holds one copy for every process that opens the same file; only the
+    payloads of returned hits are decoded.
+    """
+
+    def __init__(self, path: str):
+        # the mapping is released with the last array view, so there is no explicit close
+        self.path = path
+        with open(path, "rb") as fh:
+            st = os.fstat(fh.fileno())
+            self.identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mm[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a BM25 snapshot")
+            (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+            start = len(MAGIC) + 4
+            header = json.loads(self._mm[start : start + header_len])
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported BM25 snapshot version {header.get('version')}")
+            arrays = {
+                name: np.frombuffer(self._mm, dtype=np.dtype(dtype), count=count, offset=offset)
+                for name, (offset, dtype, count) in header["sections"].items()
+            }
+        except Exception:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass
+            raise
+        self.n_docs: int = header["n_docs"]
+        self.avgdl: float = header["avgdl"]
+        self.k1: float = header["k1"]
+        self.b: float = header["b"]
+        self._arrays = arrays
+        self._vocab = _Vocab(arrays["vocab_offsets"], arrays["vocab"])
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def get_scores(self, query: List[str]) -> np.ndarray:
+        scores = np.zeros(self.n_docs)
+        a = self._arrays
+        for term in query:
+            t = self._vocab.lookup(term)
+            if t < 0:
+                continue
+            start, end = a["term_offsets"][t], a["term_offsets"][t + 1]
+            docs = a["post_doc"][start:end]
+            tf = a["post_tf"][start:end]
+            norm = self.k1 * (1 - self.b + self.b * a["doc_len"][docs] / self.avgdl)
+            scores[docs] += a["idf"][t] * (tf * (self.k1 + 1) / (tf + norm))
+        return scores
+
+    def payload(self, i: int) -> dict:
+        offsets = self._arrays["payload_offsets"]
+        return json.loads(self._arrays["payloads"][offsets[i] : offsets[i + 1]].tobytes())
+
+    def items(self) -> List[dict]:
+        """Every document as an index item, for rewriting the snapshot after an update."""
+        out = []
+        for i in range(self.n_docs):
+            doc = self.payload(i)
+            out.append({"id": doc["id"], "text": doc.get("text", doc["payload"].get("text")), "payload": doc["payload"]})
+        return out
+
+    def search(self, query: List[str], k: int) -> List[Tuple[dict, float]]:
+        if not self.n_docs:
+            return []
+        scores = self.get_scores(query)
+        # stable order on ties, as with sorting the in-memory index
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(self.payload(int(i)), float(scores[i])) for i in top]
+
+
+def open_snapshot(path: str) -> Optional[Bm25Snapshot]:
+    try:
+        return Bm25Snapshot(path)
+    except FileNotFoundError:
+        return None
@@ -1,26 +1,289 @@
-from typing import List, Tuple
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.parser import strip_markdown
+
+ChunkerFn = Callable[..., List[Tuple[int, int, str]]]
+
+_CHUNKERS: Dict[str, ChunkerFn] = {}
+
+# CJK ideographs, kana and hangul carry meaning per character and are not space separated.
+_CJK = "぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_WHITESPACE_TOKEN_RE = re.compile(r"\S+")
+_TOKEN_RE = re.compile(rf"[{_CJK}]|[^\s{_CJK}]+")
+_SENTENCE_RE = re.compile(r"[^.!?。！？\n]*(?:[.!?。！？]+[\"')\]]*|\n|$)")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_HEADING_RE = re.compile(r"^#{1,6}\s+\S.*$", re.MULTILINE)
+
+
+class RegexTokenizer:
+    """
+    Approximate subword tokenizer: one token per word and one per CJK character.
+    Used when the embedder's own tokenizer is not available.
+    """
+
+    def offsets(self, text: str) -> List[Tuple[int, int]]:
+        return [m.span() for m in _TOKEN_RE.finditer(text)]
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in _TOKEN_RE.finditer(text))
+
+
+class HFTokenizer:
+    """
+    Adapter over a Hugging Face (fast) tokenizer that exposes char offsets per subword token.
+    """
+
+    def __init__(self, tokenizer: Any):
+        self._tokenizer = tokenizer
+
+    def offsets(self, text: str) -> List[Tuple[int, int]]:
+        encoded = self._tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            truncation=False,
+        )
+        return [(s, e) for s, e in encoded["offset_mapping"] if e > s]
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer(text, add_special_tokens=False, truncation=False)["input_ids"])
+
+
+def register_chunker(name: str) -> Callable[[ChunkerFn], ChunkerFn]:
+    """Register a chunking strategy under `name`."""
+
+    def wrapper(fn: ChunkerFn) -> ChunkerFn:
+        _CHUNKERS[name] = fn
+        return fn
+
+    return wrapper
+
+
+def available_chunkers() -> List[str]:
+    return sorted(_CHUNKERS)
+
+
+def get_chunker(name: str) -> ChunkerFn:
+    try:
+        return _CHUNKERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown chunk strategy: {name}") from None
+
+
+def chunk_text(
+    text: str,
+    strategy: str = "sliding_window",
+    chunk_size: int = 512,
+    overlap: int = 128,
+    tokenizer: Optional[Any] = None,
+    strip_markup: bool = False,
+) -> List[Tuple[int, int, str]]:
+    """
+    Chunk `text` with a registered strategy. Returns (char_start, char_end, text) tuples.
+    With `strip_markup` (Markdown/HTML sources only; plain text keeps its `*` and `_`), chunk
+    text has the Markdown markup stripped and chunks left empty are dropped; offsets still
+    point at the source span.
+    """
+    fn = get_chunker(strategy)
+    chunks = fn(text, chunk_size=chunk_size, overlap=overlap, tokenizer=tokenizer or RegexTokenizer())
+    if not strip_markup:
+        return chunks
+    stripped = [(s, e, strip_markdown(txt).strip()) for s, e, txt in chunks]
+    return [chunk for chunk in stripped if chunk[2]]
+
+
+def chunk_stream(
+    pages: Iterable[Tuple[Optional[int], str]],
+    strategy: str = "sliding_window",
+    chunk_size: int = 512,
+    overlap: int = 128,
+    tokenizer: Optional[Any] = None,
+    strip_markup: bool = False,
+) -> Iterator[Tuple[int, int, str, Optional[int], Optional[int]]]:
+    """
+    Chunk a lazy stream of (page_no, text) pages, joined with newlines, without holding the
+    whole document. Yields (char_start, char_end, text, first_page, last_page); offsets are
+    relative to the joined document. Only the text from the last, still-growing chunk onward
+    is buffered between pages.
+    """
+    buffer = ""
+    buffer_offset = 0
+    page_starts: List[Tuple[int, Optional[int]]] = []  # (global char offset, page_no)
+
+    def page_at(offset: int) -> Optional[int]:
+        page = None
+        for start, page_no in page_starts:
+            if start > offset:
+                break
+            page = page_no
+        return page
+
+    def emit(chunks):
+        for s, e, txt in chunks:
+            g_start, g_end = buffer_offset + s, buffer_offset + e
+            yield g_start, g_end, txt, page_at(g_start), page_at(max(g_end - 1, g_start))
+
+    for page_no, page_text in pages:
+        if page_starts:
+            buffer += "\n"
+        page_starts.append((buffer_offset + len(buffer), page_no))
+        buffer += page_text
+        chunks = chunk_text(buffer, strategy, chunk_size=chunk_size, overlap=overlap, tokenizer=tokenizer, strip_markup=strip_markup)
+        if len(chunks) < 2 or chunks[-1][0] <= 0:
+            continue
+        # everything before the last chunk is final; the last one may still grow with the next page
+        yield from emit(chunks[:-1])
+        cut = chunks[-1][0]
+        buffer = buffer[cut:]
+        buffer_offset += cut
+        while len(page_starts) > 1 and page_starts[1][0] <= buffer_offset:
+            page_starts.pop(0)
+    yield from emit(chunk_text(buffer, strategy, chunk_size=chunk_size, overlap=overlap, tokenizer=tokenizer, strip_markup=strip_markup))
 
 
 def sliding_window(text: str, chunk_size: int = 512, overlap: int = 128) -> List[Tuple[int, int, str]]:
     """
     Token-based sliding window using whitespace tokens. Returns char offsets for provenance.
     """
-    tokens = text.split()
+    spans = [m.span() for m in _WHITESPACE_TOKEN_RE.finditer(text)]
     chunks: List[Tuple[int, int, str]] = []
     start_idx = 0
-    while start_idx < len(tokens):
-        end_idx = min(start_idx + chunk_size, len(tokens))
-        chunk_tokens = tokens[start_idx:end_idx]
-        chunk_text = " ".join(chunk_tokens)
-        # approximate char offsets by re-finding substring
-        if chunk_text:
-            char_start = text.find(chunk_tokens[0], 0 if not chunks else chunks[-1][1])
-            char_end = char_start + len(chunk_text)
-        else:
-            char_start = 0
-            char_end = 0
-        chunks.append((char_start, char_end, chunk_text))
-        if end_idx == len(tokens):
+    while start_idx < len(spans):
+        end_idx = min(start_idx + chunk_size, len(spans))
+        chunk_spans = spans[start_idx:end_idx]
+        chunk_text = " ".join(text[s:e] for s, e in chunk_spans)
+        chunks.append((chunk_spans[0][0], chunk_spans[-1][1], chunk_text))
+        if end_idx == len(spans):
             break
-        start_idx = max(end_idx - overlap, 0)
+        start_idx = max(end_idx - overlap, start_idx + 1)
+    return chunks
+
+
+@register_chunker("sliding_window")
+def _sliding_window_strategy(text: str, chunk_size: int, overlap: int, tokenizer: Any = None) -> List[Tuple[int, int, str]]:
+    return sliding_window(text, chunk_size=chunk_size, overlap=overlap)
+
+
+def _window_spans(spans: List[Tuple[int, int]], budget: int, overlap: int) -> List[Tuple[int, int]]:
+    """Group token spans into windows of at most `budget` tokens; returns char ranges."""
+    budget = max(budget, 1)
+    overlap = min(max(overlap, 0), budget - 1)
+    ranges: List[Tuple[int, int]] = []
+    start_idx = 0
+    while start_idx < len(spans):
+        end_idx = min(start_idx + budget, len(spans))
+        ranges.append((spans[start_idx][0], spans[end_idx - 1][1]))
+        if end_idx == len(spans):
+            break
+        start_idx = end_idx - overlap
+    return ranges
+
+
+@register_chunker("token")
+def token_window(text: str, chunk_size: int = 512, overlap: int = 128, tokenizer: Any = None) -> List[Tuple[int, int, str]]:
+    """
+    Subword-budget sliding window: every chunk holds at most `chunk_size` tokens of the
+    embedder's tokenizer, with exact char offsets taken from the tokenizer.
+    """
+    tokenizer = tokenizer or RegexTokenizer()
+    spans = tokenizer.offsets(text)
+    return [(s, e, text[s:e]) for s, e in _window_spans(spans, chunk_size, overlap)]
+
+
+def _split_sentences(text: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+    end = len(text) if end is None else end
+    sentences: List[Tuple[int, int]] = []
+    for para_start, para_end in _split_paragraphs(text, start, end):
+        for m in _SENTENCE_RE.finditer(text, para_start, para_end):
+            s, e = m.span()
+            while s < e and text[s].isspace():
+                s += 1
+            while e > s and text[e - 1].isspace():
+                e -= 1
+            if e > s:
+                sentences.append((s, e))
+    return sentences
+
+
+def _split_paragraphs(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+    paragraphs: List[Tuple[int, int]] = []
+    cursor = start
+    for m in _PARAGRAPH_RE.finditer(text, start, end):
+        paragraphs.append((cursor, m.start()))
+        cursor = m.end()
+    paragraphs.append((cursor, end))
+    return [(s, e) for s, e in paragraphs if text[s:e].strip()]
+
+
+def _pack_units(
+    text: str,
+    units: List[Tuple[int, int]],
+    chunk_size: int,
+    overlap: int,
+    tokenizer: Any,
+) -> List[Tuple[int, int]]:
+    """
+    Greedily pack consecutive units (sentences) into ranges of at most `chunk_size` tokens.
+    Trailing units totalling up to `overlap` tokens are repeated at the start of the next range;
+    units larger than the budget are split with the token window.
+    """
+    ranges: List[Tuple[int, int]] = []
+    current: List[Tuple[int, int, int]] = []
+    used = 0
+
+    def flush():
+        if current:
+            ranges.append((current[0][0], current[-1][1]))
+
+    for s, e in units:
+        n = tokenizer.count(text[s:e])
+        if n > chunk_size:
+            flush()
+            current, used = [], 0
+            ranges.extend((s + a, s + b) for a, b, _ in token_window(text[s:e], chunk_size, overlap, tokenizer))
+            continue
+        if current and used + n > chunk_size:
+            flush()
+            carried: List[Tuple[int, int, int]] = []
+            carried_tokens = 0
+            for unit in reversed(current):
+                if carried_tokens + unit[2] > overlap or carried_tokens + unit[2] + n > chunk_size:
+                    break
+                carried.insert(0, unit)
+                carried_tokens += unit[2]
+            current, used = carried, carried_tokens
+        current.append((s, e, n))
+        used += n
+    flush()
+    return ranges
+
+
+@register_chunker("sentence")
+def sentence_window(text: str, chunk_size: int = 512, overlap: int = 128, tokenizer: Any = None) -> List[Tuple[int, int, str]]:
+    """
+    Paragraph/sentence-aligned chunks within a token budget; never cuts mid-sentence
+    unless a single sentence exceeds the budget.
+    """
+    tokenizer = tokenizer or RegexTokenizer()
+    units = _split_sentences(text)
+    return [(s, e, text[s:e]) for s, e in _pack_units(text, units, chunk_size, overlap, tokenizer)]
+
+
+@register_chunker("markdown")
+def heading_sections(text: str, chunk_size: int = 512, overlap: int = 128, tokenizer: Any = None) -> List[Tuple[int, int, str]]:
+    """
+    Heading-aware chunks: splits on Markdown headings (`#`..`######`) so chunks never span
+    two sections; sections larger than the budget are packed by sentence.
+    """
+    tokenizer = tokenizer or RegexTokenizer()
+    bounds = [m.start() for m in _HEADING_RE.finditer(text)]
+    if not bounds or bounds[0] != 0:
+        bounds.insert(0, 0)
+    bounds.append(len(text))
+    chunks: List[Tuple[int, int, str]] = []
+    for sec_start, sec_end in zip(bounds, bounds[1:]):
+        units = _split_sentences(text, sec_start, sec_end)
+        chunks.extend((s, e, text[s:e]) for s, e in _pack_units(text, units, chunk_size, overlap, tokenizer))
     return chunks
@@ -1,16 +1,20 @@
 from functools import lru_cache
 import logging
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 
 import requests
 
 from app.config import get_settings
-from app.settings_service import get_app_settings_db, get_model_config_by_name
+from app.settings_service import SETTINGS_LOOKUP_SECONDS, get_app_settings_db, get_model_config_by_name
+from core import metrics
 from infra import models
 from infra.db import SessionLocal
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
+EMBED_FALLBACKS = metrics.counter(
+    "raglite_embed_fallbacks", "Embedding calls served by a fallback: the default model or zero vectors", ("kind",)
+)
 
 
 @lru_cache(maxsize=8)
@@ -20,6 +24,14 @@ def _load_model(name: str):
     return SentenceTransformer(name)
 
 
+@lru_cache(maxsize=8)
+def _load_hf_tokenizer(name: str):
+    from transformers import AutoTokenizer  # type: ignore
+
+    return AutoTokenizer.from_pretrained(name)
+
+
+@SETTINGS_LOOKUP_SECONDS.time(kind="embedder")
 def _resolve_embedder_config(model_name: Optional[str]) -> Optional[models.ModelConfig]:
     db = SessionLocal()
     try:
@@ -55,6 +67,37 @@ def _embed_with_config(texts: List[str], cfg: Optional[models.ModelConfig], targ
     return model.encode(texts, normalize_embeddings=True).tolist()
 
 
+def get_tokenizer(model_name: Optional[str] = None) -> Tuple[Optional[Any], Optional[int]]:
+    """
+    Return (tokenizer, max_tokens) for the embedder so chunks can be sized in its subword tokens.
+    Max tokens excludes special tokens; (None, None) when the tokenizer cannot be loaded.
+    """
+    cfg = _resolve_embedder_config(model_name)
+    target_model = cfg.model if cfg else (model_name or settings.default_embedder)
+    try:
+        if cfg and cfg.endpoint:
+            hf_tokenizer = _load_hf_tokenizer(target_model)
+            max_len = getattr(hf_tokenizer, "model_max_length", None)
+        else:
+            model = _load_model(target_model)
+            hf_tokenizer = model.tokenizer
+            max_len = getattr(model, "max_seq_length", None)
+    except Exception as exc:
+        logger.info("Tokenizer unavailable for model '%s': %s", target_model, exc)
+        return None, None
+    if not getattr(hf_tokenizer, "is_fast", False):
+        # offsets are only available on fast tokenizers
+        return None, None
+    from core.chunker import HFTokenizer
+
+    # some tokenizers report a huge sentinel when the limit is unknown
+    if max_len and max_len < 100_000:
+        max_len -= hf_tokenizer.num_special_tokens_to_add()
+    else:
+        max_len = None
+    return HFTokenizer(hf_tokenizer), max_len
+
+
 def embed_texts(texts: List[str], model_name: Optional[str] = None) -> List[List[float]]:
     """
     Embed texts using either an OpenAI-compatible endpoint (if configured) or a local sentence-transformers model.
@@ -72,9 +115,12 @@ def embed_texts(texts: List[str], model_name: Optional[str] = None) -> List[List
             fallback_model = fallback_cfg.model if fallback_cfg else settings.default_embedder
             if fallback_model != target_model:
                 logger.warning("Falling back to default embedder '%s'", fallback_model)
-                return _embed_with_config(texts, fallback_cfg, fallback_model)
+                vectors = _embed_with_config(texts, fallback_cfg, fallback_model)
+                EMBED_FALLBACKS.inc(kind="default_model")
+                return vectors
         except Exception as exc:
             logger.warning("Default embedder fallback failed: %s", exc)
 
+    EMBED_FALLBACKS.inc(kind="zero_vector")
     dim = 384
     return [[0.0] * dim for _ in texts]
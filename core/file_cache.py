@@ -0,0 +1,211 @@
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+from app.config import get_settings
+from core.metrics import CACHE_REQUESTS
+
+settings = get_settings()
+
+
+class LocalFileCache:
+    """
+    Bounded on-disk LRU cache of source files keyed by content hash (sha256).
+
+    Entries are populated through a temp file and os.replace, so readers never see a partial
+    file, and a per-key lock file keeps concurrent tasks on the same worker host from
+    downloading the same object twice. Callers get a hard link to the entry (`checkout`),
+    so eviction by another task cannot remove a file that is still being parsed; checked-out
+    entries are not evicted and their links count against `max_bytes`. Links live under
+    `tmp/<pid>/`, and directories of processes that are gone are swept on start-up.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._objects = self.root / "objects"
+        self._tmp = self.root / "tmp"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        self._evict_lock = threading.Lock()
+        self._sweep_tmp()
+
+    @property
+    def _work(self) -> Path:
+        """This process's directory for downloads in flight and checked-out links."""
+        work = self._tmp / str(os.getpid())
+        work.mkdir(parents=True, exist_ok=True)
+        return work
+
+    def _sweep_tmp(self) -> None:
+        """Remove links and partial downloads left behind by processes that are no longer running."""
+        for path in self._tmp.iterdir():
+            if path.is_dir() and path.name.isdigit() and _pid_alive(int(path.name)):
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+    def _entry(self, key: str) -> Path:
+        return self._objects / key[:2] / key
+
+    @contextmanager
+    def _key_lock(self, entry: Path) -> Iterator[None]:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{entry}.lock", "a+b") as fh:
+            try:
+                import fcntl
+
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            except ImportError:  # pragma: no cover - non-POSIX: rely on atomic replace only
+                pass
+            yield
+
+    def get(self, key: str) -> Optional[Path]:
+        entry = self._entry(key)
+        try:
+            os.utime(entry)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def put(self, key: str, fill: Callable[[str], None], verify: bool = True) -> Path:
+        """
+        Populate `key` by calling `fill(tmp_path)` unless another task already did.
+        With `verify`, the file's sha256 must equal `key`.
+        """
+        entry = self._entry(key)
+        with self._key_lock(entry):
+            if entry.exists():
+                os.utime(entry)
+                return entry
+            fd, tmp = tempfile.mkstemp(dir=self._work)
+            os.close(fd)
+            try:
+                fill(tmp)
+                if verify and _sha256_file(tmp) != key:
+                    raise ValueError(f"Cached download does not match content hash {key}")
+                os.replace(tmp, entry)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        self.evict(keep=entry)
+        return entry
+
+    def checkout(self, key: str, fill: Callable[[str], None], suffix: str = "") -> Tuple[str, Callable[[], None]]:
+        """
+        Private path (hard link) to the cached file plus its cleanup, populating the entry on a miss.
+        """
+        entry = self.get(key)
+        CACHE_REQUESTS.inc(cache="ingest_file", result="hit" if entry else "miss")
+        entry = entry or self.put(key, fill)
+        link = self._work / f"{uuid.uuid4().hex}{suffix}"
+        try:
+            os.link(entry, link)
+        except FileNotFoundError:
+            # evicted between lookup and link; repopulate once
+            os.link(self.put(key, fill), link)
+
+        def cleanup() -> None:
+            link.unlink(missing_ok=True)
+
+        return str(link), cleanup
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """
+        Remove least recently used entries (never `keep`) until the cache fits in `max_bytes`.
+        Disk use is counted per inode, so checked-out links whose entry is already gone still
+        count; entries that are checked out are skipped, since removing them frees nothing.
+        """
+        with self._evict_lock:
+            entries = []
+            inodes = {}
+            for path in self._objects.glob("*/*"):
+                if path.suffix == ".lock":
+                    continue
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, st.st_nlink, path))
+                inodes[st.st_ino] = st.st_size
+            for path in self._tmp.glob("*/*"):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    inodes[st.st_ino] = st.st_size
+            total = sum(inodes.values())
+            if total <= self.max_bytes:
+                return
+            for _, size, nlink, path in sorted(entries):
+                if path == keep or nlink > 1:
+                    continue
+                if self._remove(path):
+                    total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def _remove(self, entry: Path) -> bool:
+        """Delete an entry and its lock file unless another task holds the key lock right now."""
+        lock = Path(f"{entry}.lock")
+        with open(lock, "a+b") as fh:
+            try:
+                import fcntl
+
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except ImportError:  # pragma: no cover - non-POSIX
+                pass
+            except BlockingIOError:
+                return False
+            entry.unlink(missing_ok=True)
+            # a task already waiting on the old lock file may race a newcomer on a fresh one;
+            # both then download, and os.replace keeps the entry whole
+            lock.unlink(missing_ok=True)
+        return True
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # alive, owned by another user
+        pass
+    return True
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_cache: Optional[LocalFileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_file_cache() -> Optional[LocalFileCache]:
+    """Process-wide ingest cache; None when `ingest_cache_max_mb` is 0."""
+    global _cache
+    if settings.ingest_cache_max_mb <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LocalFileCache(settings.ingest_cache_dir, settings.ingest_cache_max_mb * 1024 * 1024)
+        return _cache
+
+
+def is_cache_key(content_hash: Optional[str]) -> bool:
+    return bool(content_hash) and len(content_hash) == 64 and all(c in "0123456789abcdef" for c in content_hash)
@@ -0,0 +1,162 @@
+import threading
+from bisect import bisect_right
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+SEED = 0
+WINDOWS = 3
+WINDOW_CHARS = 400
+
+# (first codepoint, last codepoint, script); sorted by first codepoint
+_SCRIPT_RANGES: List[Tuple[int, int, str]] = [
+    (0x0041, 0x024F, "latin"),
+    (0x0370, 0x03FF, "greek"),
+    (0x0400, 0x052F, "cyrillic"),
+    (0x0530, 0x058F, "armenian"),
+    (0x0590, 0x05FF, "hebrew"),
+    (0x0600, 0x06FF, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x0E00, 0x0E7F, "thai"),
+    (0x10A0, 0x10FF, "georgian"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x1E00, 0x1EFF, "latin"),
+    (0x3040, 0x30FF, "kana"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xAC00, 0xD7AF, "hangul"),
+    (0xF900, 0xFAFF, "han"),
+]
+_RANGE_STARTS = [r[0] for r in _SCRIPT_RANGES]
+
+# scripts that identify a single language on their own; no statistical model needed
+_SCRIPT_LANG = {
+    "greek": "el",
+    "armenian": "hy",
+    "hebrew": "he",
+    "thai": "th",
+    "georgian": "ka",
+    "hangul": "ko",
+    "kana": "ja",
+}
+
+_LANG_SCRIPTS = {
+    **{lang: {script} for script, lang in _SCRIPT_LANG.items()},
+    "ja": {"kana", "han"},
+    "zh-cn": {"han"},
+    "zh-tw": {"han"},
+    **{lang: {"cyrillic"} for lang in ("ru", "uk", "bg", "mk", "sr", "be", "kk")},
+    **{lang: {"arabic"} for lang in ("ar", "fa", "ur")},
+    **{lang: {"devanagari"} for lang in ("hi", "mr", "ne")},
+}
+
+_warm_lock = threading.Lock()
+_warmed = False
+
+
+def warm_up(seed: int = SEED) -> None:
+    """
+    Load the langdetect profiles and fix its seed. langdetect otherwise loads ~50 profiles
+    lazily on the first detection of every process and samples n-grams non-deterministically.
+    Called once per worker process at startup; safe to call again.
+    """
+    global _warmed
+    with _warm_lock:
+        if _warmed:
+            return
+        from langdetect import DetectorFactory  # type: ignore
+        from langdetect.detector_factory import init_factory  # type: ignore
+
+        DetectorFactory.seed = seed
+        init_factory()
+        _warmed = True
+
+
+def _script(ch: str) -> Optional[str]:
+    cp = ord(ch)
+    idx = bisect_right(_RANGE_STARTS, cp) - 1
+    if idx >= 0 and cp <= _SCRIPT_RANGES[idx][1]:
+        return _SCRIPT_RANGES[idx][2]
+    return None
+
+
+def dominant_script(text: str, limit: int = 2000) -> Optional[str]:
+    """Most frequent writing system among the letters of the first `limit` chars."""
+    counts = Counter(_script(ch) for ch in text[:limit] if ch.isalpha())
+    counts.pop(None, None)
+    if not counts:
+        return None
+    script, n = counts.most_common(1)[0]
+    # Japanese mixes kana with kanji; a noticeable share of kana decides it
+    if script == "han" and counts.get("kana", 0) * 5 >= n:
+        return "kana"
+    return script
+
+
+def sample_windows(text: str, windows: int = WINDOWS, window_chars: int = WINDOW_CHARS) -> List[str]:
+    """
+    `windows` evenly spread slices of about `window_chars` (start, middle, end, ...), snapped to
+    whitespace so words are not cut. Short texts are returned whole.
+    """
+    if len(text) <= windows * window_chars:
+        return [text]
+    step = (len(text) - window_chars) / max(windows - 1, 1)
+    out = []
+    for i in range(windows):
+        start = int(i * step)
+        if start:
+            space = text.find(" ", start, start + 40)
+            start = space + 1 if space != -1 else start
+        end = start + window_chars
+        space = text.rfind(" ", end - 40, end)
+        out.append(text[start : space if space > start else end])
+    return out
+
+
+def _detect_statistical(text: str) -> Optional[str]:
+    warm_up()
+    from langdetect import detect  # type: ignore
+
+    try:
+        return detect(text)
+    except Exception:
+        return None
+
+
+def detect(text: str, windows: int = WINDOWS, window_chars: int = WINDOW_CHARS) -> Optional[str]:
+    """
+    Deterministic language guess from a bounded sample: a few spread-out windows rather than
+    the first 1000 chars, so a cover page or boilerplate header does not decide the language.
+    Scripts used by a single language are answered without running the statistical model.
+    """
+    if not text or not text.strip():
+        return None
+    sample = "\n".join(sample_windows(text, windows, window_chars))
+    script = dominant_script(sample, limit=len(sample))
+    if script in _SCRIPT_LANG:
+        return _SCRIPT_LANG[script]
+    return _detect_statistical(sample)
+
+
+def chunk_language(text: str, default: Optional[str]) -> Optional[str]:
+    """
+    Language tag for one chunk. Chunks written in the document's script inherit the document
+    language; only chunks in a different script (e.g. a Korean passage in an English manual)
+    are identified on their own.
+    """
+    script = dominant_script(text)
+    if script is None:
+        return default
+    if script in _SCRIPT_LANG:
+        return _SCRIPT_LANG[script]
+    if default and script in _LANG_SCRIPTS.get(default, {"latin"}):
+        return default
+    return detect(text)
+
+
+def majority(tags: Iterable[Tuple[Optional[str], int]]) -> Optional[str]:
+    """Most common language over (tag, weight) pairs, e.g. chunk tags weighted by length."""
+    totals: Counter = Counter()
+    for tag, weight in tags:
+        if tag:
+            totals[tag] += weight
+    return totals.most_common(1)[0][0] if totals else None
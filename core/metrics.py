@@ -0,0 +1,247 @@
+"""
+Process-local counters, gauges and histograms rendered in the Prometheus text format (0.0.4)
+at `/metrics`. Recording is a dict lookup and a few additions under a lock, cheap enough for
+per-request stages. Each process keeps its own values; scrape every worker (or label them by
+instance) when running several.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# seconds; covers an in-memory BM25 lookup up to a slow LLM answer
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+class _Metric:
+    kind = "untyped"
+    suffix = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._labelset = frozenset(self.labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if labels.keys() != self._labelset:
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple([str(labels[name]) for name in self.labelnames])
+
+    def _pairs(self, key: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, key))
+
+    def samples(self) -> Iterator[Sample]:  # pragma: no cover - overridden
+        return iter(())
+
+
+class Counter(_Metric):
+    kind = "counter"
+    suffix = "_total"  # exposed as <name>_total
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", self._pairs(key), value
+
+
+class Gauge(_Metric):
+    """Set explicitly, or read from `fn` at scrape time for values another component already tracks."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._fn = fn
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> Iterator[Sample]:
+        if self._fn is not None:
+            try:
+                yield "", (), float(self._fn())
+            except Exception:
+                return  # a failing callback drops the sample rather than the scrape
+            return
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", self._pairs(key), value
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, object]):
+        self._histogram = histogram
+        self._labels = labels
+        self._started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._histogram.observe(time.perf_counter() - self._started, **self._labels)
+
+    def __call__(self, fn: Callable) -> Callable:
+        histogram, labels = self._histogram, self._labels
+
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            with _Timer(histogram, labels):
+                return fn(*args, **kwargs)
+
+        return timed
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}  # per-bucket counts, then sum and count
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 3)
+            row[idx] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def time(self, **labels) -> _Timer:
+        """Context manager or decorator observing the elapsed seconds."""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        row = self._values.get(self._key(labels))
+        return int(row[-1]) if row else 0
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [(key, list(row)) for key, row in self._values.items()]
+        for key, row in items:
+            pairs = self._pairs(key)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                yield "_bucket", pairs + (("le", _number(bound)),), cumulative
+            yield "_bucket", pairs + (("le", "+Inf"),), row[-1]
+            yield "_sum", pairs, row[-2]
+            yield "_count", pairs, row[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add `metric`; a module imported twice gets the already registered instance back."""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            name = metric.name + metric.suffix
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for suffix, pairs, value in metric.samples():
+                labels = ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs)
+                lines.append(f"{name}{suffix}{{{labels}}} {_number(value)}" if labels else f"{name}{suffix} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], float]] = None) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames, fn))  # type: ignore[return-value]
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def start_http_server(port: int, host: str = "0.0.0.0"):
+    """
+    Serve `render()` on its own port from a daemon thread, for processes without the API's
+    /metrics route (Celery workers). Returns the server; raises OSError if the port is taken.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # scrapes are not worth a log line each
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="raglite-metrics", daemon=True).start()
+    return server
+
+
+CACHE_REQUESTS = counter("raglite_cache_requests", "Cache lookups by cache (rewrite, list_count, ingest_file) and result (hit, miss)", ("cache", "result"))
@@ -0,0 +1,286 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from app.config import get_settings
+from core import langid, parser
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ParseResult:
+    text: str
+    language: Optional[str] = None
+    warnings: List[str] = field(default_factory=list)
+
+
+def _init_worker(limit_mb: int) -> None:
+    """
+    Worker start-up: load the language profiles up front and cap the worker's address space
+    so a runaway parse fails with MemoryError.
+    """
+    try:
+        langid.warm_up()
+    except Exception:
+        logger.warning("Language detection warm-up failed", exc_info=True)
+    if limit_mb <= 0:
+        return
+    try:
+        import resource
+
+        limit = limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        logger.warning("Parse worker memory limit is not supported on this platform")
+
+
+def _worker_main(conn, limit_mb: int) -> None:
+    _init_worker(limit_mb)
+    conn.send(("ready", None))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args = task
+        try:
+            outcome = ("ok", fn(*args))
+        except BaseException as exc:
+            outcome = ("err", exc)
+        try:
+            conn.send(outcome)
+        except Exception as exc:  # unpicklable result or exception
+            conn.send(("err", RuntimeError(f"{type(exc).__name__}: {exc}")))
+
+
+class _Worker:
+    def __init__(self, ctx, limit_mb: int, startup_timeout: float):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, limit_mb), daemon=True)
+        self.process.start()
+        child.close()
+        self.tasks = 0
+        if not self.conn.poll(startup_timeout):
+            self.kill()
+            raise RuntimeError(f"Parse worker did not start within {startup_timeout:g}s")
+        self.conn.recv()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ParsePool:
+    """
+    Reusable parse worker processes with per-call deadlines. Each call holds one worker for
+    its duration; a parse stuck inside pypdf/lxml cannot be interrupted, so a worker that
+    misses its deadline is killed and replaced on next use, without touching the calls other
+    threads are running on the remaining workers.
+    """
+
+    def __init__(self, workers: int, memory_limit_mb: int, max_tasks_per_child: int = 100, startup_timeout: float = 60.0):
+        self._workers = workers
+        self._memory_limit_mb = memory_limit_mb
+        self._max_tasks_per_child = max_tasks_per_child
+        self._startup_timeout = startup_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._dispatch = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="parse-dispatch")
+
+    def _acquire(self, deadline: float) -> Tuple[_Worker, float]:
+        """An idle worker, or a new one while below the pool size; returns it with the seconds spent starting it."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Parse pool is closed")
+                if self._idle:
+                    return self._idle.pop(), 0.0
+                if self._live < self._workers:
+                    self._live += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("no parse worker became free")
+                self._cond.wait(remaining)
+        started = time.monotonic()
+        try:
+            worker = _Worker(self._ctx, self._memory_limit_mb, self._startup_timeout)
+        except BaseException:
+            self._release(None)
+            raise
+        # worker start-up (spawn + language profile warm-up) is not charged to the caller's deadline
+        return worker, time.monotonic() - started
+
+    def _release(self, worker: Optional[_Worker], healthy: bool = False) -> None:
+        with self._cond:
+            if worker is not None and healthy and not self._closed and worker.tasks < self._max_tasks_per_child:
+                self._idle.append(worker)
+                worker = None
+            else:
+                self._live -= 1
+            self._cond.notify()
+        if worker is not None:
+            if healthy:
+                worker.stop()
+            else:
+                worker.kill()
+
+    def _call(self, fn: Callable[..., Any], args: tuple, deadline: float, timeout: float) -> Any:
+        worker, startup = self._acquire(deadline)
+        deadline += startup
+        if time.monotonic() >= deadline:
+            self._release(worker, healthy=True)  # expired while queued; the worker itself is fine
+            raise TimeoutError(f"exceeded {timeout:g}s")
+        try:
+            worker.tasks += 1
+            worker.conn.send((fn, args))
+            ready = worker.conn.poll(max(deadline - time.monotonic(), 0))
+            if ready:
+                status, value = worker.conn.recv()
+        except (EOFError, OSError) as exc:
+            self._release(worker)
+            raise RuntimeError(f"Parse worker died: {exc or type(exc).__name__}") from None
+        if not ready:
+            self._release(worker)  # kills only this worker
+            raise TimeoutError(f"exceeded {timeout:g}s")
+        self._release(worker, healthy=True)
+        if status == "err":
+            raise value
+        return value
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+            worker.process.join(timeout=5)
+        self._dispatch.shutdown(wait=False)
+
+    def run(self, calls: List[Tuple[Callable[..., Any], tuple]], timeout: float) -> List[Any]:
+        """
+        Run calls concurrently and wait at most `timeout` seconds for all of them.
+        Returns one entry per call: the result, or the exception it raised
+        (TimeoutError when the deadline passed first).
+        """
+        return list(self.imap(calls, timeout))
+
+    def imap(self, calls: List[Tuple[Callable[..., Any], tuple]], timeout: float) -> Iterator[Any]:
+        """Like `run`, but yields each outcome in call order as soon as it is ready."""
+        deadline = time.monotonic() + timeout
+        futures = [self._dispatch.submit(self._call, fn, args, deadline, timeout) for fn, args in calls]
+        for future in futures:
+            try:
+                yield future.result()
+            except Exception as exc:
+                yield exc
+
+
+_pool: Optional[ParsePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> Optional[ParsePool]:
+    """Process-wide parse pool; None when `parse_workers` is 0 (parse in-process)."""
+    global _pool
+    if settings.parse_workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParsePool(settings.parse_workers, settings.parse_memory_limit_mb)
+        return _pool
+
+
+def _iter_pdf(pool: ParsePool, path: str, timeout: float, warnings: List[str]) -> Iterator[Tuple[Optional[int], str]]:
+    started = time.monotonic()
+    (count,) = pool.run([(parser.pdf_page_count, (path,))], timeout)
+    if isinstance(count, TimeoutError):
+        raise TimeoutError(f"Parsing PDF exceeded {timeout}s before any page was read")
+    if isinstance(count, Exception):
+        # not a readable PDF; decode it as text here, never retrying pypdf outside the pool
+        warnings.append(f"PDF could not be opened: {count}")
+        text, _ = parser.parse_text(path, "text/plain", fmt=parser.TEXT)
+        yield None, text
+        return
+    step = max(settings.parse_pdf_pages_per_task, 1)
+    ranges = [(start, min(start + step, count)) for start in range(0, count, step)]
+    remaining = timeout - (time.monotonic() - started)
+    calls = [(parser.pdf_pages_text, (path, s, e)) for s, e in ranges]
+    emitted = False
+    for (s, e), out in zip(ranges, pool.imap(calls, remaining)):
+        if isinstance(out, Exception):
+            warning = f"Pages {s + 1}-{e} skipped: {out}"
+            logger.warning("Partial parse of %s: %s", path, warning)
+            warnings.append(warning)
+            continue
+        emitted = True
+        yield from out
+    if ranges and not emitted:
+        raise TimeoutError(f"Parsing PDF failed for every page range: {warnings[0]}")
+
+
+def parse_pages(
+    path: str,
+    mime_type: Optional[str] = None,
+    keep_headings: bool = False,
+    timeout: Optional[float] = None,
+    warnings: Optional[List[str]] = None,
+    fmt: Optional[str] = None,
+) -> Iterator[Tuple[Optional[int], str]]:
+    """
+    Lazily yield (page_no, text) within `parse_timeout_seconds`; page_no is None for formats
+    without pages. Large PDFs are split across pool workers by page range and yielded in order
+    as ranges finish, so chunking can start on page 1. Page ranges that miss the deadline are
+    skipped and appended to `warnings`; other formats raise TimeoutError on timeout. `fmt` is
+    the format from parser.detect_format when the caller already sniffed it.
+    """
+    timeout = settings.parse_timeout_seconds if timeout is None else timeout
+    warnings = [] if warnings is None else warnings
+    fmt = fmt or parser.detect_format(path, mime_type)  # sniffed once; workers are told the format
+    pool = get_parse_pool()
+    if pool is None:
+        yield from parser.iter_pages(path, mime_type, keep_headings, fmt)
+        return
+    if fmt == parser.PDF:
+        yield from _iter_pdf(pool, path, timeout, warnings)
+        return
+    (out,) = pool.run([(parser.parse_text, (path, mime_type, keep_headings, fmt))], timeout)
+    if isinstance(out, TimeoutError):
+        raise TimeoutError(f"Parsing exceeded {timeout}s")
+    if isinstance(out, Exception):
+        raise out
+    yield None, out[0]
+
+
+def parse_document(
+    path: str,
+    mime_type: Optional[str] = None,
+    keep_headings: bool = False,
+    timeout: Optional[float] = None,
+) -> ParseResult:
+    """Non-streaming parse_pages: the whole text, its language and any partial-parse warnings."""
+    warnings: List[str] = []
+    pages = parse_pages(path, mime_type, keep_headings, timeout, warnings)
+    text = "\n".join(page_text for _, page_text in pages)
+    return ParseResult(text, parser.detect_language(text), warnings)
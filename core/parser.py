@@ -1,77 +1,274 @@
+import mmap
+import re
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
 
-import bs4  # type: ignore
-import markdown  # type: ignore
-from langdetect import detect  # type: ignore
+from core import langid
 
+PDF = "pdf"
+DOCX = "docx"
+HTML = "html"
+MARKDOWN = "markdown"
+TEXT = "text"
 
-def _try_pdf_text(path: Path) -> Optional[str]:
+_DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_MMAP_THRESHOLD = 4 * 1024 * 1024
+_SNIFF_BYTES = 1024
+
+_HEADING_TAGS = re.compile(r"^h[1-6]$")
+_HTML_SNIFF = re.compile(rb"^\s*(?:<!doctype\s+html|<html|<head|<body)", re.IGNORECASE)
+_NON_TEXT_TAGS = ("script", "style", "noscript", "template")
+
+# Markdown syntax stripped by the direct Markdown-to-text path
+_MD_FENCE = re.compile(r"^\s*(```|~~~).*$", re.MULTILINE)
+_MD_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$", re.MULTILINE)
+_MD_SETEXT = re.compile(r"^\s{0,3}(=+|-+)\s*$", re.MULTILINE)
+_MD_RULE = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$", re.MULTILINE)
+_MD_QUOTE = re.compile(r"^\s{0,3}>\s?", re.MULTILINE)
+_MD_LIST = re.compile(r"^(\s*)(?:[-*+]|\d+[.)])\s+", re.MULTILINE)
+_MD_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_MD_LINK = re.compile(r"\[([^\]]+)\](?:\([^)]*\)|\[[^\]]*\])")
+_MD_LINK_DEF = re.compile(r"^\s{0,3}\[[^\]]+\]:\s+\S+.*$", re.MULTILINE)
+_MD_EMPHASIS = re.compile(r"(\*{1,3}|~~)(\S(?:.*?\S)?)\1")
+_MD_UNDERSCORE = re.compile(r"(?<!\w)(_{1,3})(\S(?:.*?\S)?)\1(?!\w)")
+_MD_CODE = re.compile(r"`+([^`]*)`+")
+_MD_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+
+Source = Union[str, BinaryIO]
+
+
+def sniff_format(head: bytes, mime_type: Optional[str] = None, suffix: str = "") -> str:
+    """
+    Decide the parser from the leading bytes, falling back to the declared MIME type / suffix.
+    Binary containers are trusted by magic bytes only, so a mislabelled file is still decoded as text.
+    """
+    mime = (mime_type or "").split(";", 1)[0].strip().lower()
+    suffix = suffix.lower()
+    if head.startswith(b"%PDF-"):
+        return PDF
+    if head.startswith(b"PK\x03\x04"):
+        return DOCX if mime == _DOCX_MIME or suffix == ".docx" or b"word/" in head else TEXT
+    if mime == "text/markdown" or suffix in {".md", ".markdown"}:
+        return MARKDOWN
+    if mime == "text/html" or suffix in {".html", ".htm"} or _HTML_SNIFF.match(head):
+        return HTML
+    return TEXT
+
+
+def detect_format(path: str, mime_type: Optional[str] = None) -> str:
+    with open(path, "rb") as f:
+        head = f.read(_SNIFF_BYTES)
+    return sniff_format(head, mime_type, Path(path).suffix)
+
+
+@contextmanager
+def _read_buffer(f: BinaryIO) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Whole-file buffer: memory-mapped for large files so the bytes are not copied onto the heap."""
+    f.seek(0, 2)
+    size = f.tell()
+    f.seek(0)
+    if size < _MMAP_THRESHOLD:
+        yield f.read()
+        return
+    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
     try:
-        from pypdf import PdfReader  # type: ignore
-
-        reader = PdfReader(str(path))
-        texts = []
-        for page in reader.pages:
-            try:
-                texts.append(page.extract_text() or "")
-            except Exception:
-                continue
-        return "\n".join(texts)
+        yield mapped
+    finally:
+        mapped.close()
+
+
+def _decode(buf: Union[bytes, mmap.mmap]) -> str:
+    with memoryview(buf) as view:
+        return str(view, "utf-8", errors="ignore")
+
+
+def _try_pdf_text(source: Source) -> Optional[str]:
+    try:
+        return "\n".join(text for _, text in iter_pdf_pages(source))
     except Exception:
         return None
 
 
-def _parse_html(raw: bytes) -> str:
+def iter_pdf_pages(source: Source, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Lazily yield (page_no, text) for pages [start, end); page_no is 1-based.
+    `source` is a path or an open binary file. Pages that fail to extract are skipped.
+    """
+    from pypdf import PdfReader  # type: ignore
+
+    reader = PdfReader(source)
+    total = len(reader.pages)
+    for idx in range(start, total if end is None else min(end, total)):
+        try:
+            text = reader.pages[idx].extract_text() or ""
+        except Exception:
+            continue
+        yield idx + 1, text
+
+
+def pdf_page_count(path: str) -> int:
+    from pypdf import PdfReader  # type: ignore
+
+    return len(PdfReader(path).pages)
+
+
+def pdf_pages_text(path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """(page_no, text) for pages [start, end); used to split large PDFs across parse workers."""
+    return list(iter_pdf_pages(path, start, end))
+
+
+def detect_language(text: str) -> Optional[str]:
+    return langid.detect(text)
+
+
+def _html_selectolax(raw: bytes, keep_headings: bool) -> str:
+    from selectolax.parser import HTMLParser  # type: ignore
+
+    tree = HTMLParser(raw)
+    tree.strip_tags(list(_NON_TEXT_TAGS))
+    if keep_headings:
+        for level in range(1, 7):
+            for node in tree.css(f"h{level}"):
+                node.replace_with(f"\n{'#' * level} {node.text(separator=' ', strip=True)}\n")
+    root = tree.body or tree.root
+    return root.text(separator="\n") if root is not None else ""
+
+
+def _html_lxml(raw: bytes, keep_headings: bool) -> str:
+    import lxml.html  # type: ignore
+
+    doc = lxml.html.document_fromstring(raw)
+    for el in list(doc.iter(*_NON_TEXT_TAGS)):
+        el.drop_tree()
+    if keep_headings:
+        for el in list(doc.iter("h1", "h2", "h3", "h4", "h5", "h6")):
+            heading = " ".join(el.text_content().split())
+            tail = el.tail
+            el.clear()
+            el.text = f"\n{'#' * int(el.tag[1])} {heading}\n"
+            el.tail = tail
+    return "\n".join(doc.itertext())
+
+
+def _html_bs4(raw: bytes, keep_headings: bool) -> str:
+    import bs4  # type: ignore
+
     soup = bs4.BeautifulSoup(raw, "html.parser")
+    for tag in soup.find_all(_NON_TEXT_TAGS):
+        tag.decompose()
+    if keep_headings:
+        # render <h1>..<h6> as Markdown headings so heading-aware chunking can see sections
+        for tag in soup.find_all(_HEADING_TAGS):
+            level = int(tag.name[1])
+            tag.replace_with(f"{'#' * level} {tag.get_text(' ', strip=True)}")
     return soup.get_text(separator="\n")
 
 
-def _parse_docx(path: Path) -> Optional[str]:
+def _parse_html(raw: bytes, keep_headings: bool = False) -> str:
+    """HTML to text with the fastest available backend: selectolax, then lxml, then BeautifulSoup."""
+    for extractor in (_html_selectolax, _html_lxml):
+        try:
+            return extractor(raw, keep_headings)
+        except ImportError:
+            continue
+        except Exception:
+            break
+    return _html_bs4(raw, keep_headings)
+
+
+def _parse_docx(source: Source) -> Optional[str]:
     try:
         import docx  # type: ignore
 
-        doc = docx.Document(str(path))
+        doc = docx.Document(source)
         return "\n".join(p.text for p in doc.paragraphs)
     except Exception:
         return None
 
 
-def _parse_markdown(raw: bytes) -> str:
-    try:
-        html = markdown.markdown(raw.decode("utf-8", errors="ignore"))
-        return _parse_html(html.encode("utf-8"))
-    except Exception:
-        return raw.decode("utf-8", errors="ignore")
+def _markdown_to_text(md: str, keep_headings: bool = False) -> str:
+    """
+    Direct Markdown-to-text: strips markup with regexes instead of rendering HTML and parsing it back.
+    With keep_headings the `#` heading lines are left intact for heading-aware chunking.
+    """
+    text = _MD_FENCE.sub("", md)
+    if not keep_headings:
+        text = _MD_HEADING.sub(r"\1", text)
+    text = _MD_SETEXT.sub("", text)
+    text = _MD_RULE.sub("", text)
+    text = _MD_LINK_DEF.sub("", text)
+    text = _MD_QUOTE.sub("", text)
+    text = _MD_LIST.sub(r"\1", text)
+    text = _MD_IMAGE.sub(r"\1", text)
+    text = _MD_LINK.sub(r"\1", text)
+    text = _MD_CODE.sub(r"\1", text)
+    text = _MD_EMPHASIS.sub(r"\2", text)
+    text = _MD_UNDERSCORE.sub(r"\2", text)
+    return _MD_TAG.sub("", text)
+
+
+def strip_markdown(text: str) -> str:
+    """Plain text of a Markdown fragment (headings, emphasis, links and list markers removed)."""
+    return _markdown_to_text(text)
+
 
+def _parse_markdown(raw: bytes, keep_headings: bool = False) -> str:
+    return _markdown_to_text(_decode(raw), keep_headings)
 
-def parse_text(path: str, mime_type: Optional[str] = None) -> Tuple[str, Optional[str]]:
+
+def parse_text(
+    path: str, mime_type: Optional[str] = None, keep_headings: bool = False, fmt: Optional[str] = None
+) -> Tuple[str, Optional[str]]:
     """
     Rich parser: txt/md/html/pdf/docx supported; falls back to utf-8 decode.
+    The format is sniffed from magic bytes (unless the caller already did, see `fmt`) and the
+    file is read once (memory-mapped when large).
+    With keep_headings, Markdown/HTML headings are kept as `#` lines for structure-aware chunking.
     Returns (text, language_guess).
     """
     p = Path(path)
-    raw = p.read_bytes()
-    lower_mime = mime_type.lower() if mime_type else None
-    suffix = p.suffix.lower()
-    text = raw.decode("utf-8", errors="ignore")
-    if lower_mime in {"text/plain"} or suffix in {".txt"}:
-        text = raw.decode("utf-8", errors="ignore")
-    elif lower_mime in {"text/markdown"} or suffix in {".md", ".markdown"}:
-        text = _parse_markdown(raw)
-    elif lower_mime == "text/html" or suffix == ".html":
-        text = _parse_html(raw)
-    elif lower_mime == "application/pdf" or suffix == ".pdf":
-        txt = _try_pdf_text(p)
-        if txt:
-            text = txt
-    elif lower_mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document" or suffix == ".docx":
-        txt = _parse_docx(p)
+    with p.open("rb") as f:
+        if fmt is None:
+            fmt = sniff_format(f.read(_SNIFF_BYTES), mime_type, p.suffix)
+            f.seek(0)
+        txt = None
+        if fmt == PDF:
+            txt = _try_pdf_text(f)
+        elif fmt == DOCX:
+            txt = _parse_docx(f)
         if txt:
             text = txt
-    lang = None
-    try:
-        lang = detect(text[:1000]) if text else None
-    except Exception:
-        lang = None
-    return text, lang
+        else:
+            with _read_buffer(f) as buf:
+                if fmt == MARKDOWN:
+                    text = _parse_markdown(buf, keep_headings)
+                elif fmt == HTML:
+                    # HTML parsers need real bytes; only a mapped (large) file is copied here
+                    text = _parse_html(buf if isinstance(buf, bytes) else buf[:], keep_headings)
+                else:
+                    text = _decode(buf)
+    return text, detect_language(text)
+
+
+def iter_pages(
+    path: str, mime_type: Optional[str] = None, keep_headings: bool = False, fmt: Optional[str] = None
+) -> Iterator[Tuple[Optional[int], str]]:
+    """
+    Streaming variant of parse_text: PDFs yield (page_no, text) page by page; other formats
+    yield a single (None, text) item.
+    """
+    fmt = fmt or detect_format(path, mime_type)
+    if fmt == PDF:
+        yielded = False
+        try:
+            for item in iter_pdf_pages(path):
+                yielded = True
+                yield item
+            return
+        except Exception:
+            if yielded:
+                return
+        fmt = TEXT  # not a readable PDF; decode it as text instead of parsing it again
+    text, _ = parse_text(path, mime_type, keep_headings, fmt)
+    yield None, text
@@ -1,21 +1,148 @@
 from datetime import datetime
+import time
 import uuid
-from typing import List
+from typing import Dict, Iterable, Iterator, List
 
 from app.config import get_settings
-from core import chunker, embedder as embedder_module, parser, vectorstore, storage
-from core import opensearch_bm25
+from core import chunker, embedder as embedder_module, langid, metrics, parse_pool, parser, providers, storage
 from infra import models
 from infra.db import SessionLocal
 
 settings = get_settings()
-vs = vectorstore.get_vector_store()
-bm25_client = opensearch_bm25.get_bm25_client()
+INGEST_STAGE_SECONDS = metrics.histogram(
+    "raglite_ingest_stage_seconds",
+    "Seconds per ingested document and stage (fetch, parse, chunk, embed, upsert, bm25_index)",
+    ("stage",),
+)
+INGEST_DOCUMENTS = metrics.counter("raglite_ingest_documents", "Documents ingested, by outcome", ("status",))
 
 
-def ingest_document(job_id: str | None, tenant_id: str, dataset_id: str, document_id: str, path: str, mime_type: str | None, embedder: str | None = None):
+def _chunk_params(strategy: str, embedder_name: str | None) -> tuple:
+    """
+    (chunk_size, overlap, tokenizer) for the dataset's strategy. Token-budgeted strategies count
+    the embedder's own subword tokens and cap the budget at the model's max sequence length.
+    """
+    if strategy == "sliding_window":
+        return settings.chunk_size, settings.chunk_overlap, None
+    tokenizer, max_tokens = embedder_module.get_tokenizer(embedder_name)
+    chunk_size = min(settings.chunk_size, max_tokens) if max_tokens else settings.chunk_size
+    overlap = min(settings.chunk_overlap, chunk_size // 2)
+    return chunk_size, overlap, tokenizer
+
+
+def _chunk_meta(start: int, end: int, page: int | None, page_end: int | None, lang: str | None = None) -> dict:
+    meta = {"start": start, "end": end}
+    if lang:
+        meta["lang"] = lang
+    if page is not None:
+        meta["page"] = page
+        if page_end is not None and page_end != page:
+            meta["page_end"] = page_end
+    return meta
+
+
+def _chunk_record(
+    tenant_id: str, dataset_id: str, document_id: str, source_uri: str | None, chunk: tuple, lang: str | None, emb
+) -> tuple:
+    """(vector point, Chunk row) for one chunk; ids are stable per document offset so re-ingest overwrites."""
+    start, end, txt, page, page_end = chunk
+    chunk_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{document_id}:{start}"))
+    meta = _chunk_meta(start, end, page, page_end, lang)
+    item_payload = {
+        "tenant_id": tenant_id,
+        "dataset_id": dataset_id,
+        "document_id": document_id,
+        "text": txt,
+        "source_uri": source_uri,
+        "meta": meta,
+    }
+    row = models.Chunk(
+        id=chunk_id,
+        tenant_id=tenant_id,
+        dataset_id=dataset_id,
+        document_id=document_id,
+        text=txt,
+        meta=meta,
+    )
+    return {"id": chunk_id, "vector": emb, "payload": item_payload}, row
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _has_markup(fmt: str) -> bool:
+    # Markdown/HTML parsed with keep_headings still carry `#` heading lines; plain text and PDFs
+    # may contain `*`, `_` or list markers that are content
+    return fmt in (parser.MARKDOWN, parser.HTML)
+
+
+def _timed(items: Iterable, timings: Dict[str, float], stage: str) -> Iterator:
+    """Yield from `items`, adding the time spent producing each item to timings[stage]."""
+    it = iter(items)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+        yield item
+
+
+def _observe_stages(timings: Dict[str, float]) -> None:
+    # the chunker pulls pages through the parser, so its clock includes parsing
+    if "chunk" in timings:
+        timings["chunk"] -= timings.get("parse", 0.0)
+    for stage, seconds in timings.items():
+        INGEST_STAGE_SECONDS.observe(max(seconds, 0.0), stage=stage)
+
+
+def _observe_shared(timings: Dict[str, float], documents: int) -> None:
+    # stages run once for a group of documents; each document is recorded with an even share
+    for stage, seconds in timings.items():
+        for _ in range(documents):
+            INGEST_STAGE_SECONDS.observe(seconds / documents, stage=stage)
+
+
+def _index_bm25(bm25_client, tenant_id: str, dataset_id: str, items: List[dict], timings: Dict[str, float]) -> None:
+    started = time.perf_counter()
+    try:
+        bm25_client.index_documents(tenant_id, dataset_id, items)
+    except Exception:
+        pass
+    timings["bm25_index"] = timings.get("bm25_index", 0.0) + time.perf_counter() - started
+
+
+def ingest_document(
+    job_id: str | None,
+    tenant_id: str,
+    dataset_id: str,
+    document_id: str,
+    path: str,
+    mime_type: str | None,
+    embedder: str | None = None,
+    bm25_items: List[dict] | None = None,
+    batch_warnings: List[str] | None = None,
+):
+    """
+    Ingest one stored document. With `bm25_items`, the document's BM25 entries are appended
+    there once it succeeds so the caller can index a whole batch with one update. Parse warnings
+    go to the job payload, and to `batch_warnings` (prefixed with the document id) when given.
+    """
+    vs = providers.vector_store()
+    bm25_client = providers.bm25_client()
     db = SessionLocal()
     job = None
+    doc = None
     try:
         if job_id:
             job = db.query(models.Job).filter(models.Job.id == job_id).first()
@@ -27,95 +154,99 @@ def ingest_document(job_id: str | None, tenant_id: str, dataset_id: str, documen
         # Fetch document to get source_uri
         doc = db.query(models.Document).filter(models.Document.id == document_id).first()
         source_uri = doc.source_uri if doc else None
-        
+
         embedder_name = embedder or (ds.embedder if ds else None)
+        chunk_strategy = (ds.chunk_strategy if ds else None) or settings.chunk_strategy
+        chunk_size, overlap, tokenizer = _chunk_params(chunk_strategy, embedder_name)
         if job:
             job.status = models.JobStatus.running.value
             job.progress = 10
             job.error = None
             db.commit()
-        local_path, cleanup = storage.ensure_local_path(path)
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        local_path, cleanup = storage.ensure_local_path(path, doc.content_hash if doc else None)
+        timings["fetch"] = time.perf_counter() - started
+        warnings: List[str] = []
+        doc_lang = doc.language if doc else None
+        lang_weights: List[tuple] = []
+        doc_bm25_items = []
         try:
-            text, lang = parser.parse_text(local_path, mime_type)
+            # pages stream from the parser into the chunker and are embedded/stored batch by batch,
+            # so a large PDF is never held in memory as a single string
+            fmt = parser.detect_format(local_path, mime_type)
+            pages = parse_pool.parse_pages(
+                local_path, mime_type, keep_headings=chunk_strategy == "markdown", warnings=warnings, fmt=fmt
+            )
+            chunks = chunker.chunk_stream(
+                _timed(pages, timings, "parse"),
+                chunk_strategy,
+                chunk_size=chunk_size,
+                overlap=overlap,
+                tokenizer=tokenizer,
+                strip_markup=_has_markup(fmt),
+            )
+            for batch in _batched(_timed(chunks, timings, "chunk"), settings.embed_batch_size):
+                if doc_lang is None:
+                    # provisional document language from the first batch; chunks in the same
+                    # script inherit it instead of running detection per chunk
+                    doc_lang = langid.detect("\n".join(c[2] for c in batch))
+                started = time.perf_counter()
+                embeddings = embedder_module.embed_texts([c[2] for c in batch], model_name=embedder_name)
+                timings["embed"] = timings.get("embed", 0.0) + time.perf_counter() - started
+                payload = []
+                for chunk, emb in zip(batch, embeddings):
+                    chunk_lang = langid.chunk_language(chunk[2], doc_lang)
+                    lang_weights.append((chunk_lang, len(chunk[2])))
+                    point, row = _chunk_record(tenant_id, dataset_id, document_id, source_uri, chunk, chunk_lang, emb)
+                    payload.append(point)
+                    if settings.enable_bm25 and bm25_client:
+                        doc_bm25_items.append({"id": point["id"], "text": chunk[2], "payload": point["payload"]})
+                    db.add(row)
+                started = time.perf_counter()
+                try:
+                    vs.upsert(tenant_id, dataset_id, payload)
+                except Exception:
+                    pass
+                timings["upsert"] = timings.get("upsert", 0.0) + time.perf_counter() - started
+                if job and job.progress < 80:
+                    job.progress = min(job.progress + 10, 80)
+                db.commit()
         finally:
             if cleanup:
                 cleanup()
-        if job:
-            job.progress = 40
-            db.commit()
-        chunks = chunker.sliding_window(text, chunk_size=settings.chunk_size, overlap=settings.chunk_overlap)
-        if job:
-            job.progress = 60
-            db.commit()
-        chunk_texts = [c[2] for c in chunks]
-        embeddings = embedder_module.embed_texts(chunk_texts, model_name=embedder_name)
-        if job:
-            job.progress = 80
-            db.commit()
-        payload = []
-        for (start, end, txt), emb in zip(chunks, embeddings):
-            chunk_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{document_id}:{start}"))
-            payload.append(
-                {
-                    "id": chunk_id,
-                    "vector": emb,
-                    "payload": {
-                        "tenant_id": tenant_id,
-                        "dataset_id": dataset_id,
-                        "document_id": document_id,
-                        "text": txt,
-                        "source_uri": source_uri,
-                        "meta": {"start": start, "end": end},
-                    },
-                }
-            )
-            ch = models.Chunk(
-                id=chunk_id,
-                tenant_id=tenant_id,
-                dataset_id=dataset_id,
-                document_id=document_id,
-                text=txt,
-                meta={"start": start, "end": end},
-            )
-            db.add(ch)
-        if settings.enable_bm25 and bm25_client:
-            bm25_items = []
-            for (start, end, txt) in chunks:
-                chunk_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{document_id}:{start}"))
-                bm25_items.append(
-                    {
-                        "id": chunk_id,
-                        "text": txt,
-                        "payload": {
-                            "tenant_id": tenant_id,
-                            "dataset_id": dataset_id,
-                            "document_id": document_id,
-                            "text": txt,
-                            "source_uri": source_uri,
-                            "meta": {"start": start, "end": end},
-                        },
-                    }
-                )
-            try:
-                bm25_client.index_documents(tenant_id, dataset_id, bm25_items)
-            except Exception:
-                pass
-        try:
-            vs.upsert(tenant_id, dataset_id, payload)
-        except Exception:
-            pass
+        # chunk tags cover the whole document, not just its opening pages
+        lang = langid.majority(lang_weights)
+        if bm25_items is not None:
+            bm25_items.extend(doc_bm25_items)
+        elif doc_bm25_items:
+            _index_bm25(bm25_client, tenant_id, dataset_id, doc_bm25_items, timings)
+        if batch_warnings is not None:
+            batch_warnings.extend(f"{document_id}: {warning}" for warning in warnings)
         if job:
             job.status = models.JobStatus.succeeded.value
             job.progress = 100
             job.updated_at = datetime.utcnow()
             job.error = None
+            if warnings:
+                job.payload = {**(job.payload or {}), "warnings": warnings}
         # Update document status using the already-fetched doc
         if doc:
             doc.status = "succeeded"
             if lang and not doc.language:
                 doc.language = lang
         db.commit()
+        _observe_stages(timings)
+        INGEST_DOCUMENTS.inc(status="succeeded")
     except Exception as exc:
+        INGEST_DOCUMENTS.inc(status="failed")
+        db.rollback()
+        # batches stored before the failure would otherwise leave a partially indexed document
+        try:
+            db.query(models.Chunk).filter(models.Chunk.document_id == document_id).delete()
+            vs.delete_document(tenant_id, dataset_id, document_id)
+        except Exception:
+            pass
         if doc:
             doc.status = "failed"
             db.commit()
@@ -129,7 +260,287 @@ def ingest_document(job_id: str | None, tenant_id: str, dataset_id: str, documen
         db.close()
 
 
+def _fetch_remote(db, doc: models.Document) -> bool:
+    """
+    Stream a bulk-import URL into storage and fill in path/size/hash on the Document.
+    Returns False (and soft-deletes the row) when the content already exists in the dataset.
+    """
+    import requests
+
+    from core.security import is_safe_url
+
+    if not is_safe_url(doc.source_uri):
+        raise ValueError("Invalid or unsafe source_uri")
+    with requests.get(
+        doc.source_uri, timeout=settings.source_fetch_timeout_seconds, stream=True, allow_redirects=False
+    ) as resp:
+        if 300 <= resp.status_code < 400:
+            raise ValueError("Redirects are not allowed for source_uri")
+        resp.raise_for_status()
+        mime = doc.mime_type or (resp.headers.get("content-type") or "").split(";", 1)[0].strip().lower()
+        if mime not in settings.allowed_mime_types:
+            raise ValueError(f"Unsupported MIME type: {mime}")
+        staged = storage.stage_stream(
+            settings.object_store_root,
+            resp.iter_content(chunk_size=64 * 1024),
+            mime,
+            max_bytes=settings.max_file_size_mb * 1024 * 1024,
+        )
+    if _mark_duplicate(db, doc, staged.content_hash):
+        storage.discard_staged(staged)
+        return False
+    filename = doc.filename or doc.source_uri.rstrip("/").rsplit("/", 1)[-1] or "remote"
+    doc.path = storage.commit_staged(settings.object_store_root, staged, doc.tenant_id, doc.dataset_id, doc.id, filename)
+    doc.mime_type = mime
+    doc.size_bytes = staged.size
+    doc.content_hash = staged.content_hash
+    db.commit()
+    return True
+
+
+def _check_import(db, doc: models.Document) -> bool:
+    """
+    Check an S3 bulk-import object against `max_file_size_mb` before it is downloaded, record its
+    real size (manifest sizes are only declared) and fill in the hash when the manifest omitted it.
+    Returns False (and soft-deletes the row) when the content already exists in the dataset.
+    """
+    max_bytes = settings.max_file_size_mb * 1024 * 1024
+    if doc.content_hash:
+        size = storage.s3_object_size(doc.path)
+        if size > max_bytes:
+            raise storage.FileTooLarge(max_bytes)
+    else:
+        size, content_hash = storage.fetch_object_digest(doc.path, max_bytes)
+        if _mark_duplicate(db, doc, content_hash):
+            return False
+        doc.content_hash = content_hash
+    doc.size_bytes = size
+    db.commit()
+    return True
+
+
+def _mark_duplicate(db, doc: models.Document, content_hash: str) -> bool:
+    from app.dedup import find_existing_hashes
+
+    existing = find_existing_hashes(db, doc.tenant_id, doc.dataset_id, [content_hash])
+    if existing.get(content_hash, doc.id) == doc.id:
+        return False
+    doc.status = "duplicate"
+    doc.deleted_at = datetime.utcnow()
+    db.commit()
+    return True
+
+
+def _is_small(doc: models.Document) -> bool:
+    return doc.size_bytes is not None and doc.size_bytes <= settings.ingest_small_doc_kb * 1024
+
+
+def _ingest_small_documents(
+    db,
+    tenant_id: str,
+    dataset_id: str,
+    docs: List[models.Document],
+    embedder: str | None = None,
+    failed: List[str] | None = None,
+    bm25_items: List[dict] | None = None,
+    warnings: List[str] | None = None,
+) -> List[str]:
+    """
+    Parse and chunk small documents one by one, then embed their chunks together so a batch of
+    short files shares full embedding batches instead of paying one model call each. Returns the
+    ids of documents that failed to parse (also appended to `failed` as they happen, so callers
+    still know them when an error while embedding or storing propagates). BM25 entries go to
+    `bm25_items` when given, as in `ingest_document`; parse warnings (e.g. PDF pages skipped at
+    the deadline) are appended to `warnings`, prefixed with the document id.
+    """
+    vs = providers.vector_store()
+    bm25_client = providers.bm25_client()
+    ds = (
+        db.query(models.Dataset)
+        .filter(models.Dataset.id == dataset_id, models.Dataset.tenant_id == tenant_id)
+        .first()
+    )
+    embedder_name = embedder or (ds.embedder if ds else None)
+    chunk_strategy = (ds.chunk_strategy if ds else None) or settings.chunk_strategy
+    chunk_size, overlap, tokenizer = _chunk_params(chunk_strategy, embedder_name)
+    failed = [] if failed is None else failed
+    parsed: List[models.Document] = []
+    pending: List[tuple] = []  # (doc, chunk, lang)
+    group_warnings: List[str] = []
+    for doc in docs:
+        timings: Dict[str, float] = {}
+        doc_warnings: List[str] = []
+        try:
+            started = time.perf_counter()
+            local_path, cleanup = storage.ensure_local_path(doc.path, doc.content_hash)
+            timings["fetch"] = time.perf_counter() - started
+            try:
+                fmt = parser.detect_format(local_path, doc.mime_type)
+                pages = parse_pool.parse_pages(
+                    local_path, doc.mime_type, keep_headings=chunk_strategy == "markdown", warnings=doc_warnings, fmt=fmt
+                )
+                chunks = list(
+                    _timed(
+                        chunker.chunk_stream(
+                            _timed(pages, timings, "parse"),
+                            chunk_strategy,
+                            chunk_size=chunk_size,
+                            overlap=overlap,
+                            tokenizer=tokenizer,
+                            strip_markup=_has_markup(fmt),
+                        ),
+                        timings,
+                        "chunk",
+                    )
+                )
+            finally:
+                if cleanup:
+                    cleanup()
+        except Exception:
+            failed.append(doc.id)
+            doc.status = "failed"
+            continue
+        _observe_stages(timings)
+        group_warnings.extend(f"{doc.id}: {warning}" for warning in doc_warnings)
+        doc_lang = doc.language or (langid.detect("\n".join(c[2] for c in chunks)) if chunks else None)
+        pending.extend((doc, chunk, langid.chunk_language(chunk[2], doc_lang)) for chunk in chunks)
+        parsed.append(doc)
+
+    lang_weights: dict = {doc.id: [] for doc in parsed}
+    group_bm25_items = []
+    shared: Dict[str, float] = {}
+    for batch in _batched(pending, settings.embed_batch_size):
+        started = time.perf_counter()
+        embeddings = embedder_module.embed_texts([c[2] for _, c, _ in batch], model_name=embedder_name)
+        shared["embed"] = shared.get("embed", 0.0) + time.perf_counter() - started
+        payload = []
+        for (doc, chunk, lang), emb in zip(batch, embeddings):
+            point, row = _chunk_record(tenant_id, dataset_id, doc.id, doc.source_uri, chunk, lang, emb)
+            payload.append(point)
+            lang_weights[doc.id].append((lang, len(chunk[2])))
+            if settings.enable_bm25 and bm25_client:
+                group_bm25_items.append({"id": point["id"], "text": chunk[2], "payload": point["payload"]})
+            db.add(row)
+        started = time.perf_counter()
+        vs.upsert(tenant_id, dataset_id, payload)
+        shared["upsert"] = shared.get("upsert", 0.0) + time.perf_counter() - started
+    if bm25_items is not None:
+        bm25_items.extend(group_bm25_items)
+    elif group_bm25_items:
+        _index_bm25(bm25_client, tenant_id, dataset_id, group_bm25_items, shared)
+    if warnings is not None:
+        warnings.extend(group_warnings)
+    for doc in parsed:
+        doc.status = "succeeded"
+        lang = langid.majority(lang_weights[doc.id])
+        if lang and not doc.language:
+            doc.language = lang
+    db.commit()
+    if parsed:
+        _observe_shared(shared, len(parsed))
+    INGEST_DOCUMENTS.inc(len(parsed), status="succeeded")
+    INGEST_DOCUMENTS.inc(len(failed), status="failed")
+    return failed
+
+
+def ingest_batch(job_id: str, tenant_id: str, dataset_id: str, document_ids: List[str], embedder: str | None = None):
+    """
+    Ingest many documents under one job (bulk imports). Documents up to `ingest_small_doc_kb` are
+    embedded together in shared batches; larger ones go through `ingest_document`. A failing
+    document is marked failed and recorded in the job payload; the rest of the batch continues.
+    BM25 is updated once for the whole batch, since the in-memory fallback rewrites the dataset's
+    index on every update.
+    """
+    db = SessionLocal()
+    job = None
+    try:
+        job = db.query(models.Job).filter(models.Job.id == job_id).first()
+        if job:
+            job.status = models.JobStatus.running.value
+            job.progress = 1
+            db.commit()
+        docs = (
+            db.query(models.Document)
+            .filter(
+                models.Document.id.in_(document_ids),
+                models.Document.tenant_id == tenant_id,
+                models.Document.deleted_at.is_(None),
+            )
+            .all()
+        )
+        failed: List[str] = []
+        warnings: List[str] = []
+        bm25_items: List[dict] = []
+        small: List[models.Document] = []
+        total = len(docs) or 1
+        for idx, doc in enumerate(docs, start=1):
+            try:
+                if not doc.path and doc.source_uri and not _fetch_remote(db, doc):
+                    continue
+                if doc.path and storage.is_import_path(doc.path) and not _check_import(db, doc):
+                    continue
+                if _is_small(doc):
+                    small.append(doc)
+                    continue
+                ingest_document(None, tenant_id, dataset_id, doc.id, doc.path, doc.mime_type, embedder, bm25_items, warnings)
+            except Exception:
+                db.rollback()
+                failed.append(doc.id)
+                doc.status = "failed"
+            if job:
+                job.progress = int(100 * idx / total)
+            db.commit()
+        if small:
+            unparsed: List[str] = []
+            try:
+                _ingest_small_documents(
+                    db, tenant_id, dataset_id, small, embedder, failed=unparsed, bm25_items=bm25_items, warnings=warnings
+                )
+            except Exception:
+                # the shared embed/store step failed; retry the group one document at a time,
+                # except the documents that already failed to parse
+                db.rollback()
+                for doc in small:
+                    if doc.id in unparsed:
+                        doc.status = "failed"
+                        db.commit()
+                        continue
+                    try:
+                        ingest_document(None, tenant_id, dataset_id, doc.id, doc.path, doc.mime_type, embedder, bm25_items, warnings)
+                    except Exception:
+                        db.rollback()
+                        failed.append(doc.id)
+                        doc.status = "failed"
+                        db.commit()
+            failed.extend(unparsed)
+        if bm25_items:
+            timings: Dict[str, float] = {}
+            _index_bm25(providers.bm25_client(), tenant_id, dataset_id, bm25_items, timings)
+            _observe_shared(timings, len({item["payload"].get("document_id") for item in bm25_items}))
+        if job:
+            job.status = models.JobStatus.failed.value if docs and len(failed) == len(docs) else models.JobStatus.succeeded.value
+            job.progress = 100
+            job.updated_at = datetime.utcnow()
+            if failed:
+                job.payload = {**(job.payload or {}), "failed": failed}
+                job.error = f"{len(failed)} of {len(docs)} documents failed"
+            if warnings:
+                job.payload = {**(job.payload or {}), "warnings": warnings}
+            db.commit()
+    except Exception as exc:
+        if job:
+            job.status = models.JobStatus.failed.value
+            job.error = str(exc)
+            job.updated_at = datetime.utcnow()
+            db.commit()
+        raise
+    finally:
+        db.close()
+
+
 def reindex_dataset(job_id: str, tenant_id: str, dataset_id: str, embedder: str | None):
+    vs = providers.vector_store()
+    bm25_client = providers.bm25_client()
     db = SessionLocal()
     job = None
     try:
@@ -162,11 +573,78 @@ def reindex_dataset(job_id: str, tenant_id: str, dataset_id: str, embedder: str
             .all()
         )
         total = len(docs) or 1
+        bm25_items: List[dict] = []  # indexed once at the end, as in ingest_batch
         for idx, doc in enumerate(docs, start=1):
-            ingest_document(job_id, tenant_id, dataset_id, doc.id, doc.path, doc.mime_type, embedder)
+            ingest_document(job_id, tenant_id, dataset_id, doc.id, doc.path, doc.mime_type, embedder, bm25_items)
             if job:
                 job.progress = int(100 * idx / total)
                 db.commit()
+        if bm25_items:
+            timings: Dict[str, float] = {}
+            _index_bm25(bm25_client, tenant_id, dataset_id, bm25_items, timings)
+            _observe_shared(timings, len(docs))
+        if job:
+            job.status = models.JobStatus.succeeded.value
+            job.progress = 100
+            job.updated_at = datetime.utcnow()
+            db.commit()
+    except Exception as exc:
+        if job:
+            job.status = models.JobStatus.failed.value
+            job.error = str(exc)
+            job.updated_at = datetime.utcnow()
+            db.commit()
+        raise
+    finally:
+        db.close()
+
+
+def cleanup_datasets(job_id: str, tenant_id: str, dataset_ids: List[str], purge_tenant: bool = False):
+    """
+    Remove vectors, BM25 entries and stored files of deleted datasets (or a whole tenant).
+    Runs as a background job so the delete request itself returns immediately.
+    """
+    from app.dedup import unreferenced_paths
+
+    vs = providers.vector_store()
+    bm25_client = providers.bm25_client()
+    db = SessionLocal()
+    job = None
+    try:
+        job = db.query(models.Job).filter(models.Job.id == job_id).first()
+        if job:
+            job.status = models.JobStatus.running.value
+            job.progress = 5
+            db.commit()
+        total = len(dataset_ids) + 1
+        for idx, dataset_id in enumerate(dataset_ids, start=1):
+            try:
+                vs.delete_dataset(tenant_id, dataset_id)
+            except Exception:
+                pass
+            try:
+                if bm25_client:
+                    bm25_client.delete_dataset(tenant_id, dataset_id)
+            except Exception:
+                pass
+            if not purge_tenant:
+                storage.delete_dataset_store(settings.object_store_root, tenant_id, dataset_id)
+                # bulk imports reference their source objects in place instead of copying them
+                imported = [
+                    row.path
+                    for row in db.query(models.Document.path).filter(
+                        models.Document.tenant_id == tenant_id,
+                        models.Document.dataset_id == dataset_id,
+                        models.Document.path.is_not(None),
+                    )
+                    if storage.is_import_path(row.path)
+                ]
+                storage.delete_s3_objects(unreferenced_paths(db, tenant_id, imported))
+            if job:
+                job.progress = max(job.progress, int(90 * idx / total))
+                db.commit()
+        if purge_tenant:
+            storage.delete_tenant_store(settings.object_store_root, tenant_id)
         if job:
             job.status = models.JobStatus.succeeded.value
             job.progress = 100
@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Provider:
+    """
+    Lazily built, process-wide service client. The factory runs on the first `get()`, never at
+    import, and once per process: a forked worker builds its own client instead of sharing the
+    parent's sockets. `close()` drops the instance (running the close hook) so the next `get()`
+    builds a fresh one.
+    """
+
+    def __init__(self, factory: Callable[[], Any], close: Optional[Callable[[Any], None]] = None):
+        self._factory = factory
+        self._close = close
+        self._value: Any = None
+        self._pid: Optional[int] = None  # None until built; the value itself may be None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._value = self._factory()
+                    self._pid = os.getpid()
+        return self._value
+
+    @property
+    def ready(self) -> bool:
+        return self._pid == os.getpid()
+
+    def set(self, value: Any) -> None:
+        """Use a prebuilt client in this process instead of calling the factory."""
+        with self._lock:
+            self._value, self._pid = value, os.getpid()
+
+    def close(self) -> None:
+        with self._lock:
+            value, pid = self._value, self._pid
+            self._value, self._pid = None, None
+        if value is None or pid != os.getpid() or self._close is None:
+            return
+        try:
+            self._close(value)
+        except Exception:
+            logger.warning("Closing %r failed", value, exc_info=True)
+
+
+def _build_vector_store():
+    from core import vectorstore
+
+    return vectorstore.get_vector_store()
+
+
+def _build_bm25_client():
+    from core import opensearch_bm25
+
+    return opensearch_bm25.get_bm25_client()
+
+
+def _close_client(service: Any) -> None:
+    # the OpenSearch wrapper keeps its network client on `.client`, the Qdrant one on `._client`
+    client = getattr(service, "client", None) or getattr(service, "_client", None)
+    close = getattr(client, "close", None)
+    if callable(close):
+        close()
+
+
+_vector_store = Provider(_build_vector_store, _close_client)
+_bm25_client = Provider(_build_bm25_client, _close_client)
+
+
+def vector_store():
+    """Qdrant store (or the no-op store), connected on first use."""
+    return _vector_store.get()
+
+
+def bm25_client():
+    """OpenSearch BM25 client, the in-memory fallback, or None with BM25 disabled; pings OpenSearch on first use."""
+    return _bm25_client.get()
+
+
+_UNSET = object()
+
+
+def override(vector_store: Any = _UNSET, bm25_client: Any = _UNSET) -> None:
+    """Install prebuilt clients (benchmarks, tests, or an app embedding RAGLite); None disables BM25."""
+    if vector_store is not _UNSET:
+        _vector_store.set(vector_store)
+    if bm25_client is not _UNSET:
+        _bm25_client.set(bm25_client)
+
+
+def close_all() -> None:
+    """Shutdown hook for API and worker processes."""
+    _vector_store.close()
+    _bm25_client.close()
@@ -3,13 +3,16 @@ from typing import List, Optional
 
 import requests
 
-from app.settings_service import get_app_settings_db, get_model_config_by_name
+from app.settings_service import SETTINGS_LOOKUP_SECONDS, get_app_settings_db, get_model_config_by_name
+from core import metrics
 from infra import models
 from infra.db import SessionLocal
 
 logger = logging.getLogger(__name__)
+RERANK_FAILURES = metrics.counter("raglite_rerank_failures", "Rerank calls that failed and kept the retrieval order")
 
 
+@SETTINGS_LOOKUP_SECONDS.time(kind="rerank")
 def _resolve_rerank_config(model_name: Optional[str]) -> Optional[models.ModelConfig]:
     db = SessionLocal()
     try:
@@ -100,6 +103,7 @@ def _rerank_internal(
             reranked = _rerank_local(query, candidate_results, cfg.model)
     except Exception as exc:
         logger.warning("Reranker failed for model '%s': %s", cfg.name, exc)
+        RERANK_FAILURES.inc()
         return results, False, None
 
     if min_score is not None:
@@ -2,6 +2,7 @@ import time
 from typing import Dict, Tuple
 
 from app.config import get_settings
+from core.metrics import CACHE_REQUESTS
 
 settings = get_settings()
 _CACHE: Dict[str, Tuple[float, str]] = {}
@@ -16,7 +17,9 @@ def rewrite_query(query: str, tenant_id: str | None = None) -> str:
     if key in _CACHE:
         ts, val = _CACHE[key]
         if now - ts < settings.rewrite_cache_ttl_seconds:
+            CACHE_REQUESTS.inc(cache="rewrite", result="hit")
             return val
+    CACHE_REQUESTS.inc(cache="rewrite", result="miss")
     rewritten = query.strip()
     # placeholder for LLM rewrite; if configured, could call external service
     _CACHE[key] = (now, rewritten)
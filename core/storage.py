@@ -1,9 +1,16 @@
 import hashlib
+import itertools
 import os
 import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from email.utils import format_datetime
 from pathlib import Path
-from typing import Callable, Tuple
-from urllib.parse import urlparse
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlparse
 
 from fastapi import UploadFile
 
@@ -24,16 +31,65 @@ def is_s3_backend() -> bool:
     return _is_s3_backend()
 
 
+_client_lock = threading.Lock()
+_client = None
+_client_pid: Optional[int] = None
+
+
+def _reset_s3_client() -> None:
+    global _client, _client_pid
+    _client, _client_pid = None, None
+
+
+if hasattr(os, "register_at_fork"):
+    # a client inherited across fork shares sockets with the parent; children build their own
+    os.register_at_fork(after_in_child=_reset_s3_client)
+
+
 def _s3_client():
-    import boto3
-
-    return boto3.client(
-        "s3",
-        endpoint_url=settings.s3_endpoint,
-        region_name=settings.s3_region,
-        aws_access_key_id=settings.s3_access_key,
-        aws_secret_access_key=settings.s3_secret_key,
-        use_ssl=settings.s3_secure,
+    """
+    Process-wide S3 client. boto3 clients are thread-safe once built, but building one resolves
+    credentials and creates a connection pool, so it is done once per process under a lock,
+    from a dedicated Session (the default session is not thread-safe).
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            import boto3
+            from botocore.config import Config
+
+            _client = boto3.session.Session().client(
+                "s3",
+                endpoint_url=settings.s3_endpoint,
+                region_name=settings.s3_region,
+                aws_access_key_id=settings.s3_access_key,
+                aws_secret_access_key=settings.s3_secret_key,
+                use_ssl=settings.s3_secure,
+                config=Config(
+                    max_pool_connections=settings.s3_max_pool_connections,
+                    retries={"max_attempts": 3, "mode": "adaptive"},
+                ),
+            )
+            _client_pid = pid
+        return _client
+
+
+def _part_size() -> int:
+    return max(settings.s3_multipart_part_size_mb, 5) * 1024 * 1024  # S3 minimum part size is 5 MB
+
+
+def _transfer_config():
+    """TransferConfig for download_fileobj/upload_fileobj: parallel ranged parts on the shared pool."""
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=_part_size(),
+        multipart_chunksize=_part_size(),
+        max_concurrency=settings.s3_transfer_concurrency,
+        use_threads=settings.s3_transfer_concurrency > 1,
     )
 
 
@@ -53,6 +109,85 @@ def _build_s3_key(tenant_id: str, dataset_id: str, document_id: str, filename: s
     return "/".join(parts)
 
 
+def import_s3_path(tenant_id: str, key: str) -> str:
+    """
+    s3:// path for a bulk-import object. Keys (or s3:// URLs in the configured bucket) must sit
+    under `<s3_prefix>/imports/<tenant_id>/` so a manifest cannot reference another tenant's files.
+    """
+    if is_s3_path(key):
+        bucket, key = _parse_s3_url(key)
+        if bucket != _s3_bucket():
+            raise ValueError("S3 import objects must be in the configured bucket")
+    key = key.lstrip("/")
+    allowed = "/".join(p for p in [_s3_prefix(), "imports", tenant_id] if p) + "/"
+    if not key.startswith(allowed) or ".." in key.split("/"):
+        raise ValueError(f"S3 import keys must start with {allowed}")
+    return _s3_url(_s3_bucket(), key)
+
+
+def is_import_path(path: str) -> bool:
+    """True for s3:// paths under `<s3_prefix>/imports/`, which bulk imports reference in place."""
+    if not is_s3_path(path):
+        return False
+    bucket, key = _parse_s3_url(path)
+    return bucket == settings.s3_bucket and key.startswith("/".join(p for p in [_s3_prefix(), "imports"] if p) + "/")
+
+
+def s3_object_size(path: str) -> int:
+    bucket, key = _parse_s3_url(path)
+    return int(_s3_client().head_object(Bucket=bucket, Key=key)["ContentLength"])
+
+
+def fetch_object_digest(path: str, max_bytes: Optional[int] = None) -> Tuple[int, str]:
+    """
+    (size, sha256) of an S3 object, downloaded once. With the ingest cache enabled the copy is
+    kept there under its hash, so parsing the document afterwards does not download it again.
+    Objects larger than `max_bytes` raise FileTooLarge before anything is downloaded.
+    """
+    import shutil
+
+    from core import file_cache
+
+    if max_bytes is not None and s3_object_size(path) > max_bytes:
+        raise FileTooLarge(max_bytes)
+    local, cleanup = download_to_temp(path)
+    try:
+        size = os.path.getsize(local)
+        if max_bytes is not None and size > max_bytes:
+            raise FileTooLarge(max_bytes)  # replaced after the HEAD
+        sha = hashlib.sha256()
+        with open(local, "rb") as f:
+            for block in _iter_file(f):
+                sha.update(block)
+        digest = sha.hexdigest()
+        cache = file_cache.get_file_cache()
+        if cache is not None:
+            cache.put(digest, lambda dest: shutil.move(local, dest), verify=False)
+    finally:
+        cleanup()
+    return size, digest
+
+
+def delete_s3_objects(paths: Iterable[str]) -> None:
+    """
+    Delete the given s3:// objects in delete_objects batches of up to 1000 keys. Raises
+    RuntimeError naming the keys S3 failed to delete, after trying every batch.
+    """
+    by_bucket: Dict[str, List[str]] = {}
+    for path in paths:
+        bucket, key = _parse_s3_url(path)
+        by_bucket.setdefault(bucket, []).append(key)
+    client = _s3_client()
+    errors: List[dict] = []
+    for bucket, keys in by_bucket.items():
+        for i in range(0, len(keys), 1000):
+            resp = client.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": k} for k in keys[i : i + 1000]], "Quiet": True})
+            errors.extend(resp.get("Errors") or [])
+    if errors:
+        failed = ", ".join(err.get("Key", "?") for err in errors[:10])
+        raise RuntimeError(f"Failed to delete {len(errors)} objects ({failed}): {errors[0].get('Message')}")
+
+
 def _s3_url(bucket: str, key: str) -> str:
     return f"s3://{bucket}/{key}"
 
@@ -64,42 +199,239 @@ def _parse_s3_url(path: str) -> tuple[str, str]:
     return parsed.netloc, parsed.path.lstrip("/")
 
 
-def save_upload_file(root: str, tenant_id: str, dataset_id: str, document_id: str, upload: UploadFile) -> Tuple[str, int, str]:
+class FileTooLarge(ValueError):
+    """Raised while streaming an upload as soon as it passes the size limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def _iter_file(fileobj: BinaryIO, block_size: int = 1024 * 1024) -> Iterator[bytes]:
+    return iter(lambda: fileobj.read(block_size), b"")
+
+
+def _read_parts(chunks: Iterable[bytes], part_size: int, max_bytes: Optional[int], sha) -> Iterator[bytes]:
     """
-    Save uploaded file to object store root and return (path, size_bytes, sha256).
+    Regroup a stream of byte chunks into parts of `part_size` (the last may be shorter),
+    hashing them and enforcing `max_bytes` as they arrive.
     """
+    size = 0
+    buf = bytearray()
+    for chunk in chunks:
+        if not chunk:
+            continue
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            raise FileTooLarge(max_bytes)
+        sha.update(chunk)
+        buf += chunk
+        while len(buf) >= part_size:
+            yield bytes(buf[:part_size])
+            del buf[:part_size]
+    if buf:
+        yield bytes(buf)
+
+
+def _s3_stream_upload(chunks: Iterable[bytes], key: str, content_type: str, max_bytes: Optional[int]) -> Tuple[int, str]:
+    """
+    Upload a byte stream in `s3_multipart_part_size_mb` parts while hashing it; only one part is
+    held in memory per transfer thread. Streams that fit in a single part use a plain put_object.
+    The multipart upload is aborted on any error, including the size limit being passed mid-stream.
+    """
+    client = _s3_client()
+    bucket = _s3_bucket()
+    sha = hashlib.sha256()
+    parts = _read_parts(chunks, _part_size(), max_bytes, sha)
+    first = next(parts, b"")
+    second = next(parts, None)
+    if second is None:
+        client.put_object(Bucket=bucket, Key=key, Body=first, ContentType=content_type)
+        return len(first), sha.hexdigest()
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)["UploadId"]
+    size = 0
+    etags: dict = {}
+    workers = max(settings.s3_transfer_concurrency, 1)
+
+    def send(number: int, part: bytes) -> None:
+        resp = client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=part)
+        etags[number] = resp["ETag"]
 
+    try:
+        # at most `workers` parts are in flight, so memory stays bounded at workers * part size
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight: set = set()
+            for number, part in enumerate(itertools.chain([first, second], parts), start=1):
+                if len(in_flight) >= workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        fut.result()
+                in_flight.add(executor.submit(send, number, part))
+                size += len(part)
+            for fut in in_flight:
+                fut.result()
+        completed = [{"ETag": etags[n], "PartNumber": n} for n in sorted(etags)]
+        client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": completed}
+        )
+    except BaseException:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    return size, sha.hexdigest()
+
+
+@dataclass
+class StagedFile:
+    """Bytes written to the staging area, not yet visible under a document path."""
+
+    path: str
+    size: int
+    content_hash: str
+    content_type: Optional[str] = None
+
+
+def _staging_dir(root: str) -> Path:
+    return Path(root) / ".staging"
+
+
+def stage_stream(
+    root: str,
+    chunks: Iterable[bytes],
+    content_type: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> StagedFile:
+    """
+    Write a byte stream to the local staging area while hashing it. Memory use does not grow
+    with the stream. The caller decides from the hash whether to `commit_staged` (atomic rename
+    into the document path, or a single upload to its S3 key) or `discard_staged`, so duplicates
+    never reach the object store. Raises FileTooLarge as soon as more than `max_bytes` arrive;
+    nothing is kept in that case.
+    """
+    staging = _staging_dir(root)
+    staging.mkdir(parents=True, exist_ok=True)
+    dest = staging / uuid.uuid4().hex
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with dest.open("wb") as f:
+            for part in _read_parts(chunks, 1024 * 1024, max_bytes, digest):
+                f.write(part)
+                size += len(part)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    return StagedFile(str(dest), size, digest.hexdigest(), content_type)
+
+
+def commit_staged(root: str, staged: StagedFile, tenant_id: str, dataset_id: str, document_id: str, filename: str) -> str:
+    """Move a staged file to its document path and return that path."""
     from core.security import secure_filename
-    filename = secure_filename(upload.filename or "upload")
+
+    filename = secure_filename(filename or "upload")
     if _is_s3_backend():
-        data = upload.file.read()
-        upload.file.seek(0)
-        size = len(data)
-        sha = hashlib.sha256(data).hexdigest()
+        bucket = _s3_bucket()
         key = _build_s3_key(tenant_id, dataset_id, document_id, filename)
-        client = _s3_client()
-        client.put_object(
-            Bucket=_s3_bucket(),
-            Key=key,
-            Body=data,
-            ContentType=upload.content_type or "application/octet-stream",
+        _s3_client().upload_file(
+            staged.path,
+            bucket,
+            key,
+            ExtraArgs={"ContentType": staged.content_type or "application/octet-stream"},
+            Config=_transfer_config(),
         )
-        return _s3_url(_s3_bucket(), key), size, sha
+        Path(staged.path).unlink(missing_ok=True)
+        return _s3_url(bucket, key)
     base = Path(root) / "tenants" / tenant_id / dataset_id / document_id
     base.mkdir(parents=True, exist_ok=True)
     dest = base / filename
-    sha = hashlib.sha256()
-    size = 0
-    with dest.open("wb") as f:
-        while True:
-            chunk = upload.file.read(8192)
-            if not chunk:
-                break
-            f.write(chunk)
-            sha.update(chunk)
-            size += len(chunk)
+    os.replace(staged.path, dest)  # same filesystem as the staging area, so atomic
+    return str(dest)
+
+
+def discard_staged(staged: StagedFile) -> None:
+    try:
+        Path(staged.path).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def sweep_staging(root: str, max_age_seconds: float) -> int:
+    """
+    Delete staged files older than `max_age_seconds`, left behind by processes that died between
+    staging and commit. Staging is always local, so this never touches the object store.
+    Returns the number of files removed.
+    """
+    removed = 0
+    cutoff = time.time() - max_age_seconds
+    staging = _staging_dir(root)
+    for path in staging.iterdir() if staging.is_dir() else []:
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def stage_upload_file(root: str, upload: UploadFile, max_bytes: Optional[int] = None) -> StagedFile:
+    staged = stage_stream(root, _iter_file(upload.file), upload.content_type, max_bytes)
+    upload.file.seek(0)
+    return staged
+
+
+def save_stream(
+    root: str,
+    tenant_id: str,
+    dataset_id: str,
+    document_id: str,
+    filename: str,
+    chunks: Iterable[bytes],
+    content_type: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> Tuple[str, int, str]:
+    """
+    Write a byte stream straight to a document path; returns (path, size_bytes, sha256).
+    On S3 the stream is uploaded to the document key as it arrives, without a staging copy.
+    """
+    if _is_s3_backend():
+        from core.security import secure_filename
+
+        key = _build_s3_key(tenant_id, dataset_id, document_id, secure_filename(filename or "upload"))
+        size, sha = _s3_stream_upload(chunks, key, content_type or "application/octet-stream", max_bytes)
+        return _s3_url(_s3_bucket(), key), size, sha
+    staged = stage_stream(root, chunks, content_type, max_bytes)
+    try:
+        path = commit_staged(root, staged, tenant_id, dataset_id, document_id, filename)
+    except BaseException:
+        discard_staged(staged)
+        raise
+    return path, staged.size, staged.content_hash
+
+
+def save_upload_file(
+    root: str,
+    tenant_id: str,
+    dataset_id: str,
+    document_id: str,
+    upload: UploadFile,
+    max_bytes: Optional[int] = None,
+) -> Tuple[str, int, str]:
+    """
+    Stream uploaded file to the object store and return (path, size_bytes, sha256).
+    Raises FileTooLarge as soon as more than `max_bytes` have been read; nothing is kept.
+    """
+    result = save_stream(
+        root,
+        tenant_id,
+        dataset_id,
+        document_id,
+        upload.filename or "upload",
+        _iter_file(upload.file),
+        upload.content_type,
+        max_bytes,
+    )
     upload.file.seek(0)
-    return str(dest), size, sha.hexdigest()
+    return result
 
 
 def save_bytes(root: str, tenant_id: str, dataset_id: str, document_id: str, filename: str, data: bytes) -> str:
@@ -141,6 +473,19 @@ def delete_dataset_store(root: str, tenant_id: str, dataset_id: str) -> None:
         shutil.rmtree(base, ignore_errors=True)
 
 
+def delete_tenant_store(root: str, tenant_id: str) -> None:
+    if _is_s3_backend():
+        for area in ("tenants", "imports"):  # stored documents and bulk-import sources
+            prefix_parts = [p for p in [_s3_prefix(), area, tenant_id] if p]
+            _delete_s3_prefix("/".join(prefix_parts) + "/")
+        return
+    base = Path(root) / "tenants" / tenant_id
+    if base.exists():
+        import shutil
+
+        shutil.rmtree(base, ignore_errors=True)
+
+
 def delete_document_store(root: str, tenant_id: str, dataset_id: str, document_id: str) -> None:
     if _is_s3_backend():
         prefix_parts = [p for p in [_s3_prefix(), "tenants", tenant_id, dataset_id, document_id] if p]
@@ -160,7 +505,7 @@ def download_to_temp(path: str) -> tuple[str, Callable[[], None]]:
     temp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
     client = _s3_client()
     try:
-        client.download_fileobj(bucket, key, temp)
+        client.download_fileobj(bucket, key, temp, Config=_transfer_config())
     finally:
         temp.close()
 
@@ -173,32 +518,163 @@ def download_to_temp(path: str) -> tuple[str, Callable[[], None]]:
     return temp.name, cleanup
 
 
-def ensure_local_path(path: str) -> tuple[str, Callable[[], None] | None]:
-    if is_s3_path(path):
-        local_path, cleanup = download_to_temp(path)
-        return local_path, cleanup
-    return path, None
+@dataclass
+class ObjectStream:
+    """A (possibly partial or not-modified) S3 object ready to be proxied to an HTTP client."""
+
+    status_code: int
+    headers: Dict[str, str]
+    body: Optional[Iterator[bytes]] = None
+
+
+def _iter_body(body, chunk_size: int) -> Iterator[bytes]:
+    try:
+        yield from body.iter_chunks(chunk_size)
+    finally:
+        body.close()
+
+
+def _not_modified_headers(response: dict, bucket: str, key: str) -> dict:
+    """Validators of the stored object for a 304 (the client's If-None-Match may list several tags or `*`)."""
+    sent = {k.lower(): v for k, v in (response.get("ResponseMetadata", {}).get("HTTPHeaders") or {}).items()}
+    if not sent.get("etag"):
+        head = _s3_client().head_object(Bucket=bucket, Key=key)
+        sent = {"etag": head.get("ETag")}
+        if head.get("LastModified"):
+            sent["last-modified"] = format_datetime(head["LastModified"], usegmt=True)
+    headers = {"ETag": sent["etag"]} if sent.get("etag") else {}
+    if sent.get("last-modified"):
+        headers["Last-Modified"] = sent["last-modified"]
+    return headers
+
+
+def stream_s3_object(
+    path: str,
+    byte_range: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    chunk_size: int = 64 * 1024,
+) -> ObjectStream:
+    """
+    Open an S3 object for streaming without staging it on disk. `byte_range` (an HTTP Range
+    header) and `if_none_match` are forwarded to get_object, so S3 answers 206/304/416 itself.
+    Raises FileNotFoundError when the object does not exist.
+    """
+    from botocore.exceptions import ClientError
 
+    bucket, key = _parse_s3_url(path)
+    kwargs = {"Bucket": bucket, "Key": key}
+    if byte_range:
+        kwargs["Range"] = byte_range
+    if if_none_match:
+        kwargs["IfNoneMatch"] = if_none_match
+    try:
+        obj = _s3_client().get_object(**kwargs)
+    except ClientError as exc:
+        status_code = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        code = exc.response.get("Error", {}).get("Code")
+        if status_code == 304 or code == "304":
+            return ObjectStream(304, _not_modified_headers(exc.response, bucket, key))
+        if status_code == 416 or code == "InvalidRange":
+            return ObjectStream(416, {"Accept-Ranges": "bytes"})
+        if status_code == 404 or code in {"NoSuchKey", "404"}:
+            raise FileNotFoundError(path) from exc
+        raise
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(obj["ContentLength"])}
+    if obj.get("ETag"):
+        headers["ETag"] = obj["ETag"]
+    if obj.get("LastModified"):
+        headers["Last-Modified"] = format_datetime(obj["LastModified"], usegmt=True)
+    if obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+    status_code = 206 if obj.get("ContentRange") else 200
+    return ObjectStream(status_code, headers, _iter_body(obj["Body"], chunk_size))
+
+
+def presigned_download_url(path: str, filename: str, media_type: str, expires_in: int) -> str:
+    """Time-limited GET URL so clients can download straight from the object store."""
+    bucket, key = _parse_s3_url(path)
+    return _s3_client().generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": bucket,
+            "Key": key,
+            "ResponseContentType": media_type,
+            "ResponseContentDisposition": f"attachment; filename*=utf-8''{quote(filename)}",
+        },
+        ExpiresIn=expires_in,
+    )
 
-def _delete_s3_prefix(prefix: str) -> None:
+
+def ensure_local_path(path: str, content_hash: Optional[str] = None) -> tuple[str, Callable[[], None] | None]:
+    """
+    Local file for `path`. S3 objects with a known content hash are served from the worker's
+    on-disk ingest cache, so reindexing and retries do not download them again.
+    """
+    if not is_s3_path(path):
+        return path, None
+    from core import file_cache
+
+    cache = file_cache.get_file_cache()
+    if cache is None or not file_cache.is_cache_key(content_hash):
+        return download_to_temp(path)
+    bucket, key = _parse_s3_url(path)
+
+    def fill(dest: str) -> None:
+        _s3_client().download_file(bucket, key, dest, Config=_transfer_config())
+
+    return cache.checkout(content_hash, fill, suffix=Path(key).suffix)
+
+
+def _list_keys(client, bucket: str, prefix: str) -> Iterator[List[str]]:
+    """Pages of object keys under `prefix` (up to 1000 per page, the delete_objects limit)."""
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, PaginationConfig={"PageSize": 1000}):
+        keys = [obj["Key"] for obj in page.get("Contents", [])]
+        if keys:
+            yield keys
+
+
+def _delete_s3_prefix(prefix: str) -> int:
+    """
+    Delete every object under `prefix`; returns the number of keys deleted. Listing fans out
+    over the first level of sub-prefixes (datasets under a tenant, documents under a dataset)
+    and delete_objects batches of up to 1000 keys run in parallel.
+    """
     client = _s3_client()
     bucket = _s3_bucket()
-    continuation = None
-    while True:
-        kwargs = {"Bucket": bucket, "Prefix": prefix}
-        if continuation:
-            kwargs["ContinuationToken"] = continuation
-        response = client.list_objects_v2(**kwargs)
-        objects = response.get("Contents", [])
-        if objects:
-            client.delete_objects(
-                Bucket=bucket,
-                Delete={"Objects": [{"Key": obj["Key"]} for obj in objects]},
-            )
-        if response.get("IsTruncated"):
-            continuation = response.get("NextContinuationToken")
-        else:
-            break
+    workers = max(settings.s3_delete_concurrency, 1)
+    top = client.list_objects_v2(Bucket=bucket, Prefix=prefix, Delimiter="/")
+    sub_prefixes = [p["Prefix"] for p in top.get("CommonPrefixes", [])]
+    direct_keys = [obj["Key"] for obj in top.get("Contents", [])]
+    if top.get("IsTruncated"):
+        # too many entries at this level to fan out from one listing; walk the prefix as a whole
+        sub_prefixes, direct_keys = [prefix], []
+
+    def delete_batch(keys: List[str]) -> int:
+        resp = client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+        errors = resp.get("Errors") or []
+        if errors:
+            raise RuntimeError(f"Failed to delete {len(errors)} objects under {prefix}: {errors[0].get('Message')}")
+        return len(keys)
+
+    with ThreadPoolExecutor(max_workers=workers) as deleters, ThreadPoolExecutor(max_workers=workers) as listers:
+        pending = []
+        lock = threading.Lock()
+
+        def list_and_delete(sub_prefix: str) -> None:
+            for keys in _list_keys(client, bucket, sub_prefix):
+                fut = deleters.submit(delete_batch, keys)
+                with lock:
+                    pending.append(fut)
+
+        if direct_keys:
+            pending.append(deleters.submit(delete_batch, direct_keys))
+        for fut in [listers.submit(list_and_delete, sub) for sub in sub_prefixes]:
+            fut.result()
+        return sum(fut.result() for fut in pending)
 
 
 def check_s3_connection() -> None:
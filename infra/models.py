@@ -1,8 +1,8 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, Float
+from sqlalchemy import DDL, JSON, Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, Float, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from infra.db import Base
@@ -12,6 +12,11 @@ def _uuid() -> str:
     return str(uuid.uuid4())
 
 
+def _partial_index(name: str, *columns: str, where: str) -> Index:
+    """Index limited to rows matching `where` on Postgres and SQLite (full index elsewhere)."""
+    return Index(name, *columns, postgresql_where=text(where), sqlite_where=text(where))
+
+
 class JobStatus(str, Enum):
     pending = "pending"
     running = "running"
@@ -25,6 +30,7 @@ class JobType(str, Enum):
     embed = "embed"
     index = "index"
     reindex = "reindex"
+    cleanup = "cleanup"
 
 
 class Tenant(Base):
@@ -68,6 +74,7 @@ class UserProfile(Base):
 
 class ApiKey(Base):
     __tablename__ = "api_keys"
+    __table_args__ = (Index("ix_api_keys_active_tenant", "active", "tenant_id"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     tenant_id: Mapped[str] = mapped_column(String, ForeignKey("tenants.id"), nullable=False)
@@ -91,6 +98,7 @@ class Dataset(Base):
     rerank_model: Mapped[str | None] = mapped_column(String, nullable=True)
     rerank_top_k: Mapped[int | None] = mapped_column(Integer, nullable=True)
     rerank_min_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    chunk_strategy: Mapped[str | None] = mapped_column(String, nullable=True)
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -100,6 +108,12 @@ class Dataset(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # live-document listings and hash dedup; soft-deleted rows are left out of the indexes
+        _partial_index("ix_documents_live_dataset_created", "tenant_id", "dataset_id", "created_at", "id", where="deleted_at IS NULL"),
+        _partial_index("ix_documents_live_tenant_created", "tenant_id", "created_at", "id", where="deleted_at IS NULL"),
+        _partial_index("ix_documents_live_content_hash", "tenant_id", "dataset_id", "content_hash", where="deleted_at IS NULL"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     tenant_id: Mapped[str] = mapped_column(String, nullable=False)
@@ -122,6 +136,10 @@ class Document(Base):
 
 class Chunk(Base):
     __tablename__ = "chunks"
+    __table_args__ = (
+        Index("ix_chunks_tenant_dataset", "tenant_id", "dataset_id"),
+        Index("ix_chunks_document_id", "document_id"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     tenant_id: Mapped[str] = mapped_column(String, nullable=False)
@@ -135,13 +153,51 @@ class Chunk(Base):
 
 
 class QueryLog(Base):
+    """
+    On Postgres the table is range-partitioned by month (partitions are managed in
+    app.query_stats), so created_at is part of the primary key, as in the migrations.
+    """
+
     __tablename__ = "query_logs"
+    __table_args__ = (
+        Index("ix_query_logs_tenant_created", "tenant_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     tenant_id: Mapped[str] = mapped_column(String, nullable=False)
     dataset_ids: Mapped[list | None] = mapped_column(JSON, nullable=True)
     query: Mapped[str] = mapped_column(Text, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    latency_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    hit_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rerank_applied: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    answered: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow)
+
+
+# a table created by create_all accepts rows until maintenance adds the monthly partitions
+event.listen(
+    QueryLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE query_logs_default PARTITION OF query_logs DEFAULT").execute_if(dialect="postgresql"),
+)
+
+
+class QueryStatsDaily(Base):
+    """Per-day query rollup maintained by the query log writer; dataset_id "*" is the tenant total."""
+
+    __tablename__ = "query_stats_daily"
+
+    tenant_id: Mapped[str] = mapped_column(String, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    dataset_id: Mapped[str] = mapped_column(String, primary_key=True)
+    query_count: Mapped[int] = mapped_column(Integer, default=0)
+    latency_count: Mapped[int] = mapped_column(Integer, default=0)
+    latency_sum_ms: Mapped[float] = mapped_column(Float, default=0.0)
+    latency_hist: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    latency_p50_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    latency_p95_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class Job(Base):
@@ -0,0 +1,124 @@
+import threading
+
+from app import tasks
+from app.background import BackgroundExecutor
+
+
+def test_executor_runs_jobs_off_the_caller_thread():
+    executor = BackgroundExecutor(workers=2, max_queued=10)
+    seen: list = []
+    done = threading.Event()
+
+    def job(value):
+        seen.append((value, threading.current_thread().name))
+        if len(seen) == 3:
+            done.set()
+
+    for i in range(3):
+        assert executor.submit(job, i)
+    assert done.wait(5)
+    executor.shutdown(timeout=5)
+    assert sorted(v for v, _ in seen) == [0, 1, 2]
+    assert all(name.startswith("raglite-bg-") for _, name in seen)
+
+
+def test_executor_rejects_when_queue_is_full():
+    executor = BackgroundExecutor(workers=1, max_queued=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    assert executor.submit(blocker)
+    assert started.wait(5)
+    assert executor.submit(blocker)  # fills the queue
+    assert not executor.submit(blocker)
+    release.set()
+    executor.shutdown(timeout=5)
+
+
+def test_background_mode_returns_before_the_job_runs(monkeypatch):
+    executor = BackgroundExecutor(workers=1, max_queued=10)
+    release = threading.Event()
+    ran = threading.Event()
+
+    def fake_ingest(**kwargs):
+        release.wait(5)
+        ran.set()
+
+    monkeypatch.setattr(tasks.settings, "task_execution", "background")
+    monkeypatch.setattr(tasks, "get_background_executor", lambda: executor)
+    monkeypatch.setattr(tasks, "_claim", lambda job_id: True)
+    monkeypatch.setattr(tasks.pipeline, "ingest_document", fake_ingest)
+
+    payload = {"job_id": "j1", "tenant_id": "t1", "dataset_id": "d1", "document_id": "doc1", "path": "/tmp/x"}
+    tasks.enqueue_ingest(payload)
+    assert not ran.is_set()
+    release.set()
+    assert ran.wait(5)
+    executor.shutdown(timeout=5)
+
+
+def test_unavailable_broker_falls_back_to_background(monkeypatch):
+    submitted: list = []
+
+    class Executor:
+        def submit(self, fn, run, payload):
+            submitted.append(payload)
+            return True
+
+    def broken_delay(payload):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(tasks.settings, "task_execution", "celery")
+    monkeypatch.setattr(tasks, "get_celery_app", lambda: object())
+    monkeypatch.setattr(tasks.worker_tasks.cleanup_datasets, "delay", broken_delay, raising=False)
+    monkeypatch.setattr(tasks, "get_background_executor", lambda: Executor())
+
+    tasks.enqueue_cleanup({"job_id": "j1", "tenant_id": "t1", "dataset_ids": ["d1"]})
+    assert submitted == [{"job_id": "j1", "tenant_id": "t1", "dataset_ids": ["d1"]}]
+
+
+def test_overflow_waits_as_pending_and_is_requeued_once(monkeypatch, tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from infra import models
+    from infra.db import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, future=True)
+    with session_factory() as db:
+        db.add_all([models.Job(id=f"j{i}", tenant_id="t1", type="cleanup", payload={"dataset_ids": [f"d{i}"]}) for i in range(3)])
+        db.commit()
+
+    release = threading.Event()
+    ran: list = []
+
+    def fake_cleanup(job_id, tenant_id, dataset_ids, purge_tenant=False):
+        release.wait(5)
+        ran.append(job_id)
+
+    executor = BackgroundExecutor(workers=1, max_queued=1)
+    monkeypatch.setattr(tasks.settings, "task_execution", "background")
+    monkeypatch.setattr(tasks, "SessionLocal", session_factory)
+    monkeypatch.setattr(tasks, "get_background_executor", lambda: executor)
+    monkeypatch.setattr(tasks.pipeline, "cleanup_datasets", fake_cleanup)
+
+    for i in range(3):  # j0 runs, j1 is queued, j2 does not fit
+        tasks.enqueue_cleanup({"job_id": f"j{i}", "tenant_id": "t1", "dataset_ids": [f"d{i}"]})
+    assert tasks._overflow.is_set()
+
+    executor._on_idle = tasks._drain_overflow
+    release.set()
+    for _ in range(50):
+        if len(ran) == 3:
+            break
+        threading.Event().wait(0.1)
+    executor.shutdown(timeout=5)
+
+    assert sorted(ran) == ["j0", "j1", "j2"]  # each exactly once, despite j1 also being rescanned
+    assert not tasks._overflow.is_set()
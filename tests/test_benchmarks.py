@@ -0,0 +1,52 @@
+import json
+import tempfile
+
+from benchmarks import stubs, suite
+from benchmarks.corpus import Corpus
+
+
+def _dump(*results):
+    paths = []
+    for result in results:
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as fh:
+            json.dump(result, fh)
+            paths.append(fh.name)
+    return paths
+
+
+def test_compare_flags_regressions_by_metric_direction():
+    baseline = {"metrics": {"ingest.batch.docs_per_s": 100.0, "query.p95_ms": 10.0, "query.errors": 0, "ingest.docs": 200}}
+    current = {"metrics": {"ingest.batch.docs_per_s": 85.0, "query.p95_ms": 10.5, "query.errors": 2, "ingest.docs": 400}}
+
+    rows = {row["metric"]: row for row in suite.compare(baseline, current, threshold=0.10)}
+
+    assert rows["ingest.batch.docs_per_s"]["regression"]  # throughput fell 15%
+    assert not rows["query.p95_ms"]["regression"]  # within the threshold
+    assert rows["query.errors"]["regression"]
+    assert not rows["ingest.docs"]["regression"]  # informational
+    assert suite.main(["compare", *_dump(baseline, current)]) == 1
+
+
+def test_percentiles_use_nearest_rank():
+    samples = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+    assert suite.percentiles(samples) == {"p50_ms": 50.0, "p95_ms": 95.0, "p99_ms": 99.0}
+    assert suite.percentiles([]) == {}
+
+
+def test_corpus_is_deterministic_and_stub_store_ranks_similar_text_first():
+    docs = Corpus(seed=3).documents(3, 1.0)
+    assert docs == Corpus(seed=3).documents(3, 1.0)
+    assert len(Corpus(seed=3).queries(5)) == 5
+
+    store = stubs.InMemoryVectorStore()
+    texts = [text for _, text in docs]
+    store.upsert(
+        "t1",
+        "ds1",
+        [{"id": f"c{i}", "vector": vec, "payload": {"document_id": f"d{i}", "text": text}} for i, (vec, text) in enumerate(zip(stubs.hash_embed(texts), texts))],
+    )
+    hits = store.query("t1", ["ds1"], stubs.hash_embed([texts[1]])[0], k=2)
+    assert hits[0]["id"] == "c1" and len(hits) == 2
+
+    store.delete_document("t1", "ds1", "d1")
+    assert "c1" not in [h["id"] for h in store.query("t1", ["ds1"], stubs.hash_embed([texts[1]])[0], k=3)]
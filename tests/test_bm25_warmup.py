@@ -0,0 +1,151 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import bm25_warmup
+from core.bm25_memory import MemoryBM25
+from infra import models
+from infra.db import Base
+
+
+def _item(chunk_id: str, text: str, document_id: str = "doc1") -> dict:
+    return {"id": chunk_id, "text": text, "payload": {"document_id": document_id, "text": text}}
+
+
+def test_datasets_load_on_first_search_only():
+    calls: list = []
+
+    def loader(tenant_id, dataset_id):
+        calls.append((tenant_id, dataset_id))
+        yield {"id": "c1", "text": "alpha beta", "document_id": "doc1"}
+        yield {"id": "c2", "text": "gamma delta", "document_id": "doc2"}
+        yield {"id": "c3", "text": "epsilon zeta", "document_id": "doc2"}
+
+    index = MemoryBM25(loader=loader)
+    assert not index.is_loaded("t1", "d1")
+    hits = index.search("t1", ["d1"], "gamma", k=1)
+    index.search("t1", ["d1"], "alpha", k=1)
+
+    assert calls == [("t1", "d1")]
+    assert hits[0]["id"] == "c2" and hits[0]["payload"]["dataset_id"] == "d1"
+
+
+def test_index_documents_adds_to_existing_chunks():
+    index = MemoryBM25()
+    index.index_documents("t1", "d1", [_item("c1", "alpha beta", "doc1")])
+    index.index_documents("t1", "d1", [_item("c2", "gamma delta", "doc2"), _item("c3", "epsilon", "doc2")])
+    assert {p["id"] for p in index.payloads[("t1", "d1")]} == {"c1", "c2", "c3"}
+
+    index.delete_document("t1", "d1", "doc2")
+    assert [p["id"] for p in index.payloads[("t1", "d1")]] == ["c1"]
+
+
+def test_persistent_backends_skip_warmup(monkeypatch):
+    monkeypatch.setattr(bm25_warmup, "status", bm25_warmup.WarmupStatus())
+    status = bm25_warmup.start(object())
+    assert status.backend == "opensearch" and status.state == "skipped" and status.ready
+
+
+def test_background_warmup_streams_every_dataset(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bm25.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+    db = factory()
+    db.add(models.Tenant(id="t1", name="t1"))
+    db.add_all([models.Dataset(id=f"d{i}", tenant_id="t1", name=f"d{i}") for i in range(3)])
+    db.add_all([models.Document(id=f"doc{i}", tenant_id="t1", dataset_id=f"d{i}") for i in range(3)])
+    db.add_all(
+        [models.Chunk(id=f"c{i}{j}", tenant_id="t1", dataset_id=f"d{i}", document_id=f"doc{i}", text=f"chunk {j}") for i in range(3) for j in range(5)]
+    )
+    db.commit()
+    db.close()
+    monkeypatch.setattr(bm25_warmup, "SessionLocal", factory)
+    monkeypatch.setattr(bm25_warmup, "status", bm25_warmup.WarmupStatus(mode="background"))
+    monkeypatch.setattr(bm25_warmup.settings, "bm25_warmup_page_size", 2)
+
+    index = MemoryBM25()
+    index.set_loader(bm25_warmup.iter_dataset_chunks)
+    assert not bm25_warmup.status.ready
+    bm25_warmup._warm_all(index)
+
+    assert bm25_warmup.status.ready
+    assert bm25_warmup.status.datasets_loaded == 3
+    assert all(len(index.payloads[("t1", f"d{i}")]) == 5 for i in range(3))
+    assert bm25_warmup.count_dataset_chunks("t1", "d1") == 5
+
+
+def test_snapshot_scores_match_in_memory_index(tmp_path):
+    chunks = [
+        {"id": "c1", "text": "alpha beta beta", "document_id": "doc1", "meta": {"page": 1}},
+        {"id": "c2", "text": "gamma delta alpha", "document_id": "doc2"},
+        {"id": "c3", "text": "epsilon zeta eta theta", "document_id": "doc3"},
+        {"id": "c4", "text": "beta gamma", "document_id": "doc4"},
+    ]
+    in_memory = MemoryBM25()
+    in_memory.rebuild_from_chunks("t1", "d1", chunks)
+    snapshotted = MemoryBM25(snapshot_dir=str(tmp_path))
+    snapshotted.rebuild_from_chunks("t1", "d1", chunks)
+
+    assert (tmp_path / "t1" / "d1.bm25").exists()
+    assert ("t1", "d1") not in snapshotted.payloads
+    for query in ("beta", "alpha gamma", "alpha alpha zeta", "missing"):
+        expected = in_memory.search("t1", ["d1"], query, k=3)
+        got = snapshotted.search("t1", ["d1"], query, k=3)
+        assert [h["id"] for h in got] == [h["id"] for h in expected]
+        assert [h["score"] for h in got] == pytest.approx([h["score"] for h in expected])
+        assert got[0]["payload"] == expected[0]["payload"]
+
+
+def test_snapshot_is_shared_and_reloaded_without_the_database(tmp_path):
+    def loader(tenant_id, dataset_id):
+        yield {"id": "c1", "text": "alpha beta", "document_id": "doc1"}
+        yield {"id": "c2", "text": "gamma delta", "document_id": "doc2"}
+        yield {"id": "c3", "text": "epsilon zeta", "document_id": "doc2"}
+
+    writer = MemoryBM25(loader=loader, snapshot_dir=str(tmp_path))
+    assert writer.ensure_loaded("t1", "d1")
+
+    def no_database(tenant_id, dataset_id):
+        raise AssertionError("restart should reopen the snapshot")
+
+    reader = MemoryBM25(loader=no_database, snapshot_dir=str(tmp_path))
+    assert reader.search("t1", ["d1"], "gamma", k=1)[0]["id"] == "c2"
+
+    # an update in one process replaces the file; the other picks it up on its next search
+    writer.index_documents("t1", "d1", [_item("c4", "omega gamma gamma", "doc3")])
+    assert reader.search("t1", ["d1"], "omega", k=1)[0]["id"] == "c4"
+    writer.delete_document("t1", "d1", "doc2")
+    assert {h["id"] for h in reader.search("t1", ["d1"], "gamma", k=10)} == {"c1", "c4"}
+
+    writer.delete_dataset("t1", "d1")
+    assert not (tmp_path / "t1" / "d1.bm25").exists()
+    assert reader.search("t1", ["d1"], "gamma", k=1) == []
+
+
+def test_stale_snapshot_is_rebuilt_from_the_database(tmp_path):
+    rows = [{"id": "c1", "text": "alpha beta", "document_id": "doc1"}, {"id": "c2", "text": "gamma", "document_id": "doc2"}]
+    loads: list = []
+
+    def loader(tenant_id, dataset_id):
+        loads.append(dataset_id)
+        return iter(rows)
+
+    MemoryBM25(loader=loader, snapshot_dir=str(tmp_path)).ensure_loaded("t1", "d1")
+    fresh = MemoryBM25(loader=loader, snapshot_dir=str(tmp_path), counter=lambda t, d: len(rows))
+    fresh.ensure_loaded("t1", "d1")
+    assert loads == ["d1"]  # the snapshot still matches
+
+    # doc2 was deleted while no process had the dataset loaded
+    rows.pop()
+    restarted = MemoryBM25(loader=loader, snapshot_dir=str(tmp_path), counter=lambda t, d: len(rows))
+    assert [h["id"] for h in restarted.search("t1", ["d1"], "gamma", k=5)] == ["c1"]
+    assert loads == ["d1", "d1"]
+
+
+def test_partial_updates_are_not_snapshotted(tmp_path):
+    index = MemoryBM25(snapshot_dir=str(tmp_path))
+    index.index_documents("t1", "d1", [_item("c1", "alpha beta", "doc1")])
+    # without a loader the dataset is incomplete, so it stays in process memory
+    assert not (tmp_path / "t1" / "d1.bm25").exists()
+    assert index.search("t1", ["d1"], "alpha", k=1)[0]["id"] == "c1"
+    assert index.search("t1", ["../x"], "alpha", k=1) == []
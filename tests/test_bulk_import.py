@@ -0,0 +1,266 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import services
+from core import storage
+from infra import models
+from infra.db import Base
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_bulk_import_dedups_and_batches(db_session, monkeypatch):
+    db_session.add(models.Tenant(id="t1", name="t1"))
+    dataset = models.Dataset(id="d1", tenant_id="t1", name="ds", embedder="e")
+    db_session.add(dataset)
+    db_session.add(models.Document(id="old", tenant_id="t1", dataset_id="d1", content_hash="a" * 64, status="succeeded"))
+    db_session.commit()
+    enqueued: list[dict] = []
+    monkeypatch.setattr(services.tasks, "enqueue_ingest_batch", enqueued.append)
+    monkeypatch.setattr(services.settings, "bulk_ingest_batch_size", 2)
+
+    items = [{"source_uri": f"https://example.com/{i}.txt", "content_hash": h} for i, h in enumerate(["a" * 64, "b" * 64, "b" * 64, None, None])]
+    resp = services.create_bulk_import(db_session, "t1", dataset, items)
+
+    assert resp.accepted == 3
+    assert resp.duplicates == 2
+    assert len(resp.job_ids) == 2
+    assert [len(p["document_ids"]) for p in enqueued] == [2, 1]
+    assert db_session.query(models.Document).filter(models.Document.status == "pending").count() == 3
+    assert db_session.query(models.Job).count() == 2
+
+
+def test_import_s3_path_is_scoped_to_tenant(monkeypatch):
+    monkeypatch.setattr(storage.settings, "s3_bucket", "bucket")
+    monkeypatch.setattr(storage.settings, "s3_prefix", "raglite")
+
+    assert storage.import_s3_path("t1", "raglite/imports/t1/a.pdf") == "s3://bucket/raglite/imports/t1/a.pdf"
+    for key in ["raglite/imports/t2/a.pdf", "raglite/imports/t1/../t2/a.pdf", "s3://other/raglite/imports/t1/a.pdf"]:
+        with pytest.raises(ValueError):
+            storage.import_s3_path("t1", key)
+
+
+def test_small_documents_share_embedding_batches(db_session, monkeypatch, tmp_path):
+    from core import pipeline
+
+    db_session.add(models.Tenant(id="t1", name="t1"))
+    db_session.add(models.Dataset(id="d1", tenant_id="t1", name="ds", embedder="e"))
+    docs = []
+    for i in range(3):
+        path = tmp_path / f"{i}.txt"
+        path.write_text(f"small document number {i}")
+        docs.append(
+            models.Document(
+                id=f"doc{i}", tenant_id="t1", dataset_id="d1", path=str(path), mime_type="text/plain", language="en"
+            )
+        )
+    docs.append(
+        models.Document(id="bad", tenant_id="t1", dataset_id="d1", path=str(tmp_path / "missing.txt"), mime_type="text/plain")
+    )
+    db_session.add_all(docs)
+    db_session.commit()
+
+    calls: list = []
+    upserts: list = []
+    monkeypatch.setattr(pipeline.parse_pool, "get_parse_pool", lambda: None)
+    monkeypatch.setattr(pipeline.embedder_module, "embed_texts", lambda texts, model_name=None: calls.append(texts) or [[0.0]] * len(texts))
+    store = SimpleNamespace(upsert=lambda tenant_id, dataset_id, points: upserts.append(points))
+    monkeypatch.setattr(pipeline.providers, "vector_store", lambda: store)
+    monkeypatch.setattr(pipeline.providers, "bm25_client", lambda: None)
+    monkeypatch.setattr(pipeline.settings, "chunk_strategy", "sliding_window")
+    observed = {stage: pipeline.INGEST_STAGE_SECONDS.count(stage=stage) for stage in ["fetch", "parse", "embed", "upsert"]}
+
+    failed = pipeline._ingest_small_documents(db_session, "t1", "d1", docs)
+
+    assert failed == ["bad"]
+    # per-document stages for each parsed file, shared embed/upsert split between them
+    assert all(pipeline.INGEST_STAGE_SECONDS.count(stage=stage) == n + 3 for stage, n in observed.items())
+    assert len(calls) == 1 and len(calls[0]) == 3
+    assert {p["payload"]["document_id"] for p in upserts[0]} == {"doc0", "doc1", "doc2"}
+    assert db_session.query(models.Chunk).count() == 3
+    assert [d.status for d in docs] == ["succeeded"] * 3 + ["failed"]
+
+
+def test_s3_import_without_hash_is_hashed_and_deduplicated(db_session, monkeypatch):
+    from core import pipeline
+
+    db_session.add(models.Dataset(id="d1", tenant_id="t1", name="ds", embedder="e"))
+    db_session.add(models.Document(id="old", tenant_id="t1", dataset_id="d1", content_hash="a" * 64, status="succeeded"))
+    new = models.Document(id="new", tenant_id="t1", dataset_id="d1", path="s3://bucket/imports/t1/b.txt")
+    dup = models.Document(id="dup", tenant_id="t1", dataset_id="d1", path="s3://bucket/imports/t1/a.txt")
+    db_session.add_all([new, dup])
+    db_session.commit()
+    digests = {new.path: (5, "b" * 64), dup.path: (7, "a" * 64)}
+    monkeypatch.setattr(pipeline.storage, "fetch_object_digest", lambda path, max_bytes: digests[path])
+
+    assert pipeline._check_import(db_session, new)
+    assert (new.content_hash, new.size_bytes) == ("b" * 64, 5)
+    assert not pipeline._check_import(db_session, dup)
+    assert dup.status == "duplicate" and dup.deleted_at is not None
+
+
+def test_s3_import_size_is_checked_before_download(db_session, monkeypatch):
+    from core import pipeline
+
+    class Client:
+        def head_object(self, Bucket, Key):
+            return {"ContentLength": sizes[Key]}
+
+        def download_file(self, *args, **kwargs):
+            raise AssertionError("oversized objects must not be downloaded")
+
+    sizes = {"imports/t1/big.txt": 3 * 1024 * 1024, "imports/t1/hashed.txt": 10}
+    monkeypatch.setattr(storage, "_s3_client", lambda: Client())
+    monkeypatch.setattr(pipeline.settings, "max_file_size_mb", 2)
+    # the manifest declared small sizes; only the object store knows the real ones
+    big = models.Document(id="big", tenant_id="t1", dataset_id="d1", path="s3://bucket/imports/t1/big.txt", size_bytes=1)
+    hashed = models.Document(
+        id="hashed", tenant_id="t1", dataset_id="d1", path="s3://bucket/imports/t1/hashed.txt", size_bytes=1, content_hash="c" * 64
+    )
+    db_session.add_all([big, hashed])
+    db_session.commit()
+
+    with pytest.raises(storage.FileTooLarge):
+        pipeline._check_import(db_session, big)
+    assert pipeline._check_import(db_session, hashed)
+    assert hashed.size_bytes == 10
+
+
+def test_unreferenced_paths_ignores_objects_still_in_use(db_session):
+    from app.dedup import unreferenced_paths
+
+    db_session.add(models.Dataset(id="live", tenant_id="t1", name="live"))
+    db_session.add(models.Dataset(id="gone", tenant_id="t1", name="gone", deleted_at=datetime.utcnow()))
+    db_session.add_all(
+        [
+            models.Document(id="a", tenant_id="t1", dataset_id="live", path="s3://b/imports/t1/shared"),
+            models.Document(id="b", tenant_id="t1", dataset_id="gone", path="s3://b/imports/t1/shared"),
+            models.Document(id="c", tenant_id="t1", dataset_id="gone", path="s3://b/imports/t1/only"),
+            models.Document(id="d", tenant_id="t1", dataset_id="live", path="s3://b/imports/t1/deleted", deleted_at=datetime.utcnow()),
+        ]
+    )
+    db_session.commit()
+
+    paths = ["s3://b/imports/t1/shared", "s3://b/imports/t1/only", "s3://b/imports/t1/deleted"]
+    assert unreferenced_paths(db_session, "t1", paths) == ["s3://b/imports/t1/only", "s3://b/imports/t1/deleted"]
+
+
+def test_small_document_fallback_skips_documents_that_failed_to_parse(db_session, monkeypatch, tmp_path):
+    from core import pipeline
+
+    db_session.add(models.Dataset(id="d1", tenant_id="t1", name="ds", embedder="e"))
+    good = tmp_path / "good.txt"
+    good.write_text("fine")
+    db_session.add_all(
+        [
+            models.Document(id="good", tenant_id="t1", dataset_id="d1", path=str(good), mime_type="text/plain", size_bytes=4),
+            models.Document(id="bad", tenant_id="t1", dataset_id="d1", path=str(tmp_path / "missing"), mime_type="text/plain", size_bytes=4),
+        ]
+    )
+    db_session.add(models.Job(id="j1", tenant_id="t1", type="ingest"))
+    db_session.commit()
+
+    retried: list = []
+    monkeypatch.setattr(pipeline, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(pipeline.parse_pool, "get_parse_pool", lambda: None)
+    monkeypatch.setattr(pipeline.providers, "vector_store", lambda: SimpleNamespace())
+    monkeypatch.setattr(pipeline.providers, "bm25_client", lambda: None)
+    monkeypatch.setattr(pipeline.embedder_module, "embed_texts", lambda texts, model_name=None: 1 / 0)
+    monkeypatch.setattr(pipeline, "ingest_document", lambda job_id, tenant_id, dataset_id, doc_id, *a: retried.append(doc_id))
+
+    pipeline.ingest_batch("j1", "t1", "d1", ["good", "bad"])
+
+    assert retried == ["good"]
+    job = db_session.get(models.Job, "j1")
+    assert job.payload["failed"] == ["bad"]
+    assert db_session.get(models.Document, "bad").status == "failed"
+
+
+def test_batch_updates_bm25_once(db_session, monkeypatch, tmp_path):
+    from core import pipeline
+
+    db_session.add(models.Dataset(id="d1", tenant_id="t1", name="ds", embedder="e"))
+    for name in ["a", "b"]:
+        (tmp_path / f"{name}.txt").write_text(f"text of {name}")
+        db_session.add(models.Document(id=name, tenant_id="t1", dataset_id="d1", path=str(tmp_path / f"{name}.txt"), mime_type="text/plain", size_bytes=9))
+    db_session.add(models.Document(id="big", tenant_id="t1", dataset_id="d1", path="big.pdf", size_bytes=10**9))
+    db_session.add(models.Job(id="j1", tenant_id="t1", type="ingest"))
+    db_session.commit()
+
+    def fake_ingest(job_id, tenant_id, dataset_id, doc_id, path, mime_type, embedder=None, bm25_items=None, batch_warnings=None):
+        bm25_items.append({"id": "big-c1", "text": "big", "payload": {}})
+
+    calls: list = []
+    bm25 = SimpleNamespace(index_documents=lambda tenant_id, dataset_id, items: calls.append([i["id"] for i in items]))
+    monkeypatch.setattr(pipeline, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(pipeline.parse_pool, "get_parse_pool", lambda: None)
+    monkeypatch.setattr(pipeline.providers, "vector_store", lambda: SimpleNamespace(upsert=lambda *a: None))
+    monkeypatch.setattr(pipeline.providers, "bm25_client", lambda: bm25)
+    monkeypatch.setattr(pipeline.embedder_module, "embed_texts", lambda texts, model_name=None: [[0.0] for _ in texts])
+    monkeypatch.setattr(pipeline, "ingest_document", fake_ingest)
+
+    pipeline.ingest_batch("j1", "t1", "d1", ["a", "b", "big"])
+
+    assert len(calls) == 1 and len(calls[0]) == 3 and "big-c1" in calls[0]
+    assert db_session.get(models.Job, "j1").status == models.JobStatus.succeeded.value
+
+
+def test_reindex_updates_bm25_once(db_session, monkeypatch):
+    from core import pipeline
+
+    db_session.add_all([models.Document(id=f"doc{i}", tenant_id="t1", dataset_id="d1", path=f"{i}.txt") for i in range(3)])
+    db_session.add(models.Job(id="j1", tenant_id="t1", type="reindex"))
+    db_session.commit()
+
+    def fake_ingest(job_id, tenant_id, dataset_id, doc_id, path, mime_type, embedder=None, bm25_items=None, batch_warnings=None):
+        bm25_items.append({"id": f"{doc_id}-c1", "text": "x", "payload": {"document_id": doc_id}})
+
+    calls: list = []
+    bm25 = SimpleNamespace(delete_dataset=lambda *a: None, index_documents=lambda tenant_id, dataset_id, items: calls.append(len(items)))
+    monkeypatch.setattr(pipeline, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(pipeline.providers, "vector_store", lambda: SimpleNamespace(delete_dataset=lambda *a: None))
+    monkeypatch.setattr(pipeline.providers, "bm25_client", lambda: bm25)
+    monkeypatch.setattr(pipeline, "ingest_document", fake_ingest)
+
+    pipeline.reindex_dataset("j1", "t1", "d1", None)
+
+    assert calls == [3]
+
+
+def test_batch_reports_parse_warnings_of_small_documents(db_session, monkeypatch, tmp_path):
+    from core import pipeline
+
+    db_session.add(models.Dataset(id="d1", tenant_id="t1", name="ds", embedder="e"))
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4\n")
+    db_session.add(models.Document(id="a", tenant_id="t1", dataset_id="d1", path=str(tmp_path / "a.pdf"), size_bytes=9))
+    db_session.add(models.Job(id="j1", tenant_id="t1", type="ingest"))
+    db_session.commit()
+
+    def fake_pages(path, mime_type, keep_headings=False, warnings=None, fmt=None):
+        warnings.append("Pages 3-4 skipped: exceeded 1s")
+        yield 1, "page one"
+
+    monkeypatch.setattr(pipeline, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(pipeline.parse_pool, "parse_pages", fake_pages)
+    monkeypatch.setattr(pipeline.providers, "vector_store", lambda: SimpleNamespace(upsert=lambda *a: None))
+    monkeypatch.setattr(pipeline.providers, "bm25_client", lambda: None)
+    monkeypatch.setattr(pipeline.embedder_module, "embed_texts", lambda texts, model_name=None: [[0.0] for _ in texts])
+
+    pipeline.ingest_batch("j1", "t1", "d1", ["a"])
+
+    job = db_session.get(models.Job, "j1")
+    assert job.status == models.JobStatus.succeeded.value
+    assert job.payload["warnings"] == ["a: Pages 3-4 skipped: exceeded 1s"]
@@ -0,0 +1,62 @@
+import pytest
+
+from core import chunker
+
+
+def test_token_window_counts_cjk_characters_and_keeps_exact_offsets():
+    text = "中文没有空格的句子。" * 4
+
+    chunks = chunker.chunk_text(text, "token", chunk_size=12, overlap=2)
+
+    assert len(chunks) > 1
+    for start, end, chunk in chunks:
+        assert text[start:end] == chunk
+        assert chunker.RegexTokenizer().count(chunk) <= 12
+
+
+def test_sentence_window_does_not_cut_sentences():
+    text = "One two three. Four five six.\n\nSeven eight nine ten."
+
+    chunks = chunker.chunk_text(text, "sentence", chunk_size=7, overlap=0)
+
+    assert [c[2] for c in chunks] == ["One two three. Four five six.", "Seven eight nine ten."]
+
+
+def test_markdown_sections_split_on_headings():
+    text = "# A\nalpha beta.\n\n## B\ngamma **delta**.\n\n- item"
+
+    chunks = chunker.chunk_text(text, "markdown", chunk_size=100, overlap=0, strip_markup=True)
+
+    assert [c[2] for c in chunks] == ["A\nalpha beta.", "B\ngamma delta.\n\nitem"]
+    assert text[chunks[1][0] : chunks[1][1]].startswith("## B")
+
+
+def test_plain_text_keeps_markup_characters():
+    text = "Use snake_case and *args here.\n- not a list in a log line\n1. literal"
+
+    chunks = chunker.chunk_text(text, "markdown", chunk_size=100, overlap=0)
+
+    assert [c[2] for c in chunks] == [text]
+
+
+def test_unknown_strategy_raises():
+    with pytest.raises(ValueError, match="nope"):
+        chunker.get_chunker("nope")
+
+
+def test_chunk_stream_matches_whole_text_and_tracks_pages():
+    pages = [(n, " ".join(f"p{n}w{i}." for i in range(30))) for n in range(1, 4)]
+    full = "\n".join(text for _, text in pages)
+
+    streamed = list(chunker.chunk_stream(iter(pages), "token", chunk_size=16, overlap=4))
+
+    assert [c[:3] for c in streamed] == chunker.chunk_text(full, "token", chunk_size=16, overlap=4)
+    assert streamed[0][3:] == (1, 1)
+    assert streamed[-1][3:] == (3, 3)
+    assert any(first != last for _, _, _, first, last in streamed)
+
+
+def test_sliding_window_offsets_point_at_source_text():
+    chunks = chunker.sliding_window("a b  c d e f g", chunk_size=3, overlap=1)
+
+    assert chunks == [(0, 6, "a b c"), (5, 10, "c d e"), (9, 14, "e f g")]
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from core.file_cache import LocalFileCache
+
+
+def _key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _writer(data: bytes, calls: list):
+    def fill(dest: str) -> None:
+        calls.append(dest)
+        Path(dest).write_bytes(data)
+
+    return fill
+
+
+def test_checkout_downloads_once_and_is_not_evicted_while_in_use(tmp_path):
+    cache = LocalFileCache(str(tmp_path), max_bytes=10)
+    data = b"0123456789"
+    calls: list = []
+
+    path, cleanup = cache.checkout(_key(data), _writer(data, calls), suffix=".pdf")
+    again, cleanup_again = cache.checkout(_key(data), _writer(data, calls), suffix=".pdf")
+    assert len(calls) == 1
+    assert path.endswith(".pdf") and path != again
+
+    other = b"abcdefghij"
+    os.utime(cache.get(_key(data)), (1000, 1000))
+    cache.put(_key(other), _writer(other, calls))  # over budget, but the entry is checked out
+    assert cache.get(_key(data)) is not None
+    cleanup()
+    cleanup_again()
+    assert not Path(path).exists()
+
+    os.utime(cache._entry(_key(data)), (1000, 1000))
+    cache.evict()
+    assert not cache._entry(_key(data)).exists()
+    assert not Path(f"{cache._entry(_key(data))}.lock").exists()
+    assert cache.get(_key(other)) is not None
+
+
+def test_orphaned_links_count_against_budget_and_are_swept(tmp_path):
+    cache = LocalFileCache(str(tmp_path), max_bytes=25)
+    blob = b"x" * 10
+    cache.put(_key(blob), _writer(blob, []))
+    dead = tmp_path / "tmp" / str(2**22 + 1)  # above pid_max, never a live process
+    dead.mkdir()
+    (dead / "link").write_bytes(b"y" * 10)  # a link whose entry was already evicted
+    (tmp_path / "tmp" / "stray").write_bytes(b"z")
+
+    newer = b"n" * 10
+    os.utime(cache._entry(_key(blob)), (1000, 1000))
+    cache.put(_key(newer), _writer(newer, []))  # 30 bytes on disk counting the orphan
+    assert cache.get(_key(blob)) is None
+
+    LocalFileCache(str(tmp_path), max_bytes=25)  # restart
+    assert sorted(p.name for p in (tmp_path / "tmp").iterdir()) == [str(os.getpid())]
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = LocalFileCache(str(tmp_path), max_bytes=25)
+    blobs = [bytes([65 + i]) * 10 for i in range(3)]
+    for i, blob in enumerate(blobs[:2]):
+        entry = cache.put(_key(blob), _writer(blob, []))
+        os.utime(entry, (1000 + i, 1000 + i))
+    cache.get(_key(blobs[0]))  # touch: blobs[1] is now the oldest
+    cache.put(_key(blobs[2]), _writer(blobs[2], []))
+
+    assert cache.get(_key(blobs[0])) is not None
+    assert cache.get(_key(blobs[1])) is None
+    assert cache.get(_key(blobs[2])) is not None
+
+
+def test_put_rejects_content_hash_mismatch(tmp_path):
+    cache = LocalFileCache(str(tmp_path), max_bytes=100)
+    with pytest.raises(ValueError):
+        cache.put(_key(b"expected"), _writer(b"corrupted", []))
+    assert cache.get(_key(b"expected")) is None
+    assert [p for p in (tmp_path / "tmp").rglob("*") if p.is_file()] == []
+
+
+def test_concurrent_checkouts_populate_once(tmp_path):
+    cache = LocalFileCache(str(tmp_path), max_bytes=1000)
+    data = b"shared" * 10
+    calls: list = []
+    results: list = []
+
+    def worker():
+        results.append(cache.checkout(_key(data), _writer(data, calls)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(Path(p).read_bytes() == data for p, _ in results)
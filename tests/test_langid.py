@@ -0,0 +1,34 @@
+from core import langid
+
+
+def test_sample_windows_spread_over_long_text():
+    text = " ".join(f"w{i:05d}" for i in range(3000))
+    windows = langid.sample_windows(text, windows=3, window_chars=200)
+    assert len(windows) == 3
+    assert windows[0].startswith("w00000")
+    assert windows[-1].split()[-1] in text[-220:]
+    assert all(len(w) <= 200 and not w.startswith(" ") for w in windows)
+    assert langid.sample_windows("short text", windows=3, window_chars=200) == ["short text"]
+
+
+def test_detect_uses_script_without_statistical_model(monkeypatch):
+    def fail(_text):
+        raise AssertionError("statistical model should not run")
+
+    monkeypatch.setattr(langid, "_detect_statistical", fail)
+    assert langid.detect("한국어 문서입니다. 검색 증강 생성") == "ko"
+    assert langid.detect("これは日本語の文書です。検索拡張生成") == "ja"
+    assert langid.detect("   ") is None
+
+
+def test_chunk_language_inherits_document_language(monkeypatch):
+    monkeypatch.setattr(langid, "_detect_statistical", lambda text: "ru")
+    assert langid.chunk_language("The retriever returns chunks.", "en") == "en"
+    assert langid.chunk_language("Поиск по документам", "en") == "ru"
+    assert langid.chunk_language("Ελληνικό κείμενο", "en") == "el"
+    assert langid.chunk_language("12345 !!!", "en") == "en"
+
+
+def test_majority_weights_tags():
+    assert langid.majority([("en", 10), ("de", 30), (None, 100), ("en", 5)]) == "de"
+    assert langid.majority([]) is None
@@ -0,0 +1,45 @@
+import pytest
+import requests
+
+from benchmarks import loadtest
+
+
+def test_parse_mix_normalizes_weights_and_rejects_unknown_operations():
+    assert loadtest.parse_mix("query=3,upload=1,list=0") == {"query": 0.75, "upload": 0.25}
+    with pytest.raises(ValueError):
+        loadtest.parse_mix("query=1,delete=1")
+    with pytest.raises(ValueError):
+        loadtest.parse_mix("query=0")
+
+
+def test_recorder_summarizes_latency_errors_and_drops():
+    recorder = loadtest.Recorder(interval=60)
+    for ms in range(1, 11):
+        recorder.record("query", ms / 1000)
+    recorder.record("query", None, "503")
+    recorder.record("upload", None, "ReadTimeout")
+    recorder.record("upload", None, "dropped")
+
+    summary = recorder.summary(elapsed=2.0)
+    query = summary["operations"]["query"]
+    assert (query["ok"], query["errors"], query["p50_ms"], query["p95_ms"]) == (10, 1, 5.0, 10.0)
+    assert query["throughput_per_s"] == 5.0 and query["error_kinds"] == {"503": 1}
+    assert summary["operations"]["upload"]["error_rate"] == 1.0
+    assert (summary["ok"], summary["errors"], summary["dropped"]) == (10, 2, 1)
+    assert recorder.window_report(0)["ok"] == 10
+
+
+def test_stub_model_server_speaks_the_embedding_rerank_and_chat_formats():
+    server = loadtest.serve_stub_models("127.0.0.1", 0, dim=16)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        emb = requests.post(f"{base}/v1/embeddings", json={"input": ["a b", "c"], "model": "m"}, timeout=5).json()
+        assert [len(item["embedding"]) for item in emb["data"]] == [16, 16]
+
+        ranked = requests.post(f"{base}/v1/rerank", json={"query": "red fox", "documents": ["blue sky", "red fox jumps"], "top_n": 1}, timeout=5).json()
+        assert ranked["results"] == [{"index": 1, "relevance_score": 1.0}]
+
+        chat = requests.post(f"{base}/v1/chat/completions", json={"messages": [{"role": "user", "content": "hi"}]}, timeout=5).json()
+        assert chat["choices"][0]["message"]["content"]
+    finally:
+        server.shutdown()
@@ -0,0 +1,79 @@
+import pytest
+
+from core import metrics
+from core.pipeline import _timed
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    hist = registry.register(metrics.Histogram("t_stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0)))
+    hist.observe(0.05, stage="embed")
+    hist.observe(0.5, stage="embed")
+    hist.observe(3.0, stage="embed")
+
+    text = registry.render()
+    assert "# TYPE t_stage_seconds histogram" in text
+    assert 't_stage_seconds_bucket{stage="embed",le="0.1"} 1' in text
+    assert 't_stage_seconds_bucket{stage="embed",le="1"} 2' in text
+    assert 't_stage_seconds_bucket{stage="embed",le="+Inf"} 3' in text
+    assert 't_stage_seconds_sum{stage="embed"} 3.55' in text
+    assert 't_stage_seconds_count{stage="embed"} 3' in text
+
+
+def test_counters_gauges_and_label_checks():
+    registry = metrics.Registry()
+    hits = registry.register(metrics.Counter("t_cache_requests", "Lookups", ("cache", "result")))
+    registry.register(metrics.Gauge("t_pending", "Queued", fn=lambda: 7))
+    hits.inc(cache="rewrite", result="hit")
+    hits.inc(2, cache="rewrite", result="hit")
+
+    text = registry.render()
+    assert "# TYPE t_cache_requests_total counter" in text
+    assert 't_cache_requests_total{cache="rewrite",result="hit"} 3' in text
+    assert "t_pending 7" in text
+    with pytest.raises(ValueError):
+        hits.inc(cache="rewrite")
+    # re-registering (module imported twice) returns the existing metric
+    assert registry.register(metrics.Counter("t_cache_requests", "Lookups", ("cache", "result"))) is hits
+
+
+def test_timer_as_context_manager_and_decorator():
+    hist = metrics.Histogram("t_calls_seconds", "Calls", ("kind",))
+
+    @hist.time(kind="lookup")
+    def lookup(x):
+        return x * 2
+
+    with hist.time(kind="block"):
+        pass
+    assert lookup(2) == 4 and lookup(3) == 6
+    assert hist.count(kind="lookup") == 2 and hist.count(kind="block") == 1
+
+
+def test_timed_iterator_accumulates_producer_time():
+    timings: dict = {}
+    assert list(_timed(iter([1, 2, 3]), timings, "parse")) == [1, 2, 3]
+    assert timings["parse"] >= 0
+
+
+def test_metrics_endpoint_exposes_registered_metrics():
+    from app import main
+
+    response = main.prometheus_metrics()
+    body = response.body.decode()
+    assert response.media_type == metrics.CONTENT_TYPE
+    assert "# TYPE raglite_query_stage_seconds histogram" in body
+    assert "raglite_background_jobs_pending" in body
+
+
+def test_http_server_serves_the_registry():
+    from urllib.request import urlopen
+
+    server = metrics.start_http_server(0, host="127.0.0.1")
+    try:
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == metrics.CONTENT_TYPE
+            assert "raglite_cache_requests_total" in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import pagination, services
+from infra import models
+from infra.db import Base
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_cursor_pages_cover_every_document_once(db_session):
+    base = datetime(2026, 1, 1)
+    # pairs share a timestamp so the id tiebreak is exercised
+    db_session.add_all(
+        models.Document(id=f"doc{i:02d}", tenant_id="t1", dataset_id="d1", created_at=base + timedelta(minutes=i // 2))
+        for i in range(11)
+    )
+    db_session.add(models.Document(id="gone", tenant_id="t1", dataset_id="d1", created_at=base, deleted_at=base))
+    db_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        resp = services.list_documents(db_session, "t1", "d1", page_size=4, cursor=cursor, include_total=False)
+        seen += [d.id for d in resp.items]
+        assert resp.total is None
+        cursor = resp.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == sorted((f"doc{i:02d}" for i in range(11)), key=lambda d: (int(d[3:]) // 2, d), reverse=True)
+    first = services.list_documents(db_session, "t1", "d1", page=1, page_size=4)
+    assert first.total == 11 and first.total_pages == 3 and first.next_cursor
+
+
+def test_counts_are_cached_between_pages(db_session, monkeypatch):
+    monkeypatch.setattr(pagination, "_COUNT_CACHE", OrderedDict())
+    monkeypatch.setattr(pagination.settings, "list_count_cache_ttl_seconds", 60)
+    db_session.add(models.QueryLog(id="q1", tenant_id="t1", query="a"))
+    db_session.commit()
+    assert services.list_query_history(db_session, "t1").total == 1
+
+    db_session.add(models.QueryLog(id="q2", tenant_id="t1", query="b"))
+    db_session.commit()
+    resp = services.list_query_history(db_session, "t1")
+    assert resp.total == 1  # cached
+    assert [item.id for item in resp.items] == ["q2", "q1"]
+
+
+def test_invalid_cursor_is_rejected(db_session):
+    with pytest.raises(HTTPException) as exc:
+        services.list_documents(db_session, "t1", cursor="not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_count_cache_is_bounded_and_dropped_on_document_writes(db_session, monkeypatch):
+    monkeypatch.setattr(pagination, "_COUNT_CACHE", OrderedDict())
+    monkeypatch.setattr(pagination.settings, "list_count_cache_ttl_seconds", 60)
+    monkeypatch.setattr(pagination.settings, "list_count_cache_max_entries", 2)
+    for key in ["a", "b", "c"]:
+        pagination.cached_count((key,), lambda: 1)
+    assert list(pagination._COUNT_CACHE) == [("b",), ("c",)]
+
+    db_session.add(models.Document(id="doc1", tenant_id="t1", dataset_id="d1"))
+    db_session.commit()
+    assert services.list_documents(db_session, "t1", "d1").total == 1
+    assert services.list_documents(db_session, "t1").total == 1
+
+    store = SimpleNamespace(delete_document=lambda *args: None)
+    monkeypatch.setattr(services.providers, "vector_store", lambda: store)
+    monkeypatch.setattr(services.providers, "bm25_client", lambda: None)
+    monkeypatch.setattr(services.storage, "delete_document_store", lambda *args: None)
+    services.soft_delete_document(db_session, "t1", "doc1")
+    assert services.list_documents(db_session, "t1", "d1").total == 0
+    assert services.list_documents(db_session, "t1").total == 0
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from core import parse_pool
+
+
+def test_parse_pool_times_out_slow_calls_and_recovers():
+    pool = parse_pool.ParsePool(workers=2, memory_limit_mb=0)
+    try:
+        slow, fast = pool.run([(time.sleep, (5,)), (abs, (-3,))], timeout=1)
+        assert isinstance(slow, TimeoutError)
+        assert fast == 3
+        assert pool.run([(abs, (-4,))], timeout=5) == [4]
+    finally:
+        pool.close()
+
+
+def test_parse_document_keeps_partial_pdf_text_on_timeout(monkeypatch, tmp_path):
+    class FakePool:
+        def run(self, calls, timeout):
+            return [4]
+
+        def imap(self, calls, timeout):
+            return iter([[(1, "page-1"), (2, "page-2")], TimeoutError("exceeded 1s")])
+
+    monkeypatch.setattr(parse_pool, "get_parse_pool", lambda: FakePool())
+    monkeypatch.setattr(parse_pool.settings, "parse_pdf_pages_per_task", 2)
+
+    pdf = tmp_path / "big.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n")
+    result = parse_pool.parse_document(str(pdf), "application/pdf", timeout=1)
+
+    assert result.text == "page-1\npage-2"
+    assert result.warnings == ["Pages 3-4 skipped: exceeded 1s"]
+
+
+def test_parse_document_raises_on_non_pdf_timeout(monkeypatch, tmp_path):
+    class FakePool:
+        def run(self, calls, timeout):
+            return [TimeoutError("exceeded 1s")]
+
+    monkeypatch.setattr(parse_pool, "get_parse_pool", lambda: FakePool())
+
+    with pytest.raises(TimeoutError):
+        html = tmp_path / "doc.html"
+        html.write_text("<html><body>x</body></html>")
+        parse_pool.parse_document(str(html), "text/html", timeout=1)
+
+
+def test_parse_pool_timeout_does_not_kill_other_callers():
+    pool = parse_pool.ParsePool(workers=2, memory_limit_mb=0)
+    try:
+        pool.run([(abs, (1,))] * 2, timeout=30)  # both workers started
+        results = {}
+        other = threading.Thread(target=lambda: results.update(other=pool.run([(time.sleep, (1.5,))], timeout=10)))
+        other.start()
+        (stuck,) = pool.run([(time.sleep, (30,))], timeout=0.5)
+        other.join()
+        assert isinstance(stuck, TimeoutError)
+        assert results["other"] == [None]
+    finally:
+        pool.close()
+
+
+def test_parse_document_sniffs_once_and_passes_format_to_worker(monkeypatch, tmp_path):
+    calls = []
+
+    class FakePool:
+        def run(self, calls_, timeout):
+            calls.extend(calls_)
+            return [("text", None)]
+
+    sniffs = []
+    real_detect = parse_pool.parser.detect_format
+    monkeypatch.setattr(parse_pool.parser, "detect_format", lambda *a: sniffs.append(a) or real_detect(*a))
+    monkeypatch.setattr(parse_pool, "get_parse_pool", lambda: FakePool())
+
+    html = tmp_path / "doc.html"
+    html.write_text("<html><body>x</body></html>")
+    parse_pool.parse_document(str(html), "text/html", timeout=1)
+
+    assert len(sniffs) == 1
+    assert calls[0][1][-1] == parse_pool.parser.HTML
+
+
+def test_unreadable_pdf_is_decoded_as_text_without_pypdf_outside_the_pool(monkeypatch, tmp_path):
+    class FakePool:
+        def run(self, calls, timeout):
+            return [ValueError("broken xref")]
+
+    def no_pypdf(*args):
+        raise AssertionError("pypdf must only run inside the pool")
+
+    monkeypatch.setattr(parse_pool, "get_parse_pool", lambda: FakePool())
+    monkeypatch.setattr(parse_pool.parser, "iter_pdf_pages", no_pypdf)
+    monkeypatch.setattr(parse_pool.parser, "_try_pdf_text", no_pypdf)
+
+    pdf = tmp_path / "broken.pdf"
+    pdf.write_bytes(b"%PDF-1.4\nnot really a pdf")
+    result = parse_pool.parse_document(str(pdf), "text/plain", timeout=1)
+
+    assert "not really a pdf" in result.text
+    assert result.warnings == ["PDF could not be opened: broken xref"]
+
+
+def test_iter_pages_parses_a_broken_pdf_once(monkeypatch, tmp_path):
+    attempts = []
+
+    def broken(*args):
+        attempts.append(args)
+        raise ValueError("broken xref")
+
+    monkeypatch.setattr(parse_pool.parser, "iter_pdf_pages", broken)
+    monkeypatch.setattr(parse_pool.parser, "_try_pdf_text", broken)
+
+    pdf = tmp_path / "broken.pdf"
+    pdf.write_bytes(b"%PDF-1.4\nnot really a pdf")
+
+    assert list(parse_pool.parser.iter_pages(str(pdf))) == [(None, "%PDF-1.4\nnot really a pdf")]
+    assert len(attempts) == 1
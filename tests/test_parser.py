@@ -0,0 +1,29 @@
+from core import parser
+
+
+def test_sniff_format_prefers_magic_bytes_over_declared_type():
+    assert parser.sniff_format(b"%PDF-1.7\n", "text/plain", ".txt") == parser.PDF
+    assert parser.sniff_format(b"PK\x03\x04....", None, ".docx") == parser.DOCX
+    assert parser.sniff_format(b"not a pdf", "application/pdf", ".pdf") == parser.TEXT
+    assert parser.sniff_format(b"  <!DOCTYPE html><html>", None, "") == parser.HTML
+    assert parser.sniff_format(b"# Title", "text/markdown", "") == parser.MARKDOWN
+
+
+def test_markdown_to_text_strips_markup_without_html_round_trip():
+    md = "# Title\n\nSome **bold** and [a link](https://x.y) with snake_case_name.\n\n- item\n\n```\ncode\n```\n"
+
+    text = parser._markdown_to_text(md)
+
+    assert "Title" in text and "#" not in text
+    assert "Some bold and a link with snake_case_name." in text
+    assert "item" in text and "```" not in text
+    assert parser._markdown_to_text(md, keep_headings=True).startswith("# Title")
+
+
+def test_parse_text_reads_markdown_by_suffix(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_text("## Heading\n\nBody *text*.", encoding="utf-8")
+
+    text, _ = parser.parse_text(str(path))
+
+    assert text.split() == ["Heading", "Body", "text."]
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks import import_time
+from core.providers import Provider
+from workers.worker import LazyTask
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_provider_builds_once_and_rebuilds_after_close():
+    built: list = []
+    closed: list = []
+    provider = Provider(lambda: built.append(len(built)) or f"client{len(built)}", closed.append)
+
+    assert not provider.ready
+    assert provider.get() == provider.get() == "client1"
+    assert built == [0]
+
+    provider.close()
+    assert closed == ["client1"] and not provider.ready
+    assert provider.get() == "client2"
+
+
+def test_provider_memoizes_none():
+    built: list = []
+    provider = Provider(lambda: built.append(1))
+    assert provider.get() is None and provider.get() is None
+    assert built == [1]
+
+
+def test_lazy_task_without_celery_runs_inline():
+    calls: list = []
+    lazy = LazyTask(lambda payload: calls.append(payload), ((), {}))
+    lazy.bind(None).delay({"job_id": "j1"})
+    lazy({"job_id": "j2"})
+    assert calls == [{"job_id": "j1"}, {"job_id": "j2"}]
+
+
+def test_importing_the_app_opens_no_clients():
+    code = (
+        "import sys, app.main; from core import providers; from workers import worker; "
+        "assert not providers._vector_store.ready and not providers._bm25_client.ready; "
+        "assert worker.celery_app is None; "
+        "assert 'qdrant_client' not in sys.modules and 'opensearchpy' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, timeout=120)
+
+
+def test_parse_importtime_output():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     numpy.core\n"
+        "import time:       300 |        420 |   numpy\n"
+        "import time:        80 |        500 | app.main\n"
+    )
+    rows = import_time.parse_importtime(stderr)
+    assert [r["module"] for r in rows] == ["numpy.core", "numpy", "app.main"]
+    summary = import_time.summarize("app.main", rows, top=2)
+    assert summary["total_ms"] == 0.5
+    assert summary["top_packages"] == [{"package": "numpy", "ms": 0.4}]
+
+
+def test_close_reaches_wrapped_network_clients():
+    from types import SimpleNamespace
+
+    from core import providers
+
+    closed: list = []
+    client = SimpleNamespace(close=lambda: closed.append("closed"))
+    providers._close_client(SimpleNamespace(client=client))
+    providers._close_client(SimpleNamespace(_client=client))
+    providers._close_client(SimpleNamespace())
+    assert closed == ["closed", "closed"]
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import query_log
+from infra import models
+from infra.db import Base
+
+
+@pytest.fixture()
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'logs.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+    monkeypatch.setattr(query_log, "SessionLocal", factory)
+    return factory
+
+
+def test_rows_are_buffered_until_flush(session_factory):
+    writer = query_log.QueryLogWriter(flush_seconds=3600, batch_size=100, max_buffer=100)
+    writer.record("t1", "first", ["d1"], latency_ms=12.5, hit_count=3, rerank_applied=True, answered=False)
+    writer.record("t1", "second")
+
+    db = session_factory()
+    assert db.query(models.QueryLog).count() == 0
+    writer.close(timeout=5)
+    rows = {row.query: row for row in db.query(models.QueryLog).all()}
+    assert set(rows) == {"first", "second"}
+    assert rows["first"].latency_ms == 12.5 and rows["first"].hit_count == 3 and rows["first"].rerank_applied
+    db.close()
+
+
+def test_batch_size_triggers_an_early_flush(session_factory):
+    writer = query_log.QueryLogWriter(flush_seconds=3600, batch_size=2, max_buffer=100)
+    writer.record("t1", "a")
+    writer.record("t1", "b")
+    db = session_factory()
+    for _ in range(100):  # the flusher thread commits shortly after the wake-up
+        if db.query(models.QueryLog).count() == 2:
+            break
+        time.sleep(0.05)
+    assert db.query(models.QueryLog).count() == 2
+    db.close()
+    writer.close(timeout=5)
+
+
+def test_failed_flush_keeps_rows_and_drops_oldest_beyond_bound(monkeypatch):
+    class BrokenSession:
+        def bulk_insert_mappings(self, *args):
+            raise ConnectionError("db down")
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(query_log, "SessionLocal", BrokenSession)
+    writer = query_log.QueryLogWriter(flush_seconds=3600, batch_size=100, max_buffer=2)
+    for text in ["a", "b", "c"]:
+        writer.record("t1", text)
+
+    assert writer.flush() == 0
+    assert writer.dropped == 1
+    assert [row["query"] for row in writer._buffer] == ["b", "c"]
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text, tuple_
+from sqlalchemy.orm import sessionmaker
+
+from app import pagination
+from infra import models
+from infra.db import Base
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _plan(db, query) -> str:
+    sql = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_hot_queries_use_indexes(db_session):
+    Document, Chunk, QueryLog, ApiKey = models.Document, models.Chunk, models.QueryLog, models.ApiKey
+    live_docs = db_session.query(Document).filter(Document.tenant_id == "t1", Document.deleted_at.is_(None))
+    cases = {
+        "ix_documents_live_dataset_created": live_docs.filter(Document.dataset_id == "d1").order_by(Document.created_at.desc()),
+        "ix_documents_live_tenant_created": live_docs.order_by(Document.created_at.desc()),
+        "ix_documents_live_content_hash": live_docs.filter(Document.dataset_id == "d1", Document.content_hash.in_(["a", "b"])),
+        "ix_chunks_tenant_dataset": db_session.query(Chunk).filter(Chunk.tenant_id == "t1", Chunk.dataset_id == "d1"),
+        "ix_chunks_document_id": db_session.query(Chunk).filter(Chunk.document_id == "doc1"),
+        "ix_query_logs_tenant_created": db_session.query(QueryLog).filter(QueryLog.tenant_id == "t1").order_by(QueryLog.created_at.desc()),
+        "ix_api_keys_active_tenant": db_session.query(ApiKey).filter(ApiKey.active.is_(True)),
+    }
+    for index, query in cases.items():
+        plan = _plan(db_session, query)
+        assert index in plan, plan
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+    # keyset pagination seeks into the same index instead of scanning from the first row
+    created_at, row_id = pagination.decode_cursor(pagination.encode_cursor(datetime(2026, 1, 1), "doc1"))
+    seek = live_docs.filter(
+        Document.dataset_id == "d1", tuple_(Document.created_at, Document.id) < tuple_(created_at, row_id)
+    )
+    plan = _plan(db_session, seek.order_by(Document.created_at.desc(), Document.id.desc()))
+    assert "ix_documents_live_dataset_created" in plan and "created_at" in plan.split("USING INDEX", 1)[1], plan
+    assert "USE TEMP B-TREE" not in plan, plan
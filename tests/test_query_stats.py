@@ -0,0 +1,116 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import query_log, query_stats, services
+from infra import models
+from infra.db import Base
+
+
+@pytest.fixture()
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+    monkeypatch.setattr(query_log, "SessionLocal", factory)
+    return factory
+
+
+def test_flushes_accumulate_daily_rollups(session_factory):
+    writer = query_log.QueryLogWriter(flush_seconds=3600, batch_size=100, max_buffer=100)
+    for latency in [3, 40, 40]:
+        writer.record("t1", "q", ["d1", "d2"], latency_ms=latency)
+    writer.flush()
+    writer.record("t1", "q", ["d1"], latency_ms=900)
+    writer.record("t2", "q")
+    writer.flush()
+
+    db = session_factory()
+    rows = {(r.tenant_id, r.dataset_id): r for r in db.query(models.QueryStatsDaily).all()}
+    assert rows[("t1", "*")].query_count == 4
+    assert rows[("t1", "d1")].query_count == 4
+    assert rows[("t1", "d2")].query_count == 3
+    assert rows[("t2", "*")].query_count == 1 and rows[("t2", "*")].latency_p50_ms is None
+    assert rows[("t1", "*")].latency_p50_ms == 50.0
+    assert rows[("t1", "*")].latency_p95_ms == 1000.0
+
+    stats = services.get_query_daily_stats(db, "t1", days=3)
+    assert [item.count for item in stats.items] == [0, 0, 4]
+    assert services.get_query_daily_stats(db, "t1", days=1, dataset_id="d2").items[0].count == 3
+    db.close()
+
+
+def test_latency_percentile_uses_bucket_upper_bounds():
+    hist = [0] * (len(query_stats.LATENCY_BOUNDS_MS) + 1)
+    hist[0], hist[3], hist[-1] = 5, 4, 1
+    assert query_stats.latency_percentile(hist, 0.5) == 5.0
+    assert query_stats.latency_percentile(hist, 0.9) == 50.0
+    assert query_stats.latency_percentile(hist, 1.0) == 10000.0
+    assert query_stats.latency_percentile([0] * len(hist), 0.5) is None
+
+
+def test_retention_prunes_raw_logs_but_keeps_rollups(session_factory, monkeypatch):
+    monkeypatch.setattr(query_stats.settings, "query_log_retention_days", 30)
+    now = datetime(2026, 6, 1)
+    db = session_factory()
+    db.add_all(
+        [
+            models.QueryLog(id="old", tenant_id="t1", query="q", created_at=now - timedelta(days=45)),
+            models.QueryLog(id="new", tenant_id="t1", query="q", created_at=now - timedelta(days=5)),
+            models.QueryStatsDaily(tenant_id="t1", day=(now - timedelta(days=45)).date(), dataset_id="*", query_count=1),
+        ]
+    )
+    db.commit()
+
+    query_stats.run_maintenance(db, now=now)
+
+    assert [row.id for row in db.query(models.QueryLog).all()] == ["new"]
+    assert db.query(models.QueryStatsDaily).count() == 1
+    db.close()
+
+
+def test_new_partition_takes_over_default_partition_rows(monkeypatch):
+    class FakeSession:
+        def __init__(self):
+            self.statements: list = []
+            self.commits = 0
+
+        def execute(self, statement, params=None):
+            sql = str(statement)
+            self.statements.append(sql)
+            if "pg_inherits" in sql:
+                return [("query_logs_default", True), ("query_logs_2026_06", False)]
+            return []
+
+        def commit(self):
+            self.commits += 1
+
+    db = FakeSession()
+    monkeypatch.setattr(query_stats, "_is_partitioned", lambda db: True)
+
+    query_stats.ensure_log_partitions(db, date(2026, 6, 15))
+
+    steps = [s.split(" (")[0] for s in db.statements[1:]]
+    assert steps == [
+        "CREATE TEMP TABLE _moved_query_logs",
+        "WITH moved AS",
+        "CREATE TABLE IF NOT EXISTS query_logs_2026_07 PARTITION OF query_logs FOR VALUES FROM",
+        "INSERT INTO query_logs SELECT * FROM _moved_query_logs",
+    ]
+    assert "DELETE FROM query_logs_default" in db.statements[2]
+    assert db.commits == 1  # the existing June partition is left alone
+
+
+def test_create_all_builds_the_partitioned_query_log_table_on_postgres():
+    from sqlalchemy import create_mock_engine
+
+    statements: list = []
+    engine = create_mock_engine("postgresql://", lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect))))
+    Base.metadata.create_all(engine, tables=[models.QueryLog.__table__], checkfirst=False)
+
+    create_table = next(s for s in statements if "CREATE TABLE query_logs (" in s)
+    assert "PRIMARY KEY (id, created_at)" in create_table
+    assert "PARTITION BY RANGE (created_at)" in create_table
+    assert "CREATE TABLE query_logs_default PARTITION OF query_logs DEFAULT" in statements
@@ -154,6 +154,7 @@ def test_tenant_and_settings_endpoints_require_superuser_dependency():
     _assert_superuser_dep(routes.get_tenant_by_id)
     _assert_superuser_dep(routes.update_tenant)
     _assert_superuser_dep(routes.delete_tenant)
+    _assert_superuser_dep(routes.get_tenant_job)
     _assert_superuser_dep(routes.regenerate_tenant_key)
 
 
@@ -174,7 +175,7 @@ def test_settings_model_config_redacts_api_key():
     assert out.endpoint == model.endpoint
 
 
-def test_fetch_source_uri_enforces_streaming_and_no_redirects(monkeypatch):
+def test_fetch_source_uri_enforces_streaming_and_no_redirects(monkeypatch, tmp_path):
     captured: dict[str, object] = {}
 
     def fake_get(url: str, **kwargs):
@@ -187,16 +188,18 @@ def test_fetch_source_uri_enforces_streaming_and_no_redirects(monkeypatch):
 
     monkeypatch.setattr(routes.requests, "get", fake_get)
     monkeypatch.setattr("core.security.is_safe_url", lambda url: True)
+    monkeypatch.setattr(routes.settings, "object_store_root", str(tmp_path))
+    monkeypatch.setattr(routes.settings, "object_store_backend", "local")
 
-    filename, mime, size, content_hash, data = routes._fetch_source_uri_data("https://example.com/a.txt")
+    filename, mime, staged = routes._fetch_source_uri("https://example.com/a.txt")
 
     assert captured["allow_redirects"] is False
     assert captured["stream"] is True
     assert filename == "a.txt"
     assert mime == "text/plain"
-    assert size == 11
-    assert len(content_hash) == 64
-    assert data == b"hello world"
+    assert staged.size == 11
+    assert len(staged.content_hash) == 64
+    assert open(staged.path, "rb").read() == b"hello world"
 
 
 def test_fetch_source_uri_rejects_redirect(monkeypatch):
@@ -204,20 +207,89 @@ def test_fetch_source_uri_rejects_redirect(monkeypatch):
     monkeypatch.setattr("core.security.is_safe_url", lambda url: True)
 
     with pytest.raises(HTTPException) as exc_info:
-        routes._fetch_source_uri_data("https://example.com/redirect")
+        routes._fetch_source_uri("https://example.com/redirect")
 
     assert exc_info.value.status_code == 400
     assert exc_info.value.detail == "Redirects are not allowed for source_uri"
 
 
-def test_upload_documents_cleans_up_on_duplicate(monkeypatch):
-    tenant = deps.TenantContext(tenant_id="tenant-dup", api_key="key")
-    deleted: list[tuple[str, str, str, str]] = []
+def test_fetch_source_uris_discards_staged_when_one_fails(monkeypatch):
+    discarded: list[str] = []
+
+    def fake_fetch(uri):
+        if uri.endswith("bad"):
+            raise HTTPException(status_code=400, detail="Failed to fetch source_uri: boom")
+        return "a.txt", "text/plain", routes.storage.StagedFile(f"/tmp/{uri[-1]}", 1, "hash")
+
+    monkeypatch.setattr(routes, "_fetch_source_uri", fake_fetch)
+    monkeypatch.setattr(routes.storage, "discard_staged", lambda staged: discarded.append(staged.path))
+
+    ok = routes._fetch_source_uris(["https://example.com/1", "https://example.com/2"])
+    assert [(name, staged.path) for name, _, staged in ok] == [("a.txt", "/tmp/1"), ("a.txt", "/tmp/2")]
+    assert discarded == []
+
+    with pytest.raises(HTTPException):
+        routes._fetch_source_uris(["https://example.com/1", "https://example.com/bad"])
+    assert discarded == ["/tmp/1"]
+
+
+def test_fetch_source_uris_reports_storage_failures_as_503(monkeypatch):
+    def fake_fetch(uri):
+        if uri.endswith("bad"):
+            raise OSError("disk full")
+        return "a.txt", "text/plain", routes.storage.StagedFile("/tmp/1", 1, "hash")
+
+    monkeypatch.setattr(routes, "_fetch_source_uri", fake_fetch)
+    monkeypatch.setattr(routes.storage, "discard_staged", lambda staged: None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        routes._fetch_source_uris(["https://example.com/1", "https://example.com/bad"])
+    assert exc_info.value.status_code == 503
+    assert "https://example.com/bad" in exc_info.value.detail
+
+
+def test_upload_documents_limits_files_and_uris_together(monkeypatch):
+    tenant = deps.TenantContext(tenant_id="tenant-limit", api_key="key")
+    _patch_staging(monkeypatch)
+    monkeypatch.setattr(routes.settings, "max_files_per_upload", 2)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            routes.upload_documents(
+                dataset_id="dataset-1",
+                files=[_upload_file("a.txt", b"a", "text/plain"), _upload_file("b.txt", b"b", "text/plain")],
+                source_uri="https://example.com/c.txt",
+                tenant=tenant,
+                db=object(),
+            )
+        )
+    assert exc_info.value.status_code == 400
+
+
+def _patch_staging(monkeypatch, content_hash: str = "hash-1"):
+    """Fake staging area: records staged, discarded and committed files."""
+    calls: dict[str, list] = {"staged": [], "discarded": [], "committed": []}
+
+    def stage_upload_file(root, upload, max_bytes=None):
+        staged = routes.storage.StagedFile(f"/tmp/staged-{len(calls['staged'])}", 5, content_hash, "text/plain")
+        calls["staged"].append(max_bytes)
+        return staged
 
     monkeypatch.setattr(routes.services, "ensure_dataset", lambda db, tenant_id, dataset_id: SimpleNamespace(embedder="embedder"))
-    monkeypatch.setattr(routes.storage, "save_upload_file", lambda root, tenant_id, dataset_id, doc_id, upload: ("/tmp/file", 5, "hash-1"))
-    monkeypatch.setattr(routes.storage, "delete_document_store", lambda root, tenant_id, dataset_id, doc_id: deleted.append((root, tenant_id, dataset_id, doc_id)))
-    monkeypatch.setattr(routes, "find_duplicate_document", lambda db, tenant_id, dataset_id, content_hash: object())
+    monkeypatch.setattr(routes.storage, "stage_upload_file", stage_upload_file)
+    monkeypatch.setattr(routes.storage, "discard_staged", lambda staged: calls["discarded"].append(staged.path))
+    monkeypatch.setattr(
+        routes.storage,
+        "commit_staged",
+        lambda root, staged, tenant_id, dataset_id, doc_id, filename: calls["committed"].append(staged.path) or "/final",
+    )
+    return calls
+
+
+def test_upload_documents_discards_staged_duplicate(monkeypatch):
+    tenant = deps.TenantContext(tenant_id="tenant-dup", api_key="key")
+    calls = _patch_staging(monkeypatch)
+    monkeypatch.setattr(routes, "find_existing_hashes", lambda db, tenant_id, dataset_id, hashes: {h: "doc-0" for h in hashes})
 
     response = asyncio.run(
         routes.upload_documents(
@@ -230,21 +302,20 @@ def test_upload_documents_cleans_up_on_duplicate(monkeypatch):
     )
 
     assert response.job_ids == []
-    assert len(deleted) == 1
+    assert calls["discarded"] == ["/tmp/staged-0"]
+    assert calls["committed"] == []
 
 
-def test_upload_documents_cleans_up_on_oversize(monkeypatch):
+def test_upload_documents_rejects_oversize_before_storing(monkeypatch):
     tenant = deps.TenantContext(tenant_id="tenant-size", api_key="key")
-    deleted: list[tuple[str, str, str, str]] = []
-    oversize = routes.settings.max_file_size_mb * 1024 * 1024 + 1
+    calls = _patch_staging(monkeypatch)
 
-    monkeypatch.setattr(routes.services, "ensure_dataset", lambda db, tenant_id, dataset_id: SimpleNamespace(embedder="embedder"))
-    monkeypatch.setattr(
-        routes.storage,
-        "save_upload_file",
-        lambda root, tenant_id, dataset_id, doc_id, upload: ("/tmp/file", oversize, "hash-1"),
-    )
-    monkeypatch.setattr(routes.storage, "delete_document_store", lambda root, tenant_id, dataset_id, doc_id: deleted.append((root, tenant_id, dataset_id, doc_id)))
+    def stage_upload_file(root, upload, max_bytes=None):
+        calls["staged"].append(max_bytes)
+        raise routes.storage.FileTooLarge(max_bytes)
+
+    monkeypatch.setattr(routes.storage, "stage_upload_file", stage_upload_file)
+    monkeypatch.setattr(routes, "find_existing_hashes", lambda db, tenant_id, dataset_id, hashes: {})
 
     with pytest.raises(HTTPException) as exc_info:
         asyncio.run(
@@ -259,4 +330,30 @@ def test_upload_documents_cleans_up_on_oversize(monkeypatch):
 
     assert exc_info.value.status_code == 400
     assert "File too large" in exc_info.value.detail
-    assert len(deleted) == 1
+    assert calls["staged"] == [routes.settings.max_file_size_mb * 1024 * 1024]
+    assert calls["committed"] == []
+
+
+def test_upload_documents_if_none_match_skips_known_content(monkeypatch):
+    tenant = deps.TenantContext(tenant_id="tenant-inm", api_key="key")
+    calls = _patch_staging(monkeypatch)
+    known = "a" * 64
+    monkeypatch.setattr(
+        routes, "find_existing_hashes", lambda db, tenant_id, dataset_id, hashes: {h: "doc-0" for h in hashes if h == known}
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            routes.upload_documents(
+                dataset_id="dataset-1",
+                files=[_upload_file("doc.txt", b"hello", "text/plain")],
+                source_uri=None,
+                if_none_match=f'"{known}"',
+                tenant=tenant,
+                db=object(),
+            )
+        )
+
+    assert exc_info.value.status_code == 412
+    assert calls["staged"] == []
+    assert routes._parse_if_none_match(f'W/"{known.upper()}", "b"') == [known, "b"]
@@ -0,0 +1,237 @@
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from core import storage
+
+
+class _FakeS3:
+    def __init__(self):
+        self.calls: list[str] = []
+        self.parts: list[int] = []
+
+    def put_object(self, **kwargs):
+        self.calls.append("put_object")
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append("create")
+        return {"UploadId": "up-1"}
+
+    def upload_part(self, Body, PartNumber, **kwargs):
+        self.parts.append(len(Body))
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self.calls.append("complete")
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append("abort")
+
+    def upload_file(self, filename, bucket, key, **kwargs):
+        self.calls.append(("upload_file", key, open(filename, "rb").read()))
+
+    def delete_object(self, **kwargs):
+        self.calls.append("delete")
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="doc.txt", headers=Headers({"content-type": "text/plain"}))
+
+
+@pytest.fixture()
+def fake_s3(monkeypatch):
+    client = _FakeS3()
+    monkeypatch.setattr(storage.settings, "object_store_backend", "s3")
+    monkeypatch.setattr(storage.settings, "s3_bucket", "bucket")
+    monkeypatch.setattr(storage.settings, "s3_multipart_part_size_mb", 5)
+    monkeypatch.setattr(storage, "_s3_client", lambda: client)
+    return client
+
+
+def test_s3_upload_streams_fixed_size_parts(fake_s3):
+    data = b"x" * (12 * 1024 * 1024)
+    path, size, sha = storage.save_upload_file("/unused", "t1", "d1", "doc1", _upload(data))
+
+    assert path == "s3://bucket/tenants/t1/d1/doc1/doc.txt"
+    assert size == len(data)
+    assert sha == hashlib.sha256(data).hexdigest()
+    assert sorted(fake_s3.parts) == [2 * 1024 * 1024, 5 * 1024 * 1024, 5 * 1024 * 1024]
+    assert fake_s3.calls == ["create", "complete"]  # straight to the document key, no copy
+
+
+def test_s3_upload_aborts_when_size_limit_is_passed(fake_s3):
+    data = b"x" * (16 * 1024 * 1024)
+    with pytest.raises(storage.FileTooLarge):
+        storage.save_upload_file("/unused", "t1", "d1", "doc1", _upload(data), max_bytes=11 * 1024 * 1024)
+
+    assert fake_s3.calls == ["create", "abort"]
+    assert len(fake_s3.parts) == 2
+
+
+def test_local_upload_removes_partial_file_over_limit(tmp_path):
+    with pytest.raises(storage.FileTooLarge):
+        storage.save_upload_file(str(tmp_path), "t1", "d1", "doc1", _upload(b"x" * 4096), max_bytes=1024)
+
+    assert not (tmp_path / "tenants").exists()
+    assert list((tmp_path / ".staging").iterdir()) == []
+
+
+def test_staged_file_is_renamed_into_place_only_on_commit(tmp_path):
+    staged = storage.stage_upload_file(str(tmp_path), _upload(b"hello"))
+    assert staged.content_hash == hashlib.sha256(b"hello").hexdigest()
+    assert not (tmp_path / "tenants").exists()
+
+    path = storage.commit_staged(str(tmp_path), staged, "t1", "d1", "doc1", "doc.txt")
+    assert open(path, "rb").read() == b"hello"
+    assert list((tmp_path / ".staging").iterdir()) == []
+
+    dup = storage.stage_upload_file(str(tmp_path), _upload(b"hello"))
+    storage.discard_staged(dup)
+    assert list((tmp_path / ".staging").iterdir()) == []
+
+
+def test_s3_staging_is_local_and_commit_uploads_once(fake_s3, tmp_path):
+    staged = storage.stage_upload_file(str(tmp_path), _upload(b"hello"))
+    assert fake_s3.calls == []  # hashing and dedup happen before anything reaches S3
+
+    path = storage.commit_staged(str(tmp_path), staged, "t1", "d1", "doc1", "doc.txt")
+    assert path == "s3://bucket/tenants/t1/d1/doc1/doc.txt"
+    assert fake_s3.calls == [("upload_file", "tenants/t1/d1/doc1/doc.txt", b"hello")]
+    assert list((tmp_path / ".staging").iterdir()) == []
+
+
+def test_sweep_staging_removes_only_old_files(fake_s3, tmp_path):
+    import os
+
+    old = storage.stage_upload_file(str(tmp_path), _upload(b"old"))
+    fresh = storage.stage_upload_file(str(tmp_path), _upload(b"fresh"))
+    os.utime(old.path, (1000, 1000))
+
+    assert storage.sweep_staging(str(tmp_path), max_age_seconds=3600) == 1
+    assert [p.name for p in (tmp_path / ".staging").iterdir()] == [os.path.basename(fresh.path)]
+    assert fake_s3.calls == []  # staging is local; the bucket is never swept
+
+
+def test_s3_client_is_shared_per_process(monkeypatch):
+    import boto3
+
+    built = []
+    monkeypatch.setattr(boto3.session.Session, "client", lambda self, *args, **kwargs: built.append(kwargs) or object())
+    storage._reset_s3_client()
+    try:
+        first = storage._s3_client()
+        assert storage._s3_client() is first
+        assert len(built) == 1
+        assert built[0]["config"].max_pool_connections == storage.settings.s3_max_pool_connections
+
+        monkeypatch.setattr(storage, "_client_pid", -1)  # as seen from a forked child
+        assert storage._s3_client() is not first
+        assert len(built) == 2
+    finally:
+        storage._reset_s3_client()
+
+
+class _FakeBody:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.closed = False
+
+    def iter_chunks(self, chunk_size):
+        for i in range(0, len(self.data), chunk_size):
+            yield self.data[i : i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_s3_object_forwards_range(monkeypatch):
+    body = _FakeBody(b"0123456789")
+    seen = {}
+
+    class Client:
+        def get_object(self, **kwargs):
+            seen.update(kwargs)
+            return {"Body": body, "ContentLength": 4, "ContentRange": "bytes 2-5/10", "ETag": '"abc"'}
+
+    monkeypatch.setattr(storage, "_s3_client", lambda: Client())
+    obj = storage.stream_s3_object("s3://bucket/a/b.txt", byte_range="bytes=2-5", chunk_size=4)
+
+    assert seen == {"Bucket": "bucket", "Key": "a/b.txt", "Range": "bytes=2-5"}
+    assert obj.status_code == 206
+    assert obj.headers["Content-Range"] == "bytes 2-5/10"
+    assert obj.headers["ETag"] == '"abc"'
+    assert list(obj.body) == [b"0123", b"4567", b"89"]
+    assert body.closed
+
+
+def test_stream_s3_object_not_modified(monkeypatch):
+    from botocore.exceptions import ClientError
+
+    class Client:
+        def get_object(self, **kwargs):
+            raise ClientError({"Error": {"Code": "304"}, "ResponseMetadata": {"HTTPStatusCode": 304}}, "GetObject")
+
+        def head_object(self, **kwargs):
+            return {"ETag": '"abc"'}
+
+    monkeypatch.setattr(storage, "_s3_client", lambda: Client())
+    obj = storage.stream_s3_object("s3://bucket/a/b.txt", if_none_match='"xyz", "abc"')
+
+    assert obj.status_code == 304
+    assert obj.headers == {"ETag": '"abc"'}  # the object's own tag, not the client's list
+    assert obj.body is None
+
+
+def test_delete_s3_prefix_fans_out_and_batches(monkeypatch):
+    keys = {f"tenants/t1/d1/doc{i}/": [f"tenants/t1/d1/doc{i}/f{j}" for j in range(1500 if i == 0 else 3)] for i in range(3)}
+    deleted: list = []
+
+    class Paginator:
+        def paginate(self, Bucket, Prefix, PaginationConfig):
+            items = keys[Prefix]
+            for i in range(0, len(items), PaginationConfig["PageSize"]):
+                yield {"Contents": [{"Key": k} for k in items[i : i + 1000]]}
+
+    class Client:
+        def list_objects_v2(self, **kwargs):
+            assert kwargs["Delimiter"] == "/"
+            return {"CommonPrefixes": [{"Prefix": p} for p in keys], "Contents": []}
+
+        def get_paginator(self, name):
+            return Paginator()
+
+        def delete_objects(self, Bucket, Delete):
+            assert len(Delete["Objects"]) <= 1000
+            deleted.append(len(Delete["Objects"]))
+            return {}
+
+    monkeypatch.setattr(storage.settings, "s3_bucket", "bucket")
+    monkeypatch.setattr(storage, "_s3_client", lambda: Client())
+
+    assert storage._delete_s3_prefix("tenants/t1/d1/") == 1506
+    assert sorted(deleted) == [3, 3, 500, 1000]
+
+
+def test_delete_tenant_store_purges_documents_and_imports(monkeypatch):
+    prefixes: list = []
+    monkeypatch.setattr(storage.settings, "object_store_backend", "s3")
+    monkeypatch.setattr(storage.settings, "s3_prefix", "raglite")
+    monkeypatch.setattr(storage, "_delete_s3_prefix", prefixes.append)
+
+    storage.delete_tenant_store("/unused", "t1")
+
+    assert prefixes == ["raglite/tenants/t1/", "raglite/imports/t1/"]
+
+
+def test_delete_s3_objects_reports_failed_keys(monkeypatch):
+    class Client:
+        def delete_objects(self, Bucket, Delete):
+            return {"Errors": [{"Key": "imports/t1/a.txt", "Message": "Access Denied"}]}
+
+    monkeypatch.setattr(storage, "_s3_client", lambda: Client())
+
+    with pytest.raises(RuntimeError, match="imports/t1/a.txt"):
+        storage.delete_s3_objects(["s3://bucket/imports/t1/a.txt", "s3://bucket/imports/t1/b.txt"])
@@ -0,0 +1,39 @@
+from workers import worker
+
+
+def test_tasks_are_routed_to_priority_queues(monkeypatch):
+    monkeypatch.setattr(worker.settings, "celery_task_routes", {"workers.tasks.cleanup_datasets": "maintenance"})
+
+    routes = worker.task_routes()
+
+    assert routes["workers.tasks.ingest_document"] == {"queue": worker.settings.celery_queue_interactive}
+    assert routes["workers.tasks.ingest_batch"] == {"queue": worker.settings.celery_queue_bulk}
+    assert routes["workers.tasks.reindex_dataset"] == {"queue": worker.settings.celery_queue_reindex}
+    assert routes["workers.tasks.cleanup_datasets"] == {"queue": "maintenance"}
+    assert worker.queue_names() == [
+        worker.settings.celery_queue_interactive,
+        worker.settings.celery_queue_bulk,
+        worker.settings.celery_queue_reindex,
+        "maintenance",
+    ]
+
+
+def test_visibility_timeout_outlasts_late_acked_tasks(monkeypatch):
+    monkeypatch.setattr(worker.settings, "celery_visibility_timeout_seconds", 7200)
+
+    app = worker._load_celery()
+
+    assert app.conf.task_acks_late == worker.settings.celery_task_acks_late
+    assert app.conf.broker_transport_options["visibility_timeout"] == 7200
+
+
+def test_pool_processes_serve_metrics_on_their_own_port(monkeypatch):
+    served: list = []
+    monkeypatch.setattr(worker.settings, "worker_metrics_port", 9100)
+    monkeypatch.setattr(worker.settings, "enable_metrics", True)
+    monkeypatch.setattr("celery.utils.log.current_process_index", lambda: 3)
+    monkeypatch.setattr("core.metrics.start_http_server", lambda port: served.append(port))
+
+    worker._serve_metrics()
+
+    assert served == [9103]
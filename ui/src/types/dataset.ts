@@ -7,6 +7,7 @@ export interface Dataset {
   rerank_model?: string | null;
   rerank_top_k?: number | null;
   rerank_min_score?: number | null;
+  chunk_strategy?: string | null;
   description?: string;
   language?: string;
   created_at?: string;
@@ -22,6 +23,7 @@ export interface CreateDatasetRequest {
   rerank_model?: string | null;
   rerank_top_k?: number | null;
   rerank_min_score?: number | null;
+  chunk_strategy?: string | null;
   description?: string;
   language?: string;
 }
@@ -33,6 +35,7 @@ export interface UpdateDatasetRequest {
   rerank_model?: string | null;
   rerank_top_k?: number | null;
   rerank_min_score?: number | null;
+  chunk_strategy?: string | null;
   description?: string;
   confirm_embedder_change?: boolean;
   language?: string;
@@ -21,4 +21,5 @@ export interface DocumentListResponse {
   page: number;
   page_size: number;
   total_pages: number;
+  next_cursor?: string | null;
 }
@@ -3,6 +3,8 @@ export interface QueryHistoryItem {
   tenant_id: string;
   dataset_ids?: string[] | null;
   query: string;
+  latency_ms?: number | null;
+  hit_count?: number | null;
   created_at: string;
 }
 
@@ -12,11 +14,14 @@ export interface QueryHistoryResponse {
   page: number;
   page_size: number;
   total_pages: number;
+  next_cursor?: string | null;
 }
 
 export interface QueryDailyStat {
   date: string;
   count: number;
+  latency_p50_ms?: number | null;
+  latency_p95_ms?: number | null;
 }
 
 export interface QueryDailyStatsResponse {
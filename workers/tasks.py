@@ -11,6 +11,18 @@ def ingest_document(job_payload: dict):
         document_id=job_payload["document_id"],
         path=job_payload["path"],
         mime_type=job_payload.get("mime_type"),
+        embedder=job_payload.get("embedder"),
+    )
+
+
+@task()
+def ingest_batch(job_payload: dict):
+    pipeline.ingest_batch(
+        job_id=job_payload["job_id"],
+        tenant_id=job_payload["tenant_id"],
+        dataset_id=job_payload["dataset_id"],
+        document_ids=job_payload["document_ids"],
+        embedder=job_payload.get("embedder"),
     )
 
 
@@ -23,3 +35,13 @@ def reindex_dataset(*args, **kwargs):
         dataset_id=job_payload["dataset_id"],
         embedder=job_payload.get("embedder"),
     )
+
+
+@task()
+def cleanup_datasets(job_payload: dict):
+    pipeline.cleanup_datasets(
+        job_id=job_payload["job_id"],
+        tenant_id=job_payload["tenant_id"],
+        dataset_ids=job_payload["dataset_ids"],
+        purge_tenant=job_payload.get("purge_tenant", False),
+    )
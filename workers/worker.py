@@ -1,47 +1,173 @@
 from __future__ import annotations
 
+import logging
 from typing import Any, Callable
 
 from app.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def _warm_worker(**_kwargs):
+    """Load language profiles once per worker process instead of on its first document."""
+    from core import langid
+
+    try:
+        langid.warm_up()
+    except Exception:  # pragma: no cover - langdetect missing
+        pass
+    from core import storage
+
+    try:
+        # uploads staged by a worker that died mid-fetch
+        storage.sweep_staging(settings.object_store_root, settings.staging_max_age_hours * 3600)
+    except Exception:  # pragma: no cover - best effort
+        pass
+    if settings.bm25_snapshot_dir:
+        # ingest updates shared BM25 snapshots, which must be completed from the database first
+        from app.bm25_warmup import count_dataset_chunks, iter_dataset_chunks
+        from core.bm25_memory import bm25_memory
+
+        bm25_memory.set_loader(iter_dataset_chunks, count_dataset_chunks)
+    _serve_metrics()
+
+
+def _serve_metrics() -> None:
+    """Ingest metrics are recorded in the pool process that ran the task, so each one exposes its own."""
+    if not settings.enable_metrics or not settings.worker_metrics_port:
+        return
+    from celery.utils.log import current_process_index
+
+    from core import metrics
+
+    port = settings.worker_metrics_port + (current_process_index() or 0)
+    try:
+        metrics.start_http_server(port)
+    except OSError:
+        logger.warning("Could not serve worker metrics on port %d", port, exc_info=True)
+
+
+def _close_worker(**_kwargs):
+    from core import providers
+
+    providers.close_all()
+
+
+def task_routes() -> dict:
+    """
+    Queue per task: interactive uploads, bulk imports and reindex/cleanup each get their own
+    queue so a long reindex cannot starve uploads. `celery_task_routes` overrides entries.
+    """
+    routes = {
+        "workers.tasks.ingest_document": settings.celery_queue_interactive,
+        "workers.tasks.ingest_batch": settings.celery_queue_bulk,
+        "workers.tasks.reindex_dataset": settings.celery_queue_reindex,
+        "workers.tasks.cleanup_datasets": settings.celery_queue_reindex,
+    }
+    routes.update(settings.celery_task_routes)
+    return {name: {"queue": queue} for name, queue in routes.items()}
+
+
+def queue_names() -> list:
+    """Queues in priority order (interactive first); a worker started without -Q consumes all of them."""
+    names = [settings.celery_queue_interactive, settings.celery_queue_bulk, settings.celery_queue_reindex]
+    names += [route["queue"] for route in task_routes().values()]
+    return list(dict.fromkeys(names))
 
 
 def _load_celery():
     try:
         from celery import Celery
+        from celery.signals import worker_process_init, worker_process_shutdown
+        from kombu import Queue
     except ImportError:  # pragma: no cover - dev placeholder
         return None
-    return Celery(
+    worker_process_init.connect(_warm_worker, weak=False)
+    worker_process_shutdown.connect(_close_worker, weak=False)
+    app = Celery(
         "raglite",
         broker=settings.redis_url,
         backend=settings.redis_url,
         include=["workers.tasks"],
     )
+    app.conf.update(
+        task_queues=[Queue(name) for name in queue_names()],
+        task_default_queue=settings.celery_queue_interactive,
+        task_routes=task_routes(),
+        # Redis transport: poll queues in the declared order instead of round-robin. With
+        # acks_late a task stays unacked while it runs and Redis hands it to another worker
+        # once the visibility timeout passes, so that must outlast the longest reindex.
+        broker_transport_options={
+            "queue_order_strategy": "priority",
+            "visibility_timeout": settings.celery_visibility_timeout_seconds,
+        },
+        worker_prefetch_multiplier=settings.celery_worker_prefetch_multiplier,
+        worker_concurrency=settings.celery_worker_concurrency,
+        task_acks_late=settings.celery_task_acks_late,
+    )
+    return app
 
 
 celery_app = None
+_lazy_tasks: list = []
 
 
 def get_celery_app():
     global celery_app
     if celery_app is None:
         celery_app = _load_celery()
+        for lazy in _lazy_tasks:
+            lazy.bind(celery_app)
     return celery_app
 
 
-def task(*args, **kwargs) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
-    """Decorator proxy to register Celery tasks lazily."""
+class LazyTask:
+    """
+    Task declared before the Celery app exists. Importing a task module (as the API does via
+    app.tasks) therefore does not build the app; it is bound on the first `.delay()` or when
+    `get_celery_app()` runs, e.g. in a worker.
+    """
+
+    def __init__(self, fn: Callable[..., Any], options: tuple):
+        self.fn = fn
+        self.__name__ = fn.__name__
+        self.__doc__ = fn.__doc__
+        self._options = options
+        self._task: Any = None
+
+    def bind(self, app) -> Any:
+        if self._task is None:
+            args, kwargs = self._options
+            self._task = _shim(self.fn) if app is None else app.task(*args, **kwargs)(self.fn)
+        return self._task
 
-    def wrapper(fn: Callable[..., Any]) -> Callable[..., Any]:
-        app = get_celery_app()
-        if app is None:
-            # attach a .delay shim that calls the function directly
-            def delay(*dargs, **dkwargs):
-                return fn(*dargs, **dkwargs)
+    def delay(self, *args, **kwargs):
+        if self._task is None:
+            get_celery_app()
+        return self.bind(celery_app).delay(*args, **kwargs)
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+
+def _shim(fn: Callable[..., Any]) -> Callable[..., Any]:
+    # attach a .delay shim that calls the function directly
+    def delay(*dargs, **dkwargs):
+        return fn(*dargs, **dkwargs)
+
+    fn.delay = delay  # type: ignore[attr-defined]
+    return fn
+
+
+def task(*args, **kwargs) -> Callable[[Callable[..., Any]], Any]:
+    """Decorator proxy to register Celery tasks lazily."""
 
-            fn.delay = delay  # type: ignore[attr-defined]
-            return fn
-        return app.task(*args, **kwargs)(fn)
+    def wrapper(fn: Callable[..., Any]) -> Any:
+        if celery_app is not None:
+            return celery_app.task(*args, **kwargs)(fn)
+        lazy = LazyTask(fn, (args, kwargs))
+        _lazy_tasks.append(lazy)
+        return lazy
 
     return wrapper